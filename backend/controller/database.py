@@ -1,57 +1,107 @@
-from pymongo import MongoClient
-from pymongo.collection import Collection
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReadPreference
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = "SEES" 
+DB_NAME = "SEES"
+
+# Connection pool settings, overridable per deployment
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred")
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def client_options() -> dict:
+    """Build the Motor client options from the environment."""
+    if MONGO_READ_PREFERENCE not in READ_PREFERENCES:
+        raise ValueError(f"Unsupported MONGO_READ_PREFERENCE: {MONGO_READ_PREFERENCE}")
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "readPreference": READ_PREFERENCES[MONGO_READ_PREFERENCE].mongos_mode,
+    }
+
 
 class DatabaseSingleton:
-    """Singleton for managing MongoDB connection."""
+    """
+    Singleton for the application's single MongoDB connection pool.
+    Every route, service and model shares this async Motor client, so no
+    blocking driver call runs on the event loop.
+    """
     _instance = None
-    _client = None
-    _db = None
+    _client: AsyncIOMotorClient = None
+    _db: AsyncIOMotorDatabase = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseSingleton, cls).__new__(cls)
-            cls._client = MongoClient(MONGO_URI)
+            # Motor connects lazily, so building the client here does no I/O
+            cls._client = AsyncIOMotorClient(MONGO_URI, **client_options())
             cls._db = cls._client[DB_NAME]
         return cls._instance
-    
+
     @classmethod
-    def get_db(cls):
+    def get_client(cls) -> AsyncIOMotorClient:
+        """Return the shared Motor client."""
+        if cls._client is None:
+            raise ConnectionError("Database connection not established.")
+        return cls._client
+
+    @classmethod
+    def get_db(cls) -> AsyncIOMotorDatabase:
         """Return the MongoDB database instance."""
         if cls._db is None:
             raise ConnectionError("Database connection not established.")
         return cls._db
 
+    @classmethod
+    def close(cls):
+        """Close the connection pool."""
+        if cls._client is not None:
+            cls._client.close()
+
 
 # Initialize the DB instance
 db_instance = DatabaseSingleton().get_db()
 
 # Collections
-users_collection: Collection = db_instance["users"]
-events_collection: Collection = db_instance["events"]
-venues_collection: Collection = db_instance["venues"]
-tickets_collection: Collection = db_instance["tickets"]
-sessions_collection: Collection = db_instance["sessions"]
-polls_collection: Collection = db_instance["polls"]
-feedback_collection: Collection = db_instance["feedback"]
-chat_collection: Collection = db_instance["chat"]
-
-def init_db():
-    """Ensure required indexes and collections exist."""
-    users_collection.create_index("email", unique=True)
-    events_collection.create_index("event_id", unique=True)
-    venues_collection.create_index("venue_id", unique=True)
-    tickets_collection.create_index("ticket_id", unique=True)
-    sessions_collection.create_index("session_id", unique=True)
-    polls_collection.create_index("poll_id", unique=True)
-    feedback_collection.create_index("feedback_id", unique=True)
-    chat_collection.create_index("chat_id", unique=True)
+users_collection: AsyncIOMotorCollection = db_instance["users"]
+events_collection: AsyncIOMotorCollection = db_instance["events"]
+venues_collection: AsyncIOMotorCollection = db_instance["venues"]
+tickets_collection: AsyncIOMotorCollection = db_instance["tickets"]
+sessions_collection: AsyncIOMotorCollection = db_instance["sessions"]
+polls_collection: AsyncIOMotorCollection = db_instance["polls"]
+feedback_collection: AsyncIOMotorCollection = db_instance["feedback"]
+chat_collection: AsyncIOMotorCollection = db_instance["chat"]
+materials_collection: AsyncIOMotorCollection = db_instance["materials"]
+messages_collection: AsyncIOMotorCollection = db_instance["messages"]
+conversations_collection: AsyncIOMotorCollection = db_instance["conversations"]
+questions_collection: AsyncIOMotorCollection = db_instance["questions"]
+
+async def init_db():
+    """
+    Ensure required indexes exist and apply pending migrations.
+    Index declarations live on the models; see models.migrations.
+    """
+    from models.migrations import run_migrations
+    await run_migrations()
 
 def get_db():
     """
@@ -59,4 +109,4 @@ def get_db():
     Since MongoDB connections don't need to be closed per request,
     we simply yield the singleton instance.
     """
-    yield db_instance
\ No newline at end of file
+    yield db_instance
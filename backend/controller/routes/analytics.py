@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from controller.database import tickets_collection, feedback_collection
 from models.event_model import EventModel
+from models.registration_model import RegistrationModel
 from models.session_model import SessionModel
 from models.user_model import UserModel
 from bson import ObjectId
+from controller.services.exports.streaming import export_response
 
 router = APIRouter()
 
@@ -15,14 +17,16 @@ def document_to_dict(doc):
     return doc
 
 @router.get("/registrations/{event_id}")
-def get_registration_count(event_id: str):
-    count = tickets_collection.count_documents({"event_id": event_id})
+async def get_registration_count(event_id: str):
+    count = await tickets_collection.count_documents({"event_id": event_id})
     return {"event_id": event_id, "registration_count": count}
 
 
 @router.get("/feedback/{event_id}")
-def get_average_feedback(event_id: str):
-    feedbacks = list(feedback_collection.find({"event_id": event_id}))
+async def get_average_feedback(event_id: str):
+    feedbacks = await feedback_collection.find(
+        {"event_id": event_id}, {"rating": 1}
+    ).to_list(length=None)
 
     if not feedbacks:
         return {"event_id": event_id, "average_rating": None}
@@ -38,13 +42,13 @@ async def get_event_data(eventId: str):
     name = event['name']
     location = event['venue_id']
     is_virtual = event['is_virtual']
-    total_check_in = len(event['participants'])
+    participant_ids = await EventModel.get_event_participants(eventId)
+    total_check_in = len(participant_ids)
     created_at = event['created_at']
     capacity = event['capacity']
     event_type = event['event_type']
     attendees = []
-    for participant in event['participants']:
-        user = await UserModel.get_user_by_id(participant)
+    for user in await UserModel.load_many_by_ids(participant_ids):
         if user is None: continue
         attendees.append({"email":user['email'],"type":user['role'],"is_registered":True})
     print(total_check_in)
@@ -56,6 +60,16 @@ async def get_event_data(eventId: str):
 
 
 
+@router.get("/attendees/{event_id}/export")
+async def export_event_attendees(event_id: str, format: str = "csv"):
+    return export_response(
+        RegistrationModel.iter_event_attendees(event_id),
+        format,
+        ["user_id", "first_name", "last_name", "email", "role", "registered_at"],
+        f"attendees-{event_id}"
+    )
+
+
 @router.get("/org_events/{organiserId}")
 async def get_org_events(organiserId: str):
     events = await EventModel.get_events_by_organizer(organiserId)
@@ -78,12 +92,13 @@ async def get_org_events(organiserId: str):
     total_events = len(events)
     idx = 0
     for event in events:
-            total_participants += len(event['participants'])
-            total_money += TICKET_PRICE * len(event['participants'])
-            sales_dict.append({"name":event['name'], "sales": TICKET_PRICE * len(event['participants'])})
-            #participants_dict.append({"name":event["name"],"participants":len(event['participants'])})
-            participants_dict.append({"id":idx, "value": len(event['participants']), "label": event['name']})
-            participants_chart.append({"data":[len(event['participants'])]})
+            participant_count = event.get('participant_count', 0)
+            total_participants += participant_count
+            total_money += TICKET_PRICE * participant_count
+            sales_dict.append({"name":event['name'], "sales": TICKET_PRICE * participant_count})
+            #participants_dict.append({"name":event["name"],"participants":participant_count})
+            participants_dict.append({"id":idx, "value": participant_count, "label": event['name']})
+            participants_chart.append({"data":[participant_count]})
             participants_chart_names.append(event['name'])
             idx += 1
             continue
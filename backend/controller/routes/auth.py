@@ -3,6 +3,7 @@ from pydantic import BaseModel, EmailStr
 from controller.database import users_collection
 from passlib.hash import bcrypt
 from models.user_model import UserModel
+from models.autocomplete import index_user
 from bson import ObjectId
 from datetime import datetime
 from typing import Literal, Optional
@@ -42,22 +43,24 @@ class AdminCreateUserPayload(BaseModel):
 
 @router.post("/signup")
 async def signup(user: SignupRequest):
-    existing_user = users_collection.find_one({"email": user.email})
+    existing_user = await users_collection.find_one({"email": user.email})
     if existing_user:
         return {"status": False, "message": "Email already exists"}
 
     hashed_password = bcrypt.hash(user.password)
-    _id = users_collection.insert_one({
+    user_doc = {
         "email": user.email,
         "password": hashed_password,
         "role": user.role,
         "created_at": datetime.utcnow()
-    })
+    }
+    _id = await users_collection.insert_one(user_doc)
+    index_user(str(_id.inserted_id), user_doc)
     return {"status": True, "first_name": "john doe", "user_id": str(_id.inserted_id)}
 
 @router.post("/login")
 async def login(user: LoginRequest): 
-    db_user = users_collection.find_one({"email": user.email})
+    db_user = await users_collection.find_one({"email": user.email})
     if not db_user or not bcrypt.verify(user.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {
@@ -88,7 +91,7 @@ async def update_user(user_data: UserUpdateData):
 @router.post("/update_password")
 async def update_password(password_data: PasswordUpdateData):
     try:
-        user = users_collection.find_one({"_id": ObjectId(password_data.user_id)})
+        user = await users_collection.find_one({"_id": ObjectId(password_data.user_id)})
         if not user:
             return {"status": False, "message": "User not found"}
         
@@ -96,13 +99,14 @@ async def update_password(password_data: PasswordUpdateData):
             return {"status": False, "message": "Current password is incorrect"}
         
         hashed_password = bcrypt.hash(password_data.new_password)
-        result = users_collection.update_one(
+        result = await users_collection.update_one(
             {"_id": ObjectId(password_data.user_id)},
             {"$set": {"password": hashed_password}}
         )
 
         if result.modified_count == 0:
             return {"status": False, "message": "Failed to update password"}
+        await UserModel.invalidate_cache(ObjectId(password_data.user_id))
         
         return {"status": True, "message": "Password updated successfully"}
     
@@ -120,7 +124,7 @@ async def admin_create_user(payload: AdminCreateUserPayload):
     if not is_admin:
         raise HTTPException(status_code=403, detail="Only admins can create new users.")
 
-    existing = users_collection.find_one({"email": new_user.email})
+    existing = await users_collection.find_one({"email": new_user.email})
     if existing:
         raise HTTPException(status_code=400, detail="User with this email already exists.")
 
@@ -133,7 +137,8 @@ async def admin_create_user(payload: AdminCreateUserPayload):
         "created_at": datetime.utcnow(),
     }
 
-    result = users_collection.insert_one(user_doc)
+    result = await users_collection.insert_one(user_doc)
+    index_user(str(result.inserted_id), user_doc)
     return {"status": True, "user_id": str(result.inserted_id)}
 
 #To get all speakers. This routes file imports usermodel properly hence this is placed here.
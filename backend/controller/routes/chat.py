@@ -10,14 +10,14 @@ class ChatMessage(BaseModel):
     chat_room_id: str
 
 @router.post("/")
-def send_message(chat_message: ChatMessage):
+async def send_message(chat_message: ChatMessage):
     chat_dict = chat_message.dict()
-    message_id = chat_collection.insert_one(chat_dict).inserted_id
+    message_id = (await chat_collection.insert_one(chat_dict)).inserted_id
     return {"message": "Message sent", "id": str(message_id)}
 
 @router.get("/{chat_room_id}")
-def get_messages(chat_room_id: str):
-    messages = list(chat_collection.find({"chat_room_id": chat_room_id}))
+async def get_messages(chat_room_id: str):
+    messages = await chat_collection.find({"chat_room_id": chat_room_id}).to_list(length=None)
     if not messages:
         raise HTTPException(status_code=404, detail="No messages found")
     return messages
\ No newline at end of file
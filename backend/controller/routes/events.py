@@ -1,13 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
 from controller.database import events_collection
 from datetime import datetime
-from models.event_model import EventModel
+from models.event_model import EventModel, REGISTRATION_REGISTERED, REGISTRATION_ALREADY_REGISTERED, REGISTRATION_SOLD_OUT
+from models.registration_model import RegistrationModel
 from models.user_model import UserModel
 from models.venue_model import VenueModel
 from models.session_model import SessionModel
 from typing import Dict, List, Optional, Any
-from controller.services.materials.database import get_materials_by_event
+from controller.services.materials.database import get_materials_by_events
 router = APIRouter()
 
 class Session(BaseModel):
@@ -35,6 +36,7 @@ class Event(BaseModel):
 
 class SearchData(BaseModel):
     query: Optional[str]
+    user_id: Optional[str] = None
 
 class EventSignupData(BaseModel):
     user_id: str
@@ -46,12 +48,26 @@ class EventUserData(BaseModel):
 
 class UserData(BaseModel):
     user_id: str
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
 
 class EventSearch(BaseModel):
     query: str
+    cursor: Optional[str] = None
+    limit: int = Field(10, ge=1, le=200)
+
+class RankedEventSearch(BaseModel):
+    query: str
+    event_type: Optional[str] = None
+    is_virtual: Optional[bool] = None
+    upcoming_only: bool = True
+    limit: int = Field(10, ge=1, le=200)
+    skip: int = Field(0, ge=0)
 
 class OrganizerData(BaseModel):
     organizer_id: str
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
 
 class SessionsUpdate(BaseModel):
     sessions: List[Session]
@@ -61,46 +77,55 @@ def document_to_dict(doc):
         doc['_id'] = str(doc['_id'])
     return doc
 
+async def attach_sessions_and_materials(events: List[Dict]):
+    """
+    Attach each event's sessions, with the event materials on every session,
+    using one sessions query and one materials query for the whole page.
+    """
+    event_ids = [event['id'] for event in events]
+    sessions_by_event = await SessionModel.get_sessions_for_events(event_ids)
+    materials_by_event = await get_materials_by_events(event_ids)
+    for event in events:
+        event['sessions'] = [document_to_dict(session) for session in sessions_by_event.get(event['id'], [])]
+        for session in event['sessions']:
+            session['materials'] = materials_by_event.get(event['id'], [])
+
 @router.post("/organizer_event")
 async def organizer_event(org_data: OrganizerData):
-    organizer_id = org_data.organizer_id
-    all_events = await EventModel.get_upcoming_events()
-    organizer_events = []
-    for event in all_events:
-        if organizer_id == event['organizer_id']:
-            organizer_events.append(event)
-
+    try:
+        page = await EventModel.get_organizer_events(
+            org_data.organizer_id, upcoming_only=True, limit=org_data.limit, cursor=org_data.cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    organizer_events = page["events"]
+
+    participants_by_event = await RegistrationModel.get_event_user_ids_for_events(
+        [event['id'] for event in organizer_events]
+    )
+    participant_ids = {user_id for user_ids in participants_by_event.values() for user_id in user_ids}
+    users = await UserModel.load_many_by_ids(participant_ids)
+    emails_by_user = {user['id']: user['email'] for user in users if user}
     for event in organizer_events:
-        idx = 0
-        for participant_id in event['participants']:
-            user = await UserModel.get_user_by_id(participant_id)
-            if idx == 0:
-                event['participants_email'] = [user['email']]
-                idx = 1
-                continue
-            event['participants_email'].append(user['email'])
+        event['participants'] = participants_by_event.get(event['id'], [])
+        emails = [emails_by_user[user_id] for user_id in event['participants'] if user_id in emails_by_user]
+        if emails:
+            event['participants_email'] = emails
     
-    return {"events":organizer_events}
+    return {"events":organizer_events, "next_cursor": page["next_cursor"]}
 
 @router.post("/user_events")
 async def user_events(user_data: UserData):
-    user_id = user_data.user_id
-    all_events = await EventModel.get_upcoming_events()
-    user_events = []
-    for event in all_events:
-        if user_id in event['participants']:
-            print(event)
-            sessions = await SessionModel.get_event_sessions(event['id'])            
-            cleaned_sessions = [document_to_dict(session) for session in sessions]
-            event['sessions'] = cleaned_sessions
-            materials = get_materials_by_event(event["id"])
-            print(event['id'])
-            print(materials)
-            for idx, session in enumerate(event['sessions']):
-                event['sessions'][idx]['materials'] = materials
-            user_events.append(event)
+    try:
+        page = await EventModel.get_user_events(
+            user_data.user_id, upcoming_only=True, limit=user_data.limit, cursor=user_data.cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    user_events = page["events"]
+    await attach_sessions_and_materials(user_events)
     
-    return {"events":[document_to_dict(event) for event in user_events] }    
+    return {"events":[document_to_dict(event) for event in user_events], "next_cursor": page["next_cursor"]}
 
 @router.post("/create_event")
 async def create_event(event: Event):
@@ -132,16 +157,17 @@ async def create_event(event_signup_data: EventSignupData):
     user_id = event_signup_data.user_id
     event_id = event_signup_data.event_id
 
-    event = await EventModel.get_event_by_id(event_id)
-
-    print("event", event)
-
     try:
-        await EventModel.add_participant(event_id, user_id)
-    except:
+        registration = await EventModel.add_participant(event_id, user_id)
+    except Exception:
         return {"status":False}
 
-    return {"status":True}
+    return {
+        "status": registration["status"] in (REGISTRATION_REGISTERED, REGISTRATION_ALREADY_REGISTERED),
+        "registration": registration["status"],
+        "sold_out": registration["status"] == REGISTRATION_SOLD_OUT,
+        "participant_count": registration["participant_count"]
+    }
 
 @router.post("/event_cancel")
 async def event_cancel(event_cancel_data: EventUserData):
@@ -178,6 +204,11 @@ async def get_upcoming_events(user_upcoming_event: EventUserData):
 
     return {"tickets":user_tickets}
 
+@router.get("/autocomplete")
+async def event_autocomplete(prefix: str, limit: int = Query(10, ge=1, le=50)):
+    events = await EventModel.autocomplete_events(prefix, limit=limit)
+    return {"events": events}
+
 @router.get("/{event_id}")
 async def get_event(event_id: str):
     event = await EventModel.get_event_by_id(event_id)
@@ -186,26 +217,43 @@ async def get_event(event_id: str):
     return event
 
 @router.post("/event_search")
-async def event_search(query: EventSearch):
-    query = query.dict()['query']
-    results = await EventModel.search_events(query=query)
-    return {"events":[document_to_dict(event) for event in results] }
+async def event_search(search: EventSearch):
+    try:
+        page = await EventModel.search_events_page(query=search.query, limit=search.limit, cursor=search.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"events":[document_to_dict(event) for event in page["events"]], "next_cursor": page["next_cursor"]}
+
+@router.post("/search")
+async def ranked_event_search(search: RankedEventSearch):
+    """
+    ranked full-text event search with facet counts by event type, virtual flag and city
+    """
+    events = await EventModel.search_events(
+        query=search.query,
+        event_type=search.event_type,
+        is_virtual=search.is_virtual,
+        limit=search.limit,
+        skip=search.skip,
+        upcoming_only=search.upcoming_only
+    )
+    facets = await EventModel.get_search_facets(search.query, upcoming_only=search.upcoming_only)
+    return {"events": [document_to_dict(event) for event in events], "facets": facets}
 
 @router.post("/")
 async def get_all_events(search: SearchData):
     query = search.query
-    all_events = await EventModel.get_upcoming_events()
-    matched_query = all_events
-    if query != "":
-        matched_query = []
-        query_events = await EventModel.search_events(query=query)
-        query_events_ids = [event['id'] for event in query_events]
-        
-        for event in all_events:
-            if event['id'] in query_events_ids:
-                matched_query.append(event)
-    all_events = matched_query
+    if query:
+        all_events = await EventModel.search_events(query=query, upcoming_only=True)
+    else:
+        all_events = await EventModel.get_upcoming_events()
+    registered_ids = set()
+    if search.user_id:
+        registered_ids = set(await RegistrationModel.get_registered_event_ids(
+            search.user_id, [event['id'] for event in all_events]
+        ))
     for event in all_events:
+        event['is_registered'] = event['id'] in registered_ids
         organizer_id = event['organizer_id']
         try:
             user = await UserModel.get_user_by_id(organizer_id)
@@ -324,7 +372,7 @@ async def update_event_sessions(event_id: str, data: SessionsUpdate):
                     location="Mezzanine",  # Default value
                     capacity=existing_event.get("capacity", 100),  # Use event capacity
                     materials=session_data["materials"],
-                    attendees_ids=existing_event.get("participants", [])  # Use event participants
+                    attendees_ids=await EventModel.get_event_participants(event_id)  # Use event participants
                 )
                 if new_session_id:
                     new_session = await SessionModel.get_session_by_id(new_session_id)
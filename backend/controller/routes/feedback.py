@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from controller.database import feedback_collection
+from models.feedback_model import FeedbackModel
+from controller.services.exports.streaming import export_response
 
 router = APIRouter()
 
@@ -11,14 +13,23 @@ class Feedback(BaseModel):
     comment: str
 
 @router.post("/")
-def create_feedback(feedback: Feedback):
+async def create_feedback(feedback: Feedback):
     feedback_dict = feedback.dict()
-    feedback_id = feedback_collection.insert_one(feedback_dict).inserted_id
+    feedback_id = (await feedback_collection.insert_one(feedback_dict)).inserted_id
     return {"message": "Feedback submitted", "id": str(feedback_id)}
 
+@router.get("/event/{event_id}/export")
+async def export_event_feedback(event_id: str, format: str = "ndjson"):
+    return export_response(
+        FeedbackModel.iter_event_feedback(event_id),
+        format,
+        ["id", "event_id", "session_id", "user_id", "rating", "comment", "is_anonymous", "created_at"],
+        f"feedback-{event_id}"
+    )
+
 @router.get("/{feedback_id}")
-def get_feedback(feedback_id: str):
-    feedback = feedback_collection.find_one({"_id": feedback_id})
+async def get_feedback(feedback_id: str):
+    feedback = await feedback_collection.find_one({"_id": feedback_id})
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     return feedback
@@ -1,14 +1,17 @@
 # main.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from pymongo import DESCENDING
 from fastapi.responses import JSONResponse
-from controller.services.messages.models import MessageCreate, MessageResponse, ChatHistoryResponse
-from controller.services.messages.database import insert_message, get_chat_history, get_message_by_id, messages_collection
+from controller.services.messages.models import MessageCreate, MessageResponse, ChatHistoryResponse, MarkReadRequest
+from controller.services.messages.database import (
+    insert_message, get_chat_history, get_message_by_id, get_conversations,
+    mark_conversation_read, get_unread_counts
+)
 from models.user_model import UserModel
+from bson import ObjectId
 
 
 router = APIRouter()
@@ -18,23 +21,49 @@ app = router
 @app.post("/", response_model=MessageResponse)
 async def send_message(message: MessageCreate):
     message_data = message.dict()
-    inserted_id = insert_message(message_data)
+    inserted_id = await insert_message(message_data)
 
-    inserted_message = get_message_by_id(str(inserted_id))
+    inserted_message = await get_message_by_id(str(inserted_id))
     return MessageResponse(
+        id=str(inserted_id),
         sender=inserted_message["sender"],
         recipient=inserted_message["recipient"],
         content=inserted_message["content"],
         timestamp=datetime.now()
     )
 
-# use this to read messages
+# mark conversations read up to a message each; returns the new read state
+@app.post("/read")
+async def mark_read(request: MarkReadRequest):
+    results = []
+    for cursor in request.cursors:
+        if cursor.message_id and not ObjectId.is_valid(cursor.message_id):
+            raise HTTPException(status_code=400, detail=f"Invalid message id: {cursor.message_id}")
+        state = await mark_conversation_read(request.user_id, cursor.peer_id, cursor.message_id)
+        if state:
+            results.append(state)
+    return {"conversations": results}
+
+# unread counts per contact, from the maintained counters
+@app.get("/unread/{user_id}")
+async def get_unread(user_id: str):
+    counts = await get_unread_counts(user_id)
+    return {"total": sum(counts.values()), "conversations": counts}
+
+# use this to read messages; pass after (a message id) to get only newer ones
 @app.get("/{sender}/{recipient}", response_model=ChatHistoryResponse)
-async def get_messages(sender: str, recipient: str, limit: int = 20):
-    messages = get_chat_history(sender, recipient, limit)
+async def get_messages(sender: str, recipient: str, limit: int = Query(20, ge=1, le=200), after: Optional[str] = None):
+    after_timestamp = None
+    if after:
+        after_message = await get_message_by_id(after) if ObjectId.is_valid(after) else None
+        if not after_message:
+            raise HTTPException(status_code=400, detail=f"Unknown message id: {after}")
+        after_timestamp = after_message["timestamp"]
+    messages = await get_chat_history(sender, recipient, limit, after=after_timestamp)
     
     message_list = [
         MessageResponse(
+            id=str(message["_id"]),
             sender=message["sender"],
             recipient=message["recipient"],
             content=message["content"],
@@ -58,42 +87,29 @@ async def get_contacts():
 
 @app.get("/{sender}")
 async def get_recipients(sender: str):
-    messages = messages_collection.find({"$or": [{"sender": sender}, {"recipient": sender}]})
-    
-    recipients = set()
-    for message in messages:
-        if message["sender"] != sender:
-            recipients.add(message["sender"])
-        if message["recipient"] != sender:
-            recipients.add(message["recipient"])
-    print(recipients)
-    contacts = []
-    
-    for recipient in recipients:
-        user = await UserModel.get_user_by_id(recipient)
-        
-        last_message = messages_collection.find(
-            {"$or": [{"sender": sender, "recipient": recipient}, {"sender": recipient, "recipient": sender}]}
-        ).sort("timestamp", DESCENDING).limit(1)
+    conversations = await get_conversations(sender)
+    recipients = [
+        next((user_id for user_id in conversation["participants"] if user_id != sender), sender)
+        for conversation in conversations
+    ]
+    users = await UserModel.load_many_by_ids(recipients)
 
-        last_message_content = None
-        if last_message:
-            last_message_content = last_message[0] 
+    contacts = []
+    for conversation, recipient, user in zip(conversations, recipients, users):
+        last_message = conversation.get("last_message")
         contacts.append({
             "id": recipient,
-            "email": user['email'],
-            "last_message": last_message_content["content"] if last_message_content else "No messages yet",
-            "timestamp": last_message_content["timestamp"] if last_message_content else None
+            "email": user['email'] if user else None,
+            "last_message": last_message["content"] if last_message else "No messages yet",
+            "timestamp": last_message["timestamp"] if last_message else None,
+            "unread": conversation.get("unread", {}).get(sender, 0)
         })
 
-    if not recipients:
-        {"contacts":[]}
-
     return {"contacts": contacts}
 
 @app.get("/{message_id}", response_model=MessageResponse)
 async def get_single_message(message_id: str):
-    message = get_message_by_id(message_id)
+    message = await get_message_by_id(message_id)
     if not message:
         return {}
     
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Optional, Dict
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional, Dict, Set
 from pydantic import BaseModel
 from datetime import datetime, timezone
 from controller.database import get_db
 from models.poll_model import PollModel
-from models.chat_model import ChatRoomModel, ChatMessageModel
-from models.feedback_model import FeedbackModel
+from models.chat_model import ChatRoomModel, ChatMessageModel, ChatReadModel
+from models.hub import chat_hub, question_hub, Subscriber, EVENT_MESSAGE
+from models.question_model import QuestionModel
+from models.question_board import question_boards
 from models.user_model import UserModel
 from bson import ObjectId
 
@@ -43,22 +47,30 @@ async def create_poll_endpoint(poll: PollCreate, db=Depends(get_db)):
 
 @router.post("/polls/{poll_id}/vote", status_code=status.HTTP_200_OK)
 async def vote_poll_endpoint(poll_id: str, vote: PollVote, db=Depends(get_db)):
-    # The PollModel.vote_on_poll method has been updated to ensure that 
-    # poll["ends_at"] is converted to a timezone-aware datetime before comparison.
-    poll = await PollModel.get_poll_by_id(poll_id)
-    if not poll:
+    # Served from the in-memory tallies, so a vote costs a single write
+    if not ObjectId.is_valid(poll_id) or not await PollModel.get_poll_results(poll_id):
         raise HTTPException(status_code=404, detail="Poll not found")
     updated_poll = await PollModel.vote_on_poll(poll_id, vote.user_id, vote.option_indices)
     if not updated_poll:
         raise HTTPException(status_code=400, detail="Failed to register vote")
     return updated_poll
 
+@router.get("/polls/{poll_id}/results", status_code=status.HTTP_200_OK)
+async def poll_results_endpoint(poll_id: str):
+    """
+    live results of a poll, from memory; subscribe to /polls/{poll_id}/ws for pushes
+    """
+    results = await PollModel.get_poll_results(poll_id) if ObjectId.is_valid(poll_id) else None
+    if not results:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    return results
+
 @router.post("/polls/{poll_id}/close", status_code=status.HTTP_200_OK)
 async def close_poll_endpoint(poll_id: str, db=Depends(get_db)):
     poll = await PollModel.get_poll_by_id(poll_id)
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
-    closed_poll = await PollModel.close_poll(db, poll_id)
+    closed_poll = await PollModel.close_poll(poll_id)
     if not closed_poll:
         raise HTTPException(status_code=400, detail="Failed to close poll")
     return closed_poll
@@ -94,12 +106,120 @@ async def post_message_endpoint(chatroom_id: str, message: ChatMessageCreate, db
     return {"message_id": str(new_message_id)}
 
 @router.get("/chatrooms/{chatroom_id}/messages", status_code=status.HTTP_200_OK)
-async def get_messages_endpoint(chatroom_id: str, db=Depends(get_db)):
+async def get_messages_endpoint(chatroom_id: str, limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None,
+                                after: Optional[str] = None, db=Depends(get_db)):
     chatroom = await ChatRoomModel.get_chat_room_by_id(chatroom_id)
     if not chatroom:
         raise HTTPException(status_code=404, detail="Chatroom not found")
-    messages = await ChatMessageModel.get_chat_room_messages(chatroom_id)
-    return {"messages": messages}
+    if after:
+        # Only the messages after the client's read cursor, oldest first
+        page = None
+        if ObjectId.is_valid(after):
+            page = await ChatMessageModel.get_messages_after(chatroom_id, after, limit=limit)
+        if page is None:
+            raise HTTPException(status_code=400, detail=f"Unknown message id: {after}")
+        return page
+    try:
+        page = await ChatMessageModel.get_chat_room_messages_page(chatroom_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page
+
+class ChatReadCursor(BaseModel):
+    chatroom_id: str
+    message_id: Optional[str] = None  # Latest message if omitted
+
+class ChatMarkRead(BaseModel):
+    user_id: str
+    cursors: List[ChatReadCursor]
+
+@router.post("/chatrooms/read", status_code=status.HTTP_200_OK)
+async def mark_chatrooms_read_endpoint(request: ChatMarkRead, db=Depends(get_db)):
+    results = []
+    for cursor in request.cursors:
+        if not ObjectId.is_valid(cursor.chatroom_id) or (cursor.message_id and not ObjectId.is_valid(cursor.message_id)):
+            raise HTTPException(status_code=400, detail=f"Invalid read cursor: {cursor}")
+        read_cursor = await ChatReadModel.mark_read(cursor.chatroom_id, request.user_id, cursor.message_id)
+        if read_cursor:
+            results.append(read_cursor)
+    unread = await ChatReadModel.get_unread_counts(
+        request.user_id, [cursor.chatroom_id for cursor in request.cursors]
+    )
+    return {"cursors": results, "unread": unread}
+
+@router.get("/chatrooms/unread", status_code=status.HTTP_200_OK)
+async def chatrooms_unread_endpoint(user_id: str, chatroom_ids: Optional[List[str]] = Query(None),
+                                    db=Depends(get_db)):
+    if chatroom_ids and not all(ObjectId.is_valid(room_id) for room_id in chatroom_ids):
+        raise HTTPException(status_code=400, detail="Invalid chatroom id")
+    unread = await ChatReadModel.get_unread_counts(user_id, chatroom_ids)
+    return {"total": sum(unread.values()), "unread": unread}
+
+# Most messages replayed to a resuming client; beyond that it is told to resync
+REPLAY_LIMIT = 500
+
+async def _send_events(websocket: WebSocket, subscriber: Subscriber, replayed: Set[str]):
+    """Forward hub events to the client until it disconnects or falls behind."""
+    while True:
+        event = await subscriber.next_event()
+        if event is None:
+            return
+        if event["type"] == EVENT_MESSAGE and event["message"]["id"] in replayed:
+            continue
+        await websocket.send_json(jsonable_encoder(event))
+
+async def _receive_messages(websocket: WebSocket, chatroom_id: str, user_id: Optional[str]):
+    """Persist messages the client sends; create_message broadcasts them to the room."""
+    while True:
+        data = await websocket.receive_json()
+        text = data.get("text") if isinstance(data, dict) else None
+        sender_id = (data.get("user_id") if isinstance(data, dict) else None) or user_id
+        if not text or not sender_id:
+            await websocket.send_json({"type": "error", "detail": "Messages need text and a user_id"})
+            continue
+        await ChatMessageModel.create_message(text, sender_id, chatroom_id)
+
+@router.websocket("/chatrooms/{chatroom_id}/ws")
+async def chatroom_socket(websocket: WebSocket, chatroom_id: str, user_id: Optional[str] = None,
+                          last_message_id: Optional[str] = None):
+    """
+    live chat room feed; pass last_message_id to resume after a reconnect
+    """
+    if not ObjectId.is_valid(chatroom_id) or not await ChatRoomModel.get_chat_room_by_id(chatroom_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    # Subscribe before replaying so nothing posted during the replay is missed
+    subscriber = chat_hub.subscribe(chatroom_id)
+    try:
+        replayed = set()
+        if last_message_id:
+            page = None
+            if ObjectId.is_valid(last_message_id):
+                page = await ChatMessageModel.get_messages_after(chatroom_id, last_message_id, limit=REPLAY_LIMIT)
+            if page is None or page["next_cursor"]:
+                # Unknown message or too far behind: reload history through the messages endpoint
+                await websocket.send_json({"type": "resync"})
+            else:
+                for message in page["messages"]:
+                    await websocket.send_json(jsonable_encoder({"type": EVENT_MESSAGE, "message": message}))
+                    replayed.add(message["id"])
+
+        sender = asyncio.create_task(_send_events(websocket, subscriber, replayed))
+        receiver = asyncio.create_task(_receive_messages(websocket, chatroom_id, user_id))
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+        if subscriber.overflowed.is_set():
+            # Too slow to keep up: the client reconnects with its last message ID
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_hub.unsubscribe(subscriber)
 
 # --------------------- Q&A / Feedback Endpoints ---------------------
 class QuestionCreate(BaseModel):
@@ -113,17 +233,13 @@ async def create_question_endpoint(question: QuestionCreate, db=Depends(get_db))
     if not user or user.get("role") != "organizer":
         raise HTTPException(status_code=403, detail="Only organizers can post questions")
 
-    new_question_id = await FeedbackModel.create_question(
-        db, question.user_id, question.session_id, question.question
-    )
-    if not new_question_id:
-        raise HTTPException(status_code=400, detail="Failed to create question")
-    return {"question_id": str(new_question_id)}
+    new_question_id = await QuestionModel.add_question(question.session_id, question.user_id, question.question)
+    return {"question_id": new_question_id}
 
 
 @router.get("/questions/{session_id}", status_code=status.HTTP_200_OK)
-async def list_questions_endpoint(session_id: str, db=Depends(get_db)):
-    questions = await FeedbackModel.get_questions_for_session(db, session_id)
+async def list_questions_endpoint(session_id: str, question_status: Optional[str] = Query(None, alias="status")):
+    questions = await QuestionModel.get_session_questions(session_id, question_status)
     return {"questions": questions}
 
 @router.post("/questions/{question_id}/answer", status_code=status.HTTP_200_OK)
@@ -132,13 +248,72 @@ async def answer_question_endpoint(question_id: str, answer: dict, db=Depends(ge
     if not user or user.get("role") != "attendee":
         raise HTTPException(status_code=403, detail="Only attendees can answer questions")
 
-    result = await FeedbackModel.answer_question(
-        db, question_id, answer.get("user_id"), answer.get("answer_text")
-    )
-    if not result or result.modified_count == 0:
+    if not ObjectId.is_valid(question_id) or not answer.get("answer_text"):
+        raise HTTPException(status_code=404, detail="Failed to add answer")
+    result = await QuestionModel.answer_question(question_id, answer["answer_text"], answer.get("user_id"))
+    if not result:
         raise HTTPException(status_code=404, detail="Failed to add answer")
     return {"status": "success", "message": "Answer added"}
 
+class QuestionUpvote(BaseModel):
+    user_id: str
+
+@router.post("/questions/{question_id}/upvote", status_code=status.HTTP_200_OK)
+async def upvote_question_endpoint(question_id: str, upvote: QuestionUpvote):
+    if not ObjectId.is_valid(question_id):
+        raise HTTPException(status_code=404, detail="Question not found")
+    question = await QuestionModel.upvote_question(question_id, upvote.user_id)
+    if not question:
+        raise HTTPException(status_code=409, detail="Question not found or already upvoted")
+    return {"question_id": question_id, "votes": question["votes"]}
+
+@router.get("/questions/{session_id}/leaderboard", status_code=status.HTTP_200_OK)
+async def question_leaderboard_endpoint(session_id: str, limit: int = Query(20, ge=1, le=100)):
+    """
+    most upvoted questions of a session, ranked in memory
+    """
+    questions = await question_boards.leaderboard(session_id, limit)
+    return {"questions": questions}
+
+async def _forward_leaderboard(websocket: WebSocket, subscriber: Subscriber):
+    """Forward leaderboard deltas to the client until it disconnects or falls behind."""
+    while True:
+        event = await subscriber.next_event()
+        if event is None:
+            return
+        await websocket.send_json(jsonable_encoder(event))
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Read (and ignore) client frames so a disconnect is noticed."""
+    while True:
+        await websocket.receive_text()
+
+@router.websocket("/questions/{session_id}/leaderboard/ws")
+async def question_leaderboard_socket(websocket: WebSocket, session_id: str):
+    """
+    live top questions of a session: a full leaderboard, then only what moved
+    """
+    await websocket.accept()
+    subscriber, snapshot = await question_boards.subscribe(session_id)
+    try:
+        await websocket.send_json(jsonable_encoder(snapshot))
+        tasks = {
+            asyncio.create_task(_forward_leaderboard(websocket, subscriber)),
+            asyncio.create_task(_wait_for_disconnect(websocket)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+        if subscriber.overflowed.is_set():
+            # Too slow to keep up: the client reconnects and gets a fresh leaderboard
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        question_hub.unsubscribe(subscriber)
+
 # --------------------- Matchmaking and Itinerary Endpoints ---------------------
 @router.get("/matchmaking", status_code=status.HTTP_200_OK)
 async def matchmaking_endpoint(user_id: str, db=Depends(get_db)):
@@ -210,7 +385,7 @@ async def connect_users(
         raise HTTPException(status_code=400, detail="Missing user_id or target_user_id")
 
     try:
-        result = db["connections"].insert_one({
+        result = await db["connections"].insert_one({
             "sender_id": user_id,
             "receiver_id": target_user_id,
             "status": "pending",
@@ -232,18 +407,18 @@ async def connect_users(
 from fastapi.responses import JSONResponse
 
 @router.get("/connections/received")
-def get_received_requests(user_id: str, db=Depends(get_db)):
+async def get_received_requests(user_id: str, db=Depends(get_db)):
     try:
         collection = db["connections"]
         cursor = collection.find({
             "receiver_id": user_id,
             "status": "pending"
         })
-        connections = list(cursor)  # 🔄 No await here, just convert cursor to list
+        connections = await cursor.to_list(length=None)
 
+        senders = await UserModel.load_many_by_ids(conn["sender_id"] for conn in connections)
         results = []
-        for conn in connections:
-            sender = UserModel.get_user_by_id_sync(conn["sender_id"])  # sync method
+        for conn, sender in zip(connections, senders):
             results.append({
                 "_id": str(conn["_id"]),
                 "sender_id": conn["sender_id"],
@@ -292,15 +467,16 @@ async def respond_to_request(payload: dict, db=Depends(get_db)):
             {"_id": ObjectId(receiver_id)},
             {"$addToSet": {"connections": sender_id}}
         )
+        await UserModel.invalidate_cache(ObjectId(sender_id), ObjectId(receiver_id))
 
     return {"status": "success", "message": f"Connection {decision}"}
 
 
 
 @router.get("/user_connections")
-def get_user_connections(user_id: str, db=Depends(get_db)):
+async def get_user_connections(user_id: str, db=Depends(get_db)):
     try:
-        user = db["users"].find_one({"_id": ObjectId(user_id)})
+        user = await db["users"].find_one({"_id": ObjectId(user_id)})
         if not user or "connections" not in user:
             return {"connections": []}
 
@@ -310,7 +486,7 @@ def get_user_connections(user_id: str, db=Depends(get_db)):
             "_id": {"$in": [ObjectId(uid) for uid in connection_ids]}
         })
 
-        connected_users = list(connected_users_cursor)
+        connected_users = await connected_users_cursor.to_list(length=None)
 
         emails = list({
             user_doc.get("email")
@@ -329,25 +505,26 @@ def get_user_connections(user_id: str, db=Depends(get_db)):
 
 @router.post("/connections/{request_id}/accept", status_code=200)
 async def accept_connection(request_id: str, db=Depends(get_db)):
-    connection = db["connections"].find_one({"_id": ObjectId(request_id)})
+    connection = await db["connections"].find_one({"_id": ObjectId(request_id)})
     if not connection:
         raise HTTPException(status_code=404, detail="Connection request not found")
 
     # Update the connection status
-    db["connections"].update_one(
+    await db["connections"].update_one(
         {"_id": ObjectId(request_id)},
         {"$set": {"status": "accepted", "responded_at": datetime.utcnow()}}
     )
 
     # Add each user to the other's connections list
-    db["users"].update_one(
+    await db["users"].update_one(
         {"_id": ObjectId(connection["receiver_id"])},
         {"$addToSet": {"connections": ObjectId(connection["sender_id"])}}
     )
-    db["users"].update_one(
+    await db["users"].update_one(
         {"_id": ObjectId(connection["sender_id"])},
         {"$addToSet": {"connections": ObjectId(connection["receiver_id"])}}
     )
+    await UserModel.invalidate_cache(ObjectId(connection["sender_id"]), ObjectId(connection["receiver_id"]))
 
     return {"status": "success", "message": "Connection accepted"}
 
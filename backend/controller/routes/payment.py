@@ -1,9 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 from controller.database import db_instance as db
 from models.payment_model import PaymentModel  # Correct import
+from controller.services.exports.streaming import export_response
 
 import uuid
 
@@ -88,12 +89,25 @@ async def get_event_sponsors(event_id: str):
 
 
 @router.get("/payments/user/{user_id}")
-async def fetch_payments_by_user(user_id: str):
-    payments = await PaymentModel.get_user_payments(user_id)
-    return {"user_id": user_id, "payments": payments}
+async def fetch_payments_by_user(user_id: str, limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None):
+    try:
+        page = await PaymentModel.get_user_payments_page(user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"user_id": user_id, "payments": page["payments"], "next_cursor": page["next_cursor"]}
 
 
 @router.get("/payments/event/{event_id}")
 async def fetch_payments_by_event(event_id: str):
     payments = await PaymentModel.get_event_payments(event_id)
     return {"event_id": event_id, "payments": payments}
+
+
+@router.get("/payments/event/{event_id}/export")
+async def export_payments_by_event(event_id: str, format: str = "ndjson"):
+    return export_response(
+        PaymentModel.iter_event_payments(event_id),
+        format,
+        ["id", "user_id", "event_id", "amount", "currency", "status", "payment_method", "payment_provider", "created_at"],
+        f"payments-{event_id}"
+    )
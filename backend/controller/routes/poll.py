@@ -1,10 +1,20 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from controller.database import polls_collection
+from models.hub import poll_hub, broadcast, Subscriber, EVENT_POLL_UPDATED
+from models.poll_model import PollModel, PollVoteModel
+from models.pubsub import CHANNEL_POLLS
 from bson import ObjectId
+from pymongo import ReturnDocument
+from typing import Optional
 
 router = APIRouter()
 
+# Poll reads carry tallies only; who voted stays in poll_votes
+POLL_PROJECTION = {"answers": 0, "voters": 0}
+
 class Poll(BaseModel):
     question: str
     options: list[dict]
@@ -19,65 +29,122 @@ class PollAnswerData(BaseModel):
     poll_id: str
 
 @router.post("/")
-def create_poll(poll: Poll):
+async def create_poll(poll: Poll):
     poll_dict = poll.dict()
-    poll_dict['answers'] = []
+    # Answers are recorded as votes, not in the poll
+    poll_dict.pop('answers', None)
     for option in poll_dict['options']:
         option['stat'] = 0
         option['count'] = 0
-    poll_id = polls_collection.insert_one(poll_dict).inserted_id
+    poll_id = (await polls_collection.insert_one(poll_dict)).inserted_id
     return {"message": "Poll created", "id": str(poll_id)}
 
+def _with_stats(poll: dict) -> dict:
+    """Expose the id and compute each option's share of the answers."""
+    poll["id"] = str(poll.pop("_id"))
+    total_count = poll.get("total_count") or 0
+    for option in poll.get("options", []):
+        if "count" in option:
+            option['stat'] = (option['count'] / total_count) * 100 if total_count else 0
+    return poll
+
 @router.get("/")
-def get_polls():
+async def get_polls(user_id: Optional[str] = None):
+    """
+    polls with their tallies; with user_id, "answers" holds that user's own answer only
+    """
     polls = []
-    for poll in polls_collection.find():
-        poll["id"] = str(poll["_id"])  # Convert ObjectId to string
-        del poll['_id']
-        polls.append(poll)
+    async for poll in polls_collection.find({}, POLL_PROJECTION):
+        polls.append(_with_stats(poll))
+    if user_id:
+        votes = await PollVoteModel.get_user_votes(user_id, [poll["id"] for poll in polls])
+        for poll in polls:
+            vote = votes.get(poll["id"])
+            poll["answers"] = [{"user_id": user_id, "answer": vote.get("answer")}] if vote else []
     return {"polls": polls}
 
 @router.post("/answer")
-def answer_poll(pollData: PollAnswerData):
+async def answer_poll(pollData: PollAnswerData):
     pollData = pollData.dict()
     user_id = pollData['user_id']
     answer = pollData['answer']
-    new_answer = {"user_id": user_id, "answer": answer}
-    
-    poll = polls_collection.find_one({"_id": ObjectId(pollData["poll_id"])})
-    if not poll:
+    poll_id = pollData['poll_id']
+    if not ObjectId.is_valid(poll_id):
         raise HTTPException(status_code=404, detail="Poll not found")
-    
-    total_count = poll['total_count'] + 1  # Increment the total count
-    
-    # Update the counts and stats for options
-    for option in poll['options']:
-        if option['text'] == answer:
-            option['count'] += 1
-        option['stat'] = (option['count'] / total_count) * 100  # Update stat for all options
-    
-    # Prepare the update data in one $set operation
-    update_data = {
-        "$push": {"answers": new_answer},  # Add the new answer to the answers array
-        "$set": {
-            "total_count": total_count,  # Update the total count
-            "options": poll['options']  # Update the options array with new counts and stats
-        }
-    }
 
-    # Update the poll in the database
-    polls_collection.update_one(
-        {"_id": ObjectId(pollData['poll_id'])},
-        update_data
+    # The unique vote is what stops a second answer from the same user
+    if not await PollVoteModel.record_vote(poll_id, user_id, [], answer=answer):
+        raise HTTPException(status_code=409, detail="Already answered")
+
+    # Count the answer in one atomic update; stats are derived from the counts on read
+    poll = await polls_collection.find_one_and_update(
+        {"_id": ObjectId(poll_id), "options.text": answer},
+        {"$inc": {"options.$.count": 1, "total_count": 1}},
+        projection=POLL_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
+    if not poll:
+        await PollVoteModel.delete_one({"poll_id": poll_id, "user_id": user_id})
+        raise HTTPException(status_code=404, detail="Poll or option not found")
+
+    poll = _with_stats(poll)
+    await broadcast(CHANNEL_POLLS, poll_id, {
+        "type": EVENT_POLL_UPDATED,
+        "poll_id": poll_id,
+        "options": poll['options'],
+        "total_count": poll['total_count']
+    })
     
     return {"status": "ok"}
 
+async def _forward_events(websocket: WebSocket, subscriber: Subscriber):
+    """Forward hub events to the client until it disconnects or falls behind."""
+    while True:
+        event = await subscriber.next_event()
+        if event is None:
+            return
+        await websocket.send_json(jsonable_encoder(event))
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Read (and ignore) client frames so a disconnect is noticed."""
+    while True:
+        await websocket.receive_text()
+
+@router.websocket("/{poll_id}/ws")
+async def poll_socket(websocket: WebSocket, poll_id: str):
+    """
+    live vote counts of a poll, from any worker
+    """
+    if not ObjectId.is_valid(poll_id) or not (
+        await polls_collection.find_one({"_id": ObjectId(poll_id)}, {"_id": 1})
+        or await PollModel.get_poll_by_id(poll_id)
+    ):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    subscriber = poll_hub.subscribe(poll_id)
+    try:
+        tasks = {
+            asyncio.create_task(_forward_events(websocket, subscriber)),
+            asyncio.create_task(_wait_for_disconnect(websocket)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+        if subscriber.overflowed.is_set():
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        poll_hub.unsubscribe(subscriber)
 
 
 @router.get("/{poll_id}")
-def get_poll(poll_id: str):
-    poll = polls_collection.find_one({"_id": poll_id})
+async def get_poll(poll_id: str):
+    poll = await polls_collection.find_one({"_id": ObjectId(poll_id)}, POLL_PROJECTION) if ObjectId.is_valid(poll_id) else None
     if not poll:
-        raise HTTPException(satus_code=404, detail="Poll not found")
-    return poll
+        raise HTTPException(status_code=404, detail="Poll not found")
+    return _with_stats(poll)
@@ -1,20 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict
 from datetime import datetime
+from bson import ObjectId
 
 # Import your database dependency, event model, and email model
 from controller.database import get_db
 from models.event_model import EventModel
-from models.email_model import EmailModel
+from models.email_model import EmailJobModel, EmailDeliveryModel
+from models.registration_model import RegistrationModel
 from models.user_model import UserModel
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
+from models.mailer import mailer
+from models.tracking_buffer import tracking_buffer, EVENT_OPEN
 
-load_dotenv()
 router = APIRouter(prefix="/promotion", tags=["Event Promotion"])
 
 
@@ -30,33 +28,92 @@ async def create_email_campaign(
     db=Depends(get_db)
 ):
     """
-    Create and send an email campaign to a list of recipients or to all attendees of an event.
-    """
-    # If event_id is provided, fetch all attendee emails from that event
-    user_ids = campaign.recipients
-    for idx, user_id in enumerate(user_ids):
-        user_data = await UserModel.get_user_by_id(user_id)
-        user_ids[idx] = user_data['email']
-    campaign.recipients = user_ids
-    print(user_ids)
-    print("--")
-    print(campaign.recipients)
-
-
-    # Remove duplicates
-    recipient_list = list(set(campaign.recipients))
-
-    # Send the email campaign (adjust to your EmailModel’s actual method signature)
-    # For example:
-    for recipient in recipient_list:
-        await EmailModel.send_email(
-            to=recipient,
-            subject=campaign.subject,
-            body=campaign.body,
-            db=db
+    Create an email campaign to a list of recipients or to all attendees of an event.
+    Delivery happens in the background; poll the returned job for progress.
+    """
+    if campaign.recipients:
+        # Resolve every recipient's email with one query
+        users = await UserModel.load_many_by_ids(campaign.recipients)
+        emails = [user["email"] for user in users if user and user.get("email")]
+    elif campaign.event_id:
+        # If event_id is provided, stream all attendee emails from that event
+        emails = [
+            attendee["email"]
+            async for attendee in RegistrationModel.iter_event_attendees(campaign.event_id)
+            if attendee.get("email")
+        ]
+    else:
+        raise HTTPException(status_code=400, detail="Provide recipients or an event_id")
+
+    job_id = await EmailJobModel.create_job(
+        subject=campaign.subject,
+        body=campaign.body,
+        recipients=emails,
+        event_id=campaign.event_id
+    )
+    mailer.submit(job_id)
+
+    return {"status": True, "job_id": job_id, "total": len(set(emails))}
+
+@router.get("/email-campaign/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_email_job(job_id: str):
+    """
+    progress of a campaign's delivery job
+    """
+    job = await EmailJobModel.get_job(job_id) if ObjectId.is_valid(job_id) else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Email job not found")
+    job.pop("body", None)
+    return job
+
+@router.get("/email-campaign/jobs/{job_id}/deliveries", status_code=status.HTTP_200_OK)
+async def get_email_job_deliveries(job_id: str, status: Optional[str] = None,
+                                   limit: int = Query(100, ge=1, le=200), cursor: Optional[str] = None):
+    """
+    per-recipient delivery status of a campaign's job, one page at a time
+    """
+    try:
+        return await EmailDeliveryModel.get_job_deliveries(job_id, status=status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class TrackingEvent(BaseModel):
+    type: Literal["open", "click"]
+    campaign_id: str
+    user_id: str
+    url: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class TrackingBatch(BaseModel):
+    events: List[TrackingEvent] = Field(..., max_length=1000)
+
+# Transparent 1x1 GIF served as the open pixel
+TRACKING_PIXEL = bytes.fromhex(
+    "47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b"
+)
+
+@router.post("/tracking/events", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_tracking_events(batch: TrackingBatch):
+    """
+    buffer campaign open and click events; they are written in bulk shortly after
+    """
+    accepted = 0
+    for event in batch.events:
+        if not ObjectId.is_valid(event.campaign_id):
+            continue
+        accepted += tracking_buffer.record(
+            event.type, event.campaign_id, event.user_id, url=event.url, timestamp=event.timestamp
         )
+    return {"accepted": accepted}
 
-    return {"status":True} 
+@router.get("/tracking/open/{campaign_id}/{user_id}.gif")
+async def track_open_pixel(campaign_id: str, user_id: str):
+    """
+    open pixel embedded in campaign emails
+    """
+    if ObjectId.is_valid(campaign_id):
+        tracking_buffer.record(EVENT_OPEN, campaign_id, user_id)
+    return Response(content=TRACKING_PIXEL, media_type="image/gif", headers={"Cache-Control": "no-store"})
 
 # --------------------------------
 # 2) Social Media Integration
@@ -140,21 +197,3 @@ async def get_event_page(event_id: str, db=Depends(get_db)):
         "page_content": event.get("page_content", ""),
         "last_modified": event.get("last_modified")
     }
-
-class EmailModel:
-    @staticmethod
-    async def send_email(to: str, subject: str, body: str, db=None):
-        sender_email = os.getenv("EMAIL_SENDER")
-        password = os.getenv("EMAIL_PASSWORD")  # Use App Password if Gmail 2FA is on
-
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = sender_email
-        message["To"] = to
-
-        part = MIMEText(body, "html")
-        message.attach(part)
-
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, password)
-            server.sendmail(sender_email, to, message.as_string())
\ No newline at end of file
@@ -1,50 +1,99 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
-import uuid
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from datetime import datetime
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal, Dict
 from bson import ObjectId
-from typing import Optional, List, Literal
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
+from models.question_model import QuestionModel
 
 router = APIRouter()
 
-client = MongoClient(os.getenv("MONGO_URI")) 
-db = client["SEES"]  
-questions_collection: Collection = db["questions"]
-
 
 class QuestionData(BaseModel):
     event_id: str
     user_id: str
     question: str
-    answer: str
+    answer: Optional[str] = None
+    session_id: Optional[str] = None
+
+class AnswerData(BaseModel):
+    user_id: Optional[str] = None
+    answer_text: str
+
+class AnswerItem(BaseModel):
+    question_id: str
+    answer_text: str
+
+class BatchAnswerData(BaseModel):
+    user_id: Optional[str] = None
+    answers: List[AnswerItem] = Field(..., max_length=500)
+
+class ModerationData(BaseModel):
+    question_ids: List[str] = Field(..., max_length=500)
+    action: Literal["dismiss", "restore"]
+
+
+def _with_legacy_fields(question: Dict) -> Dict:
+    """Add the question/answer field names the web client reads."""
+    question["question"] = question.get("question_text")
+    question["answer"] = question.get("answer_text")
+    return question
+
+def _check_ids(question_ids: List[str]):
+    if not all(ObjectId.is_valid(question_id) for question_id in question_ids):
+        raise HTTPException(status_code=400, detail="Invalid question id")
 
 
 @router.post("/")
-def create_question(question: QuestionData):
-    question = question.dict()
-    qid = questions_collection.insert_one({
-        "event_id": question['event_id'],
-        "user_id": question['user_id'],
-        "question": question['question'],
-        "answer": question['answer']
-    })
-    return {"question":str(qid.inserted_id)}
+async def create_question(question: QuestionData):
+    qid = await QuestionModel.add_question(
+        question.session_id,
+        question.user_id,
+        question.question,
+        event_id=question.event_id,
+        answer_text=question.answer
+    )
+    return {"question": qid}
 
 @router.get("/")
-def get_questions():
-    questions = questions_collection.find()
-    questions = []
-    for question in questions_collection.find():
-        question["id"] = str(question["_id"])  # Convert ObjectId to string
-        del question['_id']
-        questions.append(question)
-    return {"questions": questions}
\ No newline at end of file
+async def get_questions(event_id: Optional[str] = None, session_id: Optional[str] = None,
+                        question_status: Optional[str] = Query(None, alias="status"),
+                        limit: int = Query(0, ge=0)):
+    """
+    questions of a session ranked by votes, or the newest questions of an event or of all events
+    """
+    if session_id:
+        questions = await QuestionModel.get_session_questions(session_id, question_status)
+        if limit:
+            questions = questions[:limit]
+    else:
+        questions = await QuestionModel.list_questions(event_id, question_status, limit)
+    return {"questions": [_with_legacy_fields(question) for question in questions]}
+
+@router.post("/answers")
+async def answer_questions(batch: BatchAnswerData):
+    """
+    answer several questions at once
+    """
+    answers = {item.question_id: item.answer_text for item in batch.answers}
+    _check_ids(list(answers))
+    questions = await QuestionModel.answer_questions(answers, batch.user_id)
+    return {"answered": len(questions), "questions": [_with_legacy_fields(question) for question in questions]}
+
+@router.post("/moderate")
+async def moderate_questions(moderation: ModerationData):
+    """
+    dismiss questions from their session's leaderboard, or restore them
+    """
+    _check_ids(moderation.question_ids)
+    questions = await QuestionModel.moderate_questions(moderation.question_ids, moderation.action)
+    return {"moderated": len(questions), "questions": [_with_legacy_fields(question) for question in questions]}
+
+@router.post("/{question_id}/answer")
+async def answer_question(question_id: str, answer: AnswerData):
+    """
+    answer one question
+    """
+    _check_ids([question_id])
+    question = await QuestionModel.answer_question(question_id, answer.answer_text, answer.user_id)
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return _with_legacy_fields(question)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from models.autocomplete import suggestion_index, SUGGESTION_KINDS
+
+router = APIRouter()
+
+@router.get("/suggest")
+async def suggest(q: str, limit: int = Query(10, ge=1, le=50), types: Optional[List[str]] = Query(None)):
+    """
+    prefix suggestions for event, venue, city and speaker names, served from memory
+    """
+    if types:
+        unknown = [kind for kind in types if kind not in SUGGESTION_KINDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown suggestion types: {unknown}")
+    return {"suggestions": suggestion_index.search(q, limit=limit, kinds=types)}
@@ -36,7 +36,7 @@ async def get_speaker(userId: str):
         event = await EventModel.get_event_by_id(id)
         events.append(event)
     for event in events:
-        materials = get_materials_by_event(event["id"])
+        materials = await get_materials_by_event(event["id"])
         sess = await SessionModel.get_event_sessions(event['id'])
         for idx, sessi in enumerate(sess):
             sessi['materials'] = materials
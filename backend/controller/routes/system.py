@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+from models.cache import model_cache
+from models.hub import chat_hub, poll_hub, question_hub
+from models.pubsub import event_bus
+from models.mailer import mailer
+from models.tracking_buffer import tracking_buffer
+from models.poll_tally import poll_tallies
+from models.question_board import question_boards
+from models.scheduler import scheduler
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    hit, miss and invalidation counters of the model read-through cache
+    """
+    return model_cache.get_stats()
+
+@router.get("/live/stats")
+async def live_stats():
+    """
+    event bus backend, fan-out counters of the chat, poll and Q&A hubs, the live poll tallies and question boards
+    """
+    return {
+        "bus": event_bus.name,
+        "chat": chat_hub.get_stats(),
+        "polls": poll_hub.get_stats(),
+        "questions": question_hub.get_stats(),
+        "poll_tallies": poll_tallies.get_stats(),
+        "question_boards": question_boards.get_stats()
+    }
+
+@router.get("/mailer/stats")
+async def mailer_stats():
+    """
+    queue depth, retries and delivery counters of this worker's mailer
+    """
+    return mailer.get_stats()
+
+@router.get("/tracking/stats")
+async def tracking_stats():
+    """
+    buffered events, duplicates and flush timings of this worker's tracking buffer
+    """
+    return tracking_buffer.get_stats()
+
+@router.get("/scheduler/stats")
+async def scheduler_stats():
+    """
+    leadership, queued timers and job run counters of this worker's scheduler
+    """
+    return scheduler.get_stats()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from pydantic import BaseModel
 from typing import Optional
 from controller.database import get_db
 from models.ticket_model import TicketModel  # Import the TicketModel class
+from controller.services.exports.streaming import export_response
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
@@ -31,6 +32,25 @@ async def create_ticket_endpoint(ticket: TicketCreate, db=Depends(get_db)):
         raise HTTPException(status_code=400, detail="Ticket creation failed")
     return {"id": str(new_ticket_id)}
 
+@router.get("/event/{event_id}")
+async def get_event_tickets_endpoint(event_id: str, ticket_status: Optional[str] = Query(None, alias="status"),
+                                     limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None):
+    try:
+        page = await TicketModel.get_event_tickets_page(event_id, status=ticket_status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"event_id": event_id, "tickets": page["tickets"], "next_cursor": page["next_cursor"]}
+
+@router.get("/event/{event_id}/export")
+async def export_event_tickets_endpoint(event_id: str, format: str = "ndjson",
+                                        ticket_status: Optional[str] = Query(None, alias="status")):
+    return export_response(
+        TicketModel.iter_event_tickets(event_id, status=ticket_status),
+        format,
+        ["id", "ticket_number", "user_id", "event_id", "status", "price", "purchase_date", "checked_in", "check_in_time"],
+        f"tickets-{event_id}"
+    )
+
 @router.get("/{ticket_id}")
 async def get_ticket_endpoint(ticket_id: str, db=Depends(get_db)):
     ticket = await TicketModel.get_ticket_by_id(ticket_id)
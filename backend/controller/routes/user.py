@@ -9,10 +9,10 @@ router = APIRouter()
 async def create_user(user: UserSchema):
     user_dict = user.dict()
     user_dict["_id"] = str(ObjectId())
-    users_collection.insert_one(user_dict)
+    await users_collection.insert_one(user_dict)
     return user_dict
 
 @router.get("/users", response_model=list[UserSchema])
 async def get_users():
-    users = list(users_collection.find({}))
+    users = await users_collection.find({}).to_list(length=None)
     return [{**u, "id": str(u["_id"])} for u in users]
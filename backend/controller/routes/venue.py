@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from controller.database import venues_collection
+from models.venue_model import VenueModel
+from models.search import search_keys
+from models.autocomplete import index_venue
 
 router = APIRouter()
 
@@ -10,14 +13,16 @@ class Venue(BaseModel):
     capacity: int
 
 @router.post("/")
-def create_venue(venue: Venue):
+async def create_venue(venue: Venue):
     venue_dict = venue.dict()
-    venue_id = venues_collection.insert_one(venue_dict).inserted_id
+    venue_dict.update(search_keys(venue_dict, VenueModel.prefix_fields))
+    venue_id = (await venues_collection.insert_one(venue_dict)).inserted_id
+    index_venue(str(venue_id), venue_dict)
     return {"message": "Venue created", "id": str(venue_id)}
 
 @router.get("/{venue_id}")
-def get_venue(venue_id: str):
-    venue = venues_collection.find_one({"_id": venue_id})
+async def get_venue(venue_id: str):
+    venue = await venues_collection.find_one({"_id": venue_id})
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
     return venue
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime, date
+from typing import AsyncIterator, Dict, List
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+def _json_default(value):
+    """Serialize the non-JSON types found in documents."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    # ObjectId, Decimal128 and anything else with a sensible string form
+    return str(value)
+
+def _csv_value(value):
+    """Format a single CSV cell."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    return _json_default(value)
+
+async def ndjson_lines(rows: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    """
+    Encodes rows as newline-delimited JSON, one line per row.
+
+    Args:
+        rows (AsyncIterator[Dict]): Documents to encode.
+
+    Yields:
+        str: One JSON document followed by a newline.
+    """
+    async for row in rows:
+        yield json.dumps(row, default=_json_default) + "\n"
+
+async def csv_lines(rows: AsyncIterator[Dict], fields: List[str]) -> AsyncIterator[str]:
+    """
+    Encodes rows as CSV with a header line. Fields missing from a row are left empty.
+
+    Args:
+        rows (AsyncIterator[Dict]): Documents to encode.
+        fields (List[str]): Column names, in order.
+
+    Yields:
+        str: The header, then one CSV line per row.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow({field: _csv_value(row.get(field)) for field in fields})
+        yield buffer.getvalue()
+
+def export_response(rows: AsyncIterator[Dict], export_format: str, fields: List[str],
+                    filename: str) -> StreamingResponse:
+    """
+    Streams rows to the client as NDJSON or CSV, without holding the result set in memory.
+
+    Args:
+        rows (AsyncIterator[Dict]): Documents to stream, usually from BaseModel.iter_many.
+        export_format (str): "ndjson" or "csv".
+        fields (List[str]): CSV columns, in order (ignored for NDJSON).
+        filename (str): Download name without extension.
+
+    Returns:
+        StreamingResponse: The streaming download.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+
+    if export_format == "csv":
+        body = csv_lines(rows, fields)
+        media_type = "text/csv"
+    else:
+        body = ndjson_lines(rows)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
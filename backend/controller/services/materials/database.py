@@ -1,13 +1,14 @@
-from pymongo import MongoClient
-from pymongo.collection import Collection
 from datetime import datetime
 from pydantic import BaseModel
 from bson import ObjectId
-from typing import Optional, List, Literal
-from dotenv import load_dotenv
-import os
+from pymongo import IndexModel, ASCENDING
+from typing import Dict, Optional, List, Literal
+from controller.database import materials_collection
 
-load_dotenv()
+# Indexes created at startup by models.migrations
+INDEXES = [
+    IndexModel([("event_id", ASCENDING)]),
+]
 
 class EventMaterial(BaseModel):
     event_id: str
@@ -15,11 +16,7 @@ class EventMaterial(BaseModel):
     file_name: Optional[str] = None
     content: Optional[str] = None
 
-client = MongoClient(os.getenv("MONGO_URI")) 
-db = client["SEES"]  
-materials_collection: Collection = db["materials"]
-
-def add_material(data: dict):
+async def add_material(data: dict):
     """
     Adds a new material to the event materials collection.
     
@@ -46,11 +43,11 @@ def add_material(data: dict):
     }
 
     material = EventMaterial(**material_data)
-    result = materials_collection.insert_one(material.dict(by_alias=True))
-    inserted_doc = materials_collection.find_one({"_id": result.inserted_id})
+    result = await materials_collection.insert_one(material.dict(by_alias=True))
+    inserted_doc = await materials_collection.find_one({"_id": result.inserted_id})
     return inserted_doc
 
-def get_materials_by_event(event_id: str) -> List[EventMaterial]:
+async def get_materials_by_event(event_id: str) -> List[EventMaterial]:
     """
     Retrieves all materials for a specific event by event_id.
 
@@ -63,10 +60,30 @@ def get_materials_by_event(event_id: str) -> List[EventMaterial]:
     cursor = materials_collection.find({"event_id": event_id})
     materials = []
 
-    for doc in cursor:
+    async for doc in cursor:
         # Convert ObjectId to string for compatibility with Pydantic
         doc["id"] = str(doc["_id"])
         del doc["_id"]
         materials.append(EventMaterial(**doc))
 
     return materials
+
+async def get_materials_by_events(event_ids: List[str]) -> Dict[str, List[EventMaterial]]:
+    """
+    Retrieves the materials of several events with a single query.
+
+    Args:
+        event_ids (List[str]): IDs of the events.
+
+    Returns:
+        Dict[str, List[EventMaterial]]: Materials keyed by event_id.
+    """
+    materials = {event_id: [] for event_id in event_ids}
+    cursor = materials_collection.find({"event_id": {"$in": list(event_ids)}})
+
+    async for doc in cursor:
+        doc["id"] = str(doc["_id"])
+        del doc["_id"]
+        materials.setdefault(doc["event_id"], []).append(EventMaterial(**doc))
+
+    return materials
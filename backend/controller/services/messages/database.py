@@ -1,30 +1,168 @@
-from pymongo import MongoClient
-from pymongo.collection import Collection
 from datetime import datetime
+from typing import Dict, List, Optional
 from bson import ObjectId
-from dotenv import load_dotenv
-import os
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument
+from controller.database import messages_collection, conversations_collection
 
-load_dotenv()
+# Indexes created at startup by models.migrations
+INDEXES = [
+    IndexModel([("sender", ASCENDING), ("recipient", ASCENDING), ("timestamp", DESCENDING)]),
+    IndexModel([("recipient", ASCENDING), ("sender", ASCENDING), ("timestamp", DESCENDING)]),
+]
+CONVERSATION_INDEXES = [
+    IndexModel([("participants", ASCENDING), ("last_timestamp", DESCENDING)]),
+]
 
-client = MongoClient(os.getenv("MONGO_URI")) 
-db = client["SEES"]  
-messages_collection: Collection = db["messages"] 
+def conversation_key(user_a: str, user_b: str) -> str:
+    """
+    ID of the conversation between two users, the same whoever sends.
+    """
+    return ":".join(sorted([user_a, user_b]))
 
-def insert_message(message_data):
+async def record_conversation_message(message_data: Dict):
+    """
+    Updates the conversation of a message's sender and recipient, creating it if needed:
+    last message, message count and the recipient's unread count.
+    The last message only moves forward, so concurrent sends settle on the newest.
+    """
+    sender, recipient = message_data["sender"], message_data["recipient"]
+    timestamp = message_data["timestamp"]
+    last_message = {
+        "id": str(message_data["_id"]),
+        "sender": sender,
+        "recipient": recipient,
+        "content": message_data["content"],
+        "timestamp": timestamp
+    }
+    await conversations_collection.update_one(
+        {"_id": conversation_key(sender, recipient)},
+        [{"$set": {
+            "participants": sorted([sender, recipient]),
+            "last_message": {"$cond": [
+                {"$gte": [timestamp, {"$ifNull": ["$last_timestamp", timestamp]}]},
+                {"$literal": last_message},
+                "$last_message"
+            ]},
+            "last_timestamp": {"$max": ["$last_timestamp", timestamp]},
+            "message_count": {"$add": [{"$ifNull": ["$message_count", 0]}, 1]},
+            f"unread.{recipient}": {"$add": [{"$ifNull": [f"$unread.{recipient}", 0]}, 1]},
+            f"unread.{sender}": {"$ifNull": [f"$unread.{sender}", 0]}
+        }}],
+        upsert=True
+    )
+
+async def insert_message(message_data):
     message_data["timestamp"] = datetime.utcnow() 
-    result = messages_collection.insert_one(message_data)
+    result = await messages_collection.insert_one(message_data)
+    await record_conversation_message(message_data)
     return result.inserted_id
 
-def get_chat_history(sender: str, recipient: str, limit: int = 20):
+async def get_conversations(user_id: str, limit: int = 0) -> List[Dict]:
+    """
+    Conversations a user takes part in, most recently active first, from one indexed query.
+    """
+    cursor = conversations_collection.find({"participants": user_id}).sort("last_timestamp", DESCENDING)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
+
+async def get_chat_history(sender: str, recipient: str, limit: int = 20, after: Optional[datetime] = None):
+    """
+    The newest messages between two users, oldest first.
+    With after, only the messages sent after that time (up to limit, oldest first),
+    so clients can fetch just what is new since their read cursor.
+    """
     query = {
         "$or": [
             {"sender": sender, "recipient": recipient},
             {"sender": recipient, "recipient": sender}
         ]
     }
-    messages = messages_collection.find(query).sort("timestamp", 1).limit(limit)
-    return messages
+    if after is not None:
+        query["timestamp"] = {"$gt": after}
+        messages = messages_collection.find(query).sort("timestamp", ASCENDING).limit(limit)
+        return await messages.to_list(length=None)
+
+    messages = messages_collection.find(query).sort("timestamp", DESCENDING).limit(limit)
+    return list(reversed(await messages.to_list(length=None)))
+
+async def mark_conversation_read(user_id: str, peer_id: str, message_id: Optional[str] = None) -> Optional[Dict]:
+    """
+    Moves a user's read cursor in a conversation up to a message (the latest if none given)
+    and takes the peer's messages it passes off their unread count. The cursor never moves back.
+    The count is lowered in the same write that moves the cursor, guarded on the cursor it
+    started from, so messages recorded meanwhile stay unread.
+    Returns the user's read state, or None if the conversation or message does not exist.
+    """
+    key = conversation_key(user_id, peer_id)
+    read_at = None
+    if message_id:
+        message = await messages_collection.find_one(
+            {
+                "_id": ObjectId(message_id),
+                "$or": [
+                    {"sender": user_id, "recipient": peer_id},
+                    {"sender": peer_id, "recipient": user_id}
+                ]
+            },
+            {"timestamp": 1}
+        )
+        if not message:
+            return None
+        read_at = message["timestamp"]
+
+    while True:
+        conversation = await conversations_collection.find_one(
+            {"_id": key}, {"last_timestamp": 1, f"read.{user_id}": 1, f"unread.{user_id}": 1}
+        )
+        if not conversation:
+            return None
+        target = read_at if read_at is not None else conversation["last_timestamp"]
+        previous = (conversation.get("read") or {}).get(user_id)
+        if previous is not None and previous >= target:
+            return _read_state(conversation, user_id, peer_id)
+
+        window = {"$lte": target}
+        if previous is not None:
+            window["$gt"] = previous
+        newly_read = await messages_collection.count_documents(
+            {"sender": peer_id, "recipient": user_id, "timestamp": window}
+        )
+        conversation = await conversations_collection.find_one_and_update(
+            {"_id": key, f"read.{user_id}": previous},
+            [{"$set": {
+                f"read.{user_id}": target,
+                f"unread.{user_id}": {"$max": [
+                    {"$subtract": [{"$ifNull": [f"$unread.{user_id}", 0]}, newly_read]}, 0
+                ]}
+            }}],
+            projection={"read": 1, "unread": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if conversation:
+            return _read_state(conversation, user_id, peer_id)
+        # Another read moved the cursor meanwhile; start over from where it is now
+
+def _read_state(conversation: Dict, user_id: str, peer_id: str) -> Dict:
+    return {
+        "peer_id": peer_id,
+        "read_at": (conversation.get("read") or {}).get(user_id),
+        "unread": (conversation.get("unread") or {}).get(user_id, 0)
+    }
+
+async def get_unread_counts(user_id: str) -> Dict[str, int]:
+    """
+    Unread message count per conversation partner, read from the maintained counters.
+    """
+    cursor = conversations_collection.find(
+        {"participants": user_id, f"unread.{user_id}": {"$gt": 0}},
+        {"participants": 1, f"unread.{user_id}": 1}
+    )
+    counts = {}
+    async for conversation in cursor:
+        peer_id = next((other for other in conversation["participants"] if other != user_id), user_id)
+        counts[peer_id] = conversation["unread"][user_id]
+    return counts
 
-def get_message_by_id(message_id: str):
-    return messages_collection.find_one({"_id": ObjectId(message_id)})
+async def get_message_by_id(message_id: str):
+    return await messages_collection.find_one({"_id": ObjectId(message_id)})
@@ -14,9 +14,19 @@ class MessageCreate(BaseModel):
     content: str
 
 class MessageResponse(BaseModel):
+    id: Optional[str] = None
     sender: str
     recipient: str
     content: str
+    timestamp: Optional[datetime] = None
 
 class ChatHistoryResponse(BaseModel):
     messages: List[MessageResponse]
+
+class ReadCursor(BaseModel):
+    peer_id: str
+    message_id: Optional[str] = None  # Latest message if omitted
+
+class MarkReadRequest(BaseModel):
+    user_id: str
+    cursors: List[ReadCursor]
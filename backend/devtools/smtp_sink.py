@@ -0,0 +1,98 @@
+"""
+Local SMTP sink for trying email campaigns without sending real mail.
+
+Accepts every message and prints a line per delivery; with --fail-rate it
+answers a share of RCPT commands with a transient 451 so the mailer's
+retries can be watched. Start it, then point the backend at it:
+
+    cd backend && python -m devtools.smtp_sink --port 1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_USE_SSL=false uvicorn main:app
+"""
+import argparse
+import asyncio
+import random
+from typing import List
+
+
+class SMTPSink:
+    """Minimal SMTP server speaking just enough of the protocol for smtplib."""
+
+    def __init__(self, fail_rate: float = 0.0, quiet: bool = False):
+        self.fail_rate = fail_rate
+        self.quiet = quiet
+        self.messages: List[dict] = []
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection."""
+        def reply(line: str):
+            writer.write((line + "\r\n").encode())
+
+        sender, recipients = None, []
+        reply("220 smtp-sink ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    sender, recipients = command.partition(":")[2].strip(), []
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    if random.random() < self.fail_rate:
+                        reply("451 Try again later")
+                    else:
+                        recipients.append(command.partition(":")[2].strip())
+                        reply("250 OK")
+                elif verb == "DATA":
+                    if not recipients:
+                        reply("503 No valid recipients")
+                        continue
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    size = 0
+                    while (data := await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        size += len(data)
+                    self.messages.append({"from": sender, "to": recipients, "size": size})
+                    if not self.quiet:
+                        print(f"Received {size} bytes from {sender} to {', '.join(recipients)}")
+                    reply("250 OK")
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    reply("250 OK")
+                elif verb == "NOOP":
+                    reply("250 OK")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        finally:
+            await writer.drain()
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Start listening; returns the running server."""
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="share of recipients refused with a transient error")
+    parser.add_argument("--quiet", action="store_true", help="do not print received messages")
+    args = parser.parse_args()
+
+    server = await SMTPSink(args.fail_rate, args.quiet).serve(args.host, args.port)
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from controller.database import init_db
-from controller.routes import questions, materials,messages,events, auth, venue, ticket, session, poll, feedback, chat, stakeholder_attendee, networking_engagement, promotion, resource_management, analytics, payment
+from controller.routes import questions, materials,messages,events, auth, venue, ticket, session, poll, feedback, chat, stakeholder_attendee, networking_engagement, promotion, resource_management, analytics, payment, search, system
 from models.base_model import Database
+from models.loader import loader_scope
+from models.autocomplete import build_suggestion_index
+from models.pubsub import event_bus
+from models.mailer import mailer
+from models.tracking_buffer import tracking_buffer
+from models.poll_tally import poll_tallies
+from models.question_board import question_boards
+from models.scheduler import scheduler
+from models import jobs  # noqa: F401  registers the scheduled job handlers
 
 
 app = FastAPI()
@@ -15,20 +24,38 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+# Scope batched model lookups to a single request
+@app.middleware("http")
+async def request_loader_scope(request, call_next):
+    """Let model loaders share and cache lookups for the duration of a request."""
+    with loader_scope():
+        return await call_next(request)
+
 # Initialize database connection
 @app.on_event("startup")
 async def startup_event():
-    """Establish the database connection when the app starts."""
+    """Establish the database connection, bootstrap indexes, load the suggestion index and start the background services."""
     await Database.connect_db()
+    await init_db()
+    print(f"Suggestion index loaded with {await build_suggestion_index()} names")
+    await event_bus.start()
+    await mailer.start()
+    await tracking_buffer.start()
+    await poll_tallies.start()
+    await question_boards.start()
+    await scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close the database connection when the app shuts down."""
+    """Stop the background services, flushing what they hold, and close the database connection when the app shuts down."""
+    await scheduler.stop()
+    await question_boards.stop()
+    await poll_tallies.stop()
+    await tracking_buffer.stop()
+    await mailer.stop()
+    await event_bus.stop()
     await Database.close_db()
 
-# Initialize indexes for the collections (this is part of your init_db function)
-#init_db()
-
 # Register routes
 app.include_router(questions.router, prefix="/questions", tags=["Questions"])
 app.include_router(materials.router, prefix="/materials", tags=["Materials"])
@@ -47,4 +74,6 @@ app.include_router(promotion.router)
 app.include_router(resource_management.router)
 app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 app.include_router(payment.router, prefix="/payment", tags=["Payment"])
+app.include_router(search.router, prefix="/search", tags=["Search"])
+app.include_router(system.router, prefix="/system", tags=["System"])
 
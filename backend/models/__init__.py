@@ -9,16 +9,18 @@ from .base_model import BaseModel, Database
 # Import all other models
 from .user_model import UserModel
 from .event_model import EventModel
+from .registration_model import RegistrationModel
 from .session_model import SessionModel
 from .venue_model import VenueModel
 from .ticket_model import TicketModel
 from .feedback_model import FeedbackModel
-from .poll_model import PollModel
-from .question_model import QuestionModel
-from .chat_model import ChatRoomModel, ChatMessageModel
-from .email_model import EmailCampaignModel
+from .poll_model import PollModel, PollVoteModel
+from .question_model import QuestionModel, QuestionVoteModel
+from .chat_model import ChatRoomModel, ChatMessageModel, ChatReadModel
+from .email_model import EmailCampaignModel, EmailTrackingModel, EmailJobModel, EmailDeliveryModel
 from .analytics_model import EventAnalyticsModel, FeedbackAnalyticsModel, ReportConfigModel
 from .payment_model import PaymentModel, RefundModel, DiscountCodeModel, SponsorshipModel
+from .schedule_model import ScheduledJobModel, SchedulerLockModel
 
 # Export all models
 __all__ = [
@@ -26,20 +28,29 @@ __all__ = [
     'BaseModel',
     'UserModel',
     'EventModel',
+    'RegistrationModel',
     'SessionModel',
     'VenueModel',
     'TicketModel',
     'FeedbackModel', 
     'PollModel',
+    'PollVoteModel',
     'QuestionModel',
+    'QuestionVoteModel',
     'ChatRoomModel',
     'ChatMessageModel',
+    'ChatReadModel',
     'EmailCampaignModel',
+    'EmailTrackingModel',
+    'EmailJobModel',
+    'EmailDeliveryModel',
     'EventAnalyticsModel',
     'FeedbackAnalyticsModel',
     'ReportConfigModel',
     'PaymentModel',
     'RefundModel',
     'DiscountCodeModel',
-    'SponsorshipModel'
+    'SponsorshipModel',
+    'ScheduledJobModel',
+    'SchedulerLockModel'
 ]
\ No newline at end of file
@@ -3,10 +3,12 @@ Analytics model module for handling analytics and reporting functionality.
 Based on the analytics schemas.
 """
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 from .base_model import BaseModel
+from .scheduler import scheduler, JOB_SEND_REPORT
 
 
 class EventAnalyticsModel(BaseModel):
@@ -15,6 +17,9 @@ class EventAnalyticsModel(BaseModel):
     Handles all database interactions for event analytics.
     """
     collection_name = "event_analytics"
+    indexes = [
+        IndexModel([("event_id", ASCENDING)], unique=True),
+    ]
     
     @classmethod
     async def create_analytics(cls, event_id: str) -> str:
@@ -44,8 +49,7 @@ class EventAnalyticsModel(BaseModel):
             "feedback_submission_rate": 0.0,
             "average_event_rating": 0.0,
             "average_session_rating": 0.0,
-            "session_ratings": {},
-            "attendance_timeline": []
+            "session_ratings": {}
         }
         
         analytics_id = await cls.insert_one(analytics_data)
@@ -68,88 +72,89 @@ class EventAnalyticsModel(BaseModel):
     async def update_registration_count(cls, event_id: str, increment: int = 1) -> Optional[Dict]:
         """
         Update the registration count for an event.
+        Runs as a single atomic upsert so concurrent registrations never lose counts;
+        the timeline point goes to AttendanceTimelineModel, keeping this document small.
         
         Args:
             event_id: Event ID
-            increment: Amount to increment by (default: 1)
+            increment: Amount to increment by (default: 1, negative for cancellations)
             
         Returns:
-            Dict: Updated analytics document or None if not found
+            Dict: Updated analytics document
         """
-        analytics = await cls.get_analytics_by_event_id(event_id)
-        
-        if not analytics:
-            # Create analytics record if it doesn't exist
-            await cls.create_analytics(event_id)
-            analytics = await cls.get_analytics_by_event_id(event_id)
-            
-        total_registrations = analytics.get("total_registrations", 0) + increment
-        
-        # Calculate check-in rate
-        total_check_ins = analytics.get("total_check_ins", 0)
-        check_in_rate = (total_check_ins / total_registrations * 100) if total_registrations > 0 else 0
-        
-        # Add timestamp to timeline
         now = datetime.now(timezone.utc)
-        attendance_timeline = analytics.get("attendance_timeline", [])
-        attendance_timeline.append({
-            "timestamp": now,
-            "action": "registration",
-            "total_registrations": total_registrations,
-            "total_check_ins": total_check_ins
-        })
-        
-        return await cls.update_one(
-            {"event_id": event_id},
-            {"$set": {
-                "total_registrations": total_registrations,
-                "check_in_rate": round(check_in_rate, 2),
-                "attendance_timeline": attendance_timeline
-            }}
+        analytics = await cls._increment_count(event_id, "total_registrations", increment, now)
+        await AttendanceTimelineModel.record(
+            event_id,
+            "registration" if increment >= 0 else "cancellation",
+            analytics.get("total_registrations", 0),
+            analytics.get("total_check_ins", 0),
+            now
         )
+        return analytics
     
     @classmethod
     async def update_check_in_count(cls, event_id: str, increment: int = 1) -> Optional[Dict]:
         """
         Update the check-in count for an event.
+        Runs as a single atomic upsert, like update_registration_count.
         
         Args:
             event_id: Event ID
             increment: Amount to increment by (default: 1)
             
         Returns:
-            Dict: Updated analytics document or None if not found
+            Dict: Updated analytics document
         """
-        analytics = await cls.get_analytics_by_event_id(event_id)
-        
-        if not analytics:
-            # Create analytics record if it doesn't exist
-            await cls.create_analytics(event_id)
-            analytics = await cls.get_analytics_by_event_id(event_id)
-            
-        total_check_ins = analytics.get("total_check_ins", 0) + increment
-        
-        # Calculate check-in rate
-        total_registrations = analytics.get("total_registrations", 0)
-        check_in_rate = (total_check_ins / total_registrations * 100) if total_registrations > 0 else 0
-        
-        # Add timestamp to timeline
         now = datetime.now(timezone.utc)
-        attendance_timeline = analytics.get("attendance_timeline", [])
-        attendance_timeline.append({
-            "timestamp": now,
-            "action": "check_in",
-            "total_registrations": total_registrations,
-            "total_check_ins": total_check_ins
-        })
+        analytics = await cls._increment_count(event_id, "total_check_ins", increment, now)
+        await AttendanceTimelineModel.record(
+            event_id,
+            "check_in",
+            analytics.get("total_registrations", 0),
+            analytics.get("total_check_ins", 0),
+            now
+        )
+        return analytics
+    
+    @classmethod
+    async def _increment_count(cls, event_id: str, counter: str, increment: int,
+                               now: datetime) -> Dict:
+        """
+        Increment a registration or check-in counter and recompute the check-in rate,
+        creating the analytics document if needed, in one atomic pipeline update.
         
+        Args:
+            event_id: Event ID
+            counter: "total_registrations" or "total_check_ins"
+            increment: Amount to increment by
+            now: Time of the change
+            
+        Returns:
+            Dict: Updated analytics document
+        """
         return await cls.update_one(
             {"event_id": event_id},
-            {"$set": {
-                "total_check_ins": total_check_ins,
-                "check_in_rate": round(check_in_rate, 2),
-                "attendance_timeline": attendance_timeline
-            }}
+            [
+                {"$set": {
+                    "date": {"$ifNull": ["$date", now]},
+                    "total_registrations": {"$ifNull": ["$total_registrations", 0]},
+                    "total_check_ins": {"$ifNull": ["$total_check_ins", 0]}
+                }},
+                {"$set": {counter: {"$add": [f"${counter}", increment]}}},
+                {"$set": {
+                    # Calculate check-in rate
+                    "check_in_rate": {"$cond": [
+                        {"$gt": ["$total_registrations", 0]},
+                        {"$round": [{"$multiply": [
+                            {"$divide": ["$total_check_ins", "$total_registrations"]}, 100
+                        ]}, 2]},
+                        0
+                    ]}
+                }}
+            ],
+            upsert=True,
+            projection={"attendance_timeline": 0}
         )
     
     @classmethod
@@ -331,12 +336,72 @@ class EventAnalyticsModel(BaseModel):
         }
 
 
+class AttendanceTimelineModel(BaseModel):
+    """
+    Model for the attendance timeline of events.
+    One small document per registration, cancellation or check-in, so a
+    registration rush adds documents instead of growing the event's
+    analytics document with every signup.
+    """
+    collection_name = "attendance_timeline"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("timestamp", ASCENDING)]),
+    ]
+    
+    @classmethod
+    async def record(cls, event_id: str, action: str, total_registrations: int,
+                     total_check_ins: int, timestamp: Optional[datetime] = None) -> str:
+        """
+        Add a point to an event's attendance timeline.
+        
+        Args:
+            event_id: Event ID
+            action: "registration", "cancellation" or "check_in"
+            total_registrations: Registrations after the action
+            total_check_ins: Check-ins after the action
+            timestamp: When it happened (defaults to now)
+            
+        Returns:
+            str: ID of the timeline point
+        """
+        point_id = await cls.insert_one({
+            "event_id": event_id,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+            "action": action,
+            "total_registrations": total_registrations,
+            "total_check_ins": total_check_ins
+        })
+        return str(point_id)
+    
+    @classmethod
+    async def get_timeline(cls, event_id: str, limit: int = 0) -> List[Dict]:
+        """
+        Get an event's attendance timeline, oldest first.
+        
+        Args:
+            event_id: Event ID
+            limit: Maximum number of points (0 for all)
+            
+        Returns:
+            List[Dict]: Timeline points
+        """
+        return await cls.find_many(
+            {"event_id": event_id},
+            limit=limit,
+            sort=[("timestamp", ASCENDING)],
+            projection={"_id": 0, "event_id": 0}
+        )
+
+
 class FeedbackAnalyticsModel(BaseModel):
     """
     Model for feedback analytics data operations.
     Handles all database interactions for feedback analytics.
     """
     collection_name = "feedback_analytics"
+    indexes = [
+        IndexModel([("event_id", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_feedback_analytics(cls, event_id: str) -> str:
@@ -648,6 +713,17 @@ class ReportConfigModel(BaseModel):
     Handles all database interactions for report configuration.
     """
     collection_name = "report_configs"
+    indexes = [
+        IndexModel([("event_id", ASCENDING)]),
+        IndexModel([("is_scheduled", ASCENDING)]),
+    ]
+    # Time between runs of a scheduled report, by schedule_frequency
+    SCHEDULE_INTERVALS = {
+        "hourly": timedelta(hours=1),
+        "daily": timedelta(days=1),
+        "weekly": timedelta(weeks=1),
+        "monthly": timedelta(days=30),
+    }
     
     @classmethod
     async def create_report_config(cls, event_id: str, name: str, report_type: str,
@@ -709,6 +785,7 @@ class ReportConfigModel(BaseModel):
             config_data["schedule_frequency"] = schedule_frequency
             
         config_id = await cls.insert_one(config_data)
+        await cls.arm_schedule(str(config_id), config_data)
         return str(config_id)
     
     @classmethod
@@ -755,10 +832,13 @@ class ReportConfigModel(BaseModel):
         ]
         filtered_update = {k: v for k, v in update_data.items() if k in allowed_fields}
         
-        return await cls.update_one(
+        config = await cls.update_one(
             {"_id": ObjectId(config_id)},
             {"$set": filtered_update}
         )
+        if config and ("is_scheduled" in filtered_update or "schedule_frequency" in filtered_update):
+            await cls.arm_schedule(config_id, config)
+        return config
     
     @classmethod
     async def delete_report_config(cls, config_id: str) -> bool:
@@ -772,8 +852,56 @@ class ReportConfigModel(BaseModel):
             bool: True if deleted, False otherwise
         """
         deleted_count = await cls.delete_one({"_id": ObjectId(config_id)})
+        if deleted_count > 0:
+            await scheduler.cancel(f"report:{config_id}")
         return deleted_count > 0
     
+    @classmethod
+    def next_run_at(cls, config: Dict, after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        When a scheduled report is next due.
+        
+        Args:
+            config: Report config document
+            after: Time of the previous run (defaults to now)
+            
+        Returns:
+            datetime: Next run time, or None if the report is not scheduled
+        """
+        interval = cls.SCHEDULE_INTERVALS.get(config.get("schedule_frequency"))
+        if not config.get("is_scheduled") or interval is None:
+            return None
+        return (after or datetime.now(timezone.utc)) + interval
+    
+    @classmethod
+    async def arm_schedule(cls, config_id: str, config: Dict):
+        """
+        Set or remove a report config's timer to match its schedule.
+        
+        Args:
+            config_id: Report config ID
+            config: Report config document
+        """
+        run_at = cls.next_run_at(config)
+        if run_at is None:
+            await scheduler.cancel(f"report:{config_id}")
+        else:
+            await scheduler.schedule(f"report:{config_id}", JOB_SEND_REPORT, run_at, {"config_id": config_id})
+    
+    @classmethod
+    async def record_distribution(cls, config_id: str, distribution: Dict):
+        """
+        Remember the last time a scheduled report went out.
+        
+        Args:
+            config_id: Report config ID
+            distribution: Result of distribute_report
+        """
+        await cls.update_one(
+            {"_id": ObjectId(config_id)},
+            {"$set": {"last_generated_at": datetime.now(timezone.utc), "last_distribution": distribution}}
+        )
+    
     @classmethod
     async def generate_report(cls, config_id: str) -> Dict:
         """
@@ -814,7 +942,7 @@ class ReportConfigModel(BaseModel):
                     "registrations": analytics.get("total_registrations", 0),
                     "check_ins": analytics.get("total_check_ins", 0),
                     "check_in_rate": analytics.get("check_in_rate", 0),
-                    "timeline": analytics.get("attendance_timeline", [])
+                    "timeline": await AttendanceTimelineModel.get_timeline(event_id)
                 }
                 
         if report_type == "engagement" or report_type == "comprehensive":
@@ -0,0 +1,199 @@
+"""
+Autocomplete module serving name suggestions from memory.
+Keeps a sorted array of normalized names for events, venues (name and
+city) and speakers, so a prefix lookup is a binary search rather than a
+database query. Built once at startup and kept current by the models.
+"""
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .search import normalize
+
+
+# Kinds of suggestions served by the index
+SUGGEST_EVENT = "event"
+SUGGEST_VENUE = "venue"
+SUGGEST_CITY = "city"
+SUGGEST_SPEAKER = "speaker"
+SUGGESTION_KINDS = (SUGGEST_EVENT, SUGGEST_VENUE, SUGGEST_CITY, SUGGEST_SPEAKER)
+
+# Candidates ranked per requested suggestion, and the minimum window
+CANDIDATES_PER_SUGGESTION = 5
+MIN_CANDIDATES = 50
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index.
+    Every word of a label is a key, so "Data Science Summit" is found by
+    "data", "sci" or "summit". Entries are (key, kind, doc_id) tuples
+    kept in sorted order; lookups bisect to the first key >= prefix and
+    scan while keys still start with it.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str, str]] = []
+        self._labels: Dict[Tuple[str, str], str] = {}
+        self._keys: Dict[Tuple[str, str], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @staticmethod
+    def _keys_for(label: str) -> List[str]:
+        """Index keys for a label: the label from each word onwards."""
+        words = normalize(label).split(" ")
+        return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words)) if words[i]))
+
+    def add(self, kind: str, doc_id: str, label: Optional[str]):
+        """
+        Add or replace the label of a document.
+
+        Args:
+            kind: Suggestion kind (event, venue, city or speaker)
+            doc_id: ID of the document the label belongs to
+            label: Text to suggest; an empty label removes the entry
+        """
+        doc_id = str(doc_id)
+        self.remove(kind, doc_id)
+        if not label or not label.strip():
+            return
+
+        keys = self._keys_for(label)
+        for key in keys:
+            bisect.insort(self._entries, (key, kind, doc_id))
+        self._labels[(kind, doc_id)] = label.strip()
+        self._keys[(kind, doc_id)] = keys
+
+    def remove(self, kind: str, doc_id: str):
+        """
+        Remove the label of a document, if indexed.
+
+        Args:
+            kind: Suggestion kind
+            doc_id: ID of the document
+        """
+        doc_id = str(doc_id)
+        keys = self._keys.pop((kind, doc_id), None)
+        if keys is None:
+            return
+        del self._labels[(kind, doc_id)]
+        for key in keys:
+            position = bisect.bisect_left(self._entries, (key, kind, doc_id))
+            if position < len(self._entries) and self._entries[position] == (key, kind, doc_id):
+                del self._entries[position]
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
+        self._labels.clear()
+        self._keys.clear()
+
+    def search(self, prefix: str, limit: int = 10,
+               kinds: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Find labels with a word starting with a prefix.
+
+        Args:
+            prefix: Prefix as typed by the user
+            limit: Maximum number of suggestions
+            kinds: Optional suggestion kinds to include
+
+        Returns:
+            List[Dict]: Suggestions with "type", "id" and "label", best match first
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        kinds = set(kinds) if kinds else None
+
+        # Scan a bounded window of candidates so very common prefixes stay fast
+        max_candidates = max(limit * CANDIDATES_PER_SUGGESTION, MIN_CANDIDATES)
+        matches = {}
+        position = bisect.bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and len(matches) < max_candidates:
+            key, kind, doc_id = self._entries[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            if kinds is not None and kind not in kinds:
+                continue
+            label = self._labels[(kind, doc_id)]
+            # Several venues share a city; suggest it once
+            dedupe_key = (kind, normalize(label)) if kind == SUGGEST_CITY else (kind, doc_id)
+            if dedupe_key not in matches or len(key) > len(matches[dedupe_key][0]):
+                matches[dedupe_key] = (key, kind, doc_id, label)
+
+        # Matches at the start of the label first, then shorter labels
+        def rank(match):
+            key, _, _, label = match
+            normalized = normalize(label)
+            return (len(normalized) - len(key), len(normalized), normalized)
+
+        ranked = sorted(matches.values(), key=rank)
+        return [
+            {"type": kind, "id": doc_id, "label": label}
+            for _, kind, doc_id, label in ranked[:limit]
+        ]
+
+
+# Process-wide index served by /search/suggest
+suggestion_index = PrefixIndex()
+
+
+def speaker_label(user: Dict) -> str:
+    """Display name used for a speaker suggestion."""
+    name = f"{user.get('first_name') or ''} {user.get('last_name') or ''}".strip()
+    return name or user.get("email", "")
+
+
+def index_event(event_id: str, event: Dict):
+    """Add or refresh an event's suggestion."""
+    if "name" in event:
+        suggestion_index.add(SUGGEST_EVENT, event_id, event["name"])
+
+
+def index_venue(venue_id: str, venue: Dict):
+    """Add or refresh a venue's name and city suggestions."""
+    if "name" in venue:
+        suggestion_index.add(SUGGEST_VENUE, venue_id, venue["name"])
+    if "city" in venue:
+        suggestion_index.add(SUGGEST_CITY, venue_id, venue["city"])
+
+
+def index_user(user_id: str, user: Optional[Dict]):
+    """Add, refresh or drop a user's speaker suggestion depending on their role."""
+    if user and user.get("role") == "speaker":
+        suggestion_index.add(SUGGEST_SPEAKER, user_id, speaker_label(user))
+    else:
+        suggestion_index.remove(SUGGEST_SPEAKER, user_id)
+
+
+def unindex(kind: str, doc_id: str):
+    """Drop a deleted document's suggestions."""
+    suggestion_index.remove(kind, doc_id)
+    if kind == SUGGEST_VENUE:
+        suggestion_index.remove(SUGGEST_CITY, doc_id)
+
+
+async def build_suggestion_index() -> int:
+    """
+    Load every event, venue and speaker name into the suggestion index.
+
+    Returns:
+        int: Number of labels indexed
+    """
+    from .event_model import EventModel
+    from .venue_model import VenueModel
+    from .user_model import UserModel
+
+    suggestion_index.clear()
+    async for event in EventModel.iter_many({}, projection={"name": 1}):
+        index_event(event["id"], event)
+    async for venue in VenueModel.iter_many({}, projection={"name": 1, "city": 1}):
+        index_venue(venue["id"], venue)
+    async for user in UserModel.iter_many(
+        {"role": "speaker"}, projection={"first_name": 1, "last_name": 1, "email": 1, "role": 1}
+    ):
+        index_user(user["id"], user)
+    return len(suggestion_index)
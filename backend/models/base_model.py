@@ -1,36 +1,42 @@
 """
 Base model module providing common database operations for all models.
 """
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from datetime import datetime, timezone
 from bson import ObjectId
-from pymongo import ReturnDocument
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from controller.database import MONGO_URI, DB_NAME
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+from pymongo import IndexModel, ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from controller.database import DatabaseSingleton, DB_NAME
+from .loader import BatchLoader, get_request_loader, clear_request_loader
+from .cache import model_cache
+from .pagination import page_sort, decode_cursor, keyset_filter, cursor_for
 
 
-def convert_objectids(obj):
-    """
-    Recursively convert ObjectId values in a dict or list to strings.
-    """
-    if isinstance(obj, dict):
-        return {k: convert_objectids(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_objectids(item) for item in obj]
-    elif isinstance(obj, ObjectId):
-        return str(obj)
-    else:
-        return obj
+class ObjectIdDecoder(TypeDecoder):
+    """Decode BSON ObjectIds straight to their hex strings."""
+    bson_type = ObjectId
+    
+    def transform_bson(self, value):
+        return str(value)
+
+
+# Codec options for every model collection. The driver applies the decoder
+# while it builds each document, so results come back JSON-ready and are
+# never walked or copied again in Python. Queries still take ObjectId values.
+MODEL_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([ObjectIdDecoder()]))
 
 
 class Database:
     """
     Asynchronous Singleton Database connection manager.
-    Handles connection to MongoDB using Motor async driver.
+    Exposes the application's shared Motor client to the models.
     """
     _instance = None
     _client: AsyncIOMotorClient = None
     _db: AsyncIOMotorDatabase = None
+    # Model collections, opened once with MODEL_CODEC_OPTIONS
+    _collections: Dict[str, AsyncIOMotorCollection] = {}
 
     def __new__(cls):
         """Singleton pattern to ensure only one database connection."""
@@ -42,8 +48,8 @@ class Database:
     async def connect_db(cls):
         """Initialize the database connection."""
         if cls._client is None:
-            cls._client = AsyncIOMotorClient(MONGO_URI)
-            cls._db = cls._client[DB_NAME]
+            cls._client = DatabaseSingleton.get_client()
+            cls._db = DatabaseSingleton.get_db()
             print(f"Connected to MongoDB: {DB_NAME}")
 
     @classmethod
@@ -57,7 +63,10 @@ class Database:
     async def close_db(cls):
         """Close the database connection."""
         if cls._client:
-            cls._client.close()
+            DatabaseSingleton.close()
+            cls._client = None
+            cls._db = None
+            cls._collections = {}
             print("MongoDB connection closed")
 
 
@@ -67,6 +76,35 @@ class BaseModel:
     Provides common database operations.
     """
     collection_name: str = None
+    # Indexes this model's queries rely on, created at startup by models.migrations
+    indexes: List[IndexModel] = []
+    # Query shapes seen without a supporting index, shared by all models
+    unindexed_queries: Dict[str, List[str]] = {}
+    # Seconds this model's entries stay in model_cache (None for CACHE_TTL_SECONDS)
+    cache_ttl: Optional[float] = None
+    
+    @classmethod
+    def _is_indexed(cls, query: Dict) -> bool:
+        """Check whether some declared index can serve a query."""
+        fields = {key for key in query if not key.startswith("$")}
+        leading_keys = {"_id"} | {next(iter(index.document["key"])) for index in cls.indexes}
+        if fields & leading_keys or "$text" in query:
+            return True
+        if "$or" in query:
+            return all(cls._is_indexed(branch) for branch in query["$or"])
+        if "$and" in query:
+            return any(cls._is_indexed(branch) for branch in query["$and"])
+        return False
+    
+    @classmethod
+    def _check_query_indexed(cls, query: Optional[Dict]):
+        """Report, once per shape, a query that no declared index supports."""
+        if not query or cls._is_indexed(query):
+            return
+        shape = f"{cls.collection_name}:{','.join(sorted(query))}"
+        if shape not in BaseModel.unindexed_queries:
+            BaseModel.unindexed_queries[shape] = sorted(query)
+            print(f"[{cls.__name__} WARNING] Query on {cls.collection_name} has no supporting index: {sorted(query)}")
     
     @classmethod
     async def get_collection(cls):
@@ -75,24 +113,43 @@ class BaseModel:
             raise ConnectionError("Database connection not established")
         if cls.collection_name is None or cls.collection_name == "":
             raise ValueError(f"collection_name not set for {cls.__name__}")
-        return Database._db[cls.collection_name]
+        collection = Database._collections.get(cls.collection_name)
+        if collection is None:
+            collection = Database._db.get_collection(cls.collection_name, codec_options=MODEL_CODEC_OPTIONS)
+            Database._collections[cls.collection_name] = collection
+        return collection
+    
+    @staticmethod
+    def _with_id(result: Optional[Dict]) -> Optional[Dict]:
+        """Expose a document's _id as "id", in place."""
+        if result and '_id' in result:
+            result['id'] = result.pop('_id')
+        return result
     
     @classmethod
-    async def find_one(cls, query: Dict):
+    async def find_one(cls, query: Dict, projection: Optional[Dict] = None):
         """Find a single document by query."""
+        cls._check_query_indexed(query)
         collection = await cls.get_collection()
-        result = await collection.find_one(query)
-        if result and '_id' in result:
-            result['id'] = str(result['_id'])
-            # Optionally remove the original _id field:
-            del result['_id']
-        return convert_objectids(result)
+        return cls._with_id(await collection.find_one(query, projection))
     
     @classmethod
-    async def find_many(cls, query: Dict, limit: int = 0, skip: int = 0, sort=None):
-        """Find multiple documents by query with pagination and sorting."""
+    async def find_many(cls, query: Dict, limit: int = 0, skip: int = 0, sort=None,
+                        projection: Optional[Dict] = None, cursor: Optional[str] = None):
+        """
+        Find multiple documents by query with pagination and sorting.
+        When a cursor is given, keyset pagination is used instead of skip:
+        only documents sorting after the cursor are returned, with _id
+        appended to the sort as a tie-breaker.
+        """
+        if cursor is not None:
+            sort = page_sort(sort)
+            if cursor:
+                query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor))]}
+            skip = 0
+        cls._check_query_indexed(query)
         collection = await cls.get_collection()
-        cursor = collection.find(query)
+        cursor = collection.find(query, projection)
         
         if skip:
             cursor = cursor.skip(skip)
@@ -102,13 +159,132 @@ class BaseModel:
             cursor = cursor.sort(sort)
             
         results = await cursor.to_list(length=None)
-        new_results = []
         for result in results:
-            if '_id' in result:
-                result['id'] = str(result['_id'])
-                del result['_id']
-            new_results.append(convert_objectids(result))
-        return new_results
+            cls._with_id(result)
+        return results
+    
+    @classmethod
+    async def iter_many(cls, query: Dict, sort=None, projection: Optional[Dict] = None,
+                        batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream documents matching a query without loading the whole result.
+        
+        Args:
+            query: Query filter
+            sort: List of (field, direction) pairs
+            projection: Optional projection
+            batch_size: Number of documents fetched from the server per round trip
+            
+        Yields:
+            Dict: Documents, one at a time
+        """
+        cls._check_query_indexed(query)
+        collection = await cls.get_collection()
+        cursor = collection.find(query, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        
+        async for result in cursor:
+            yield cls._with_id(result)
+    
+    @classmethod
+    async def find_page(cls, query: Dict, limit: int = 50, sort=None,
+                        cursor: Optional[str] = None, projection: Optional[Dict] = None) -> Dict:
+        """
+        Find one page of documents using keyset pagination.
+        
+        Args:
+            query: Query filter
+            limit: Maximum number of documents on the page (0 for all remaining)
+            sort: List of (field, direction) pairs
+            cursor: Cursor returned with the previous page, None for the first page
+            projection: Optional projection (sort fields are always included)
+            
+        Returns:
+            Dict: "items" on this page and "next_cursor" (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        sort = page_sort(sort)
+        if projection and any(value for value in projection.values()):
+            projection = {**projection, **{field: 1 for field, _ in sort}}
+        
+        # Fetch one extra document to learn whether another page follows
+        items = await cls.find_many(
+            query, limit=limit + 1 if limit else 0, sort=sort, projection=projection, cursor=cursor or ""
+        )
+        next_cursor = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_cursor = cursor_for(items[-1], sort)
+        return {"items": items, "next_cursor": next_cursor}
+    
+    @classmethod
+    async def _document_key(cls, doc_id) -> str:
+        """Cache key of a document, in the collection's current epoch."""
+        epoch = await model_cache.epoch(cls.collection_name)
+        return f"{cls.collection_name}:id:{epoch}:{doc_id}"
+    
+    @classmethod
+    async def find_by_id_cached(cls, doc_id: str) -> Optional[Dict]:
+        """
+        Find a document by ID through the read-through cache.
+        
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            Dict: Document or None if not found
+            
+        Raises:
+            bson.errors.InvalidId: If doc_id is not a valid ObjectId
+        """
+        object_id = ObjectId(doc_id)
+        return await model_cache.get_or_load(
+            cls.collection_name,
+            await cls._document_key(object_id),
+            lambda: cls.find_one({"_id": object_id}),
+            cls.cache_ttl
+        )
+    
+    @classmethod
+    async def find_many_cached(cls, key: str, query: Dict, sort=None,
+                               projection: Optional[Dict] = None) -> List[Dict]:
+        """
+        Find documents through the read-through cache.
+        The entry is retired by any write to the collection.
+        
+        Args:
+            key: Key identifying the query and its parameters
+            query: Query filter
+            sort: List of (field, direction) pairs
+            projection: Optional projection
+            
+        Returns:
+            List[Dict]: Matching documents
+        """
+        generation = await model_cache.generation(cls.collection_name)
+        return await model_cache.get_or_load(
+            cls.collection_name,
+            f"{cls.collection_name}:query:{generation}:{key}",
+            lambda: cls.find_many(query, sort=sort, projection=projection),
+            cls.cache_ttl
+        )
+    
+    @classmethod
+    async def invalidate_cache(cls, *doc_ids, all_documents: bool = False):
+        """
+        Drop cached entries after a write to this model's collection.
+        Writes through BaseModel do this themselves; call it after writing
+        to the collection directly.
+        
+        Args:
+            doc_ids: IDs of the documents written
+            all_documents: Retire every cached document (for writes whose targets are unknown)
+        """
+        keys = [await cls._document_key(doc_id) for doc_id in doc_ids if doc_id is not None]
+        await model_cache.invalidate(cls.collection_name, *keys, all_documents=all_documents)
     
     @classmethod
     async def insert_one(cls, document: Dict):
@@ -120,35 +296,105 @@ class BaseModel:
         
         collection = await cls.get_collection()
         result = await collection.insert_one(document)
+        await cls.invalidate_cache(result.inserted_id)
         return result.inserted_id
     
     @classmethod
-    async def update_one(cls, query: Dict, update: Dict, upsert: bool = False):
-        """Update a single document."""
+    async def update_one(cls, query: Dict, update, upsert: bool = False,
+                         projection: Optional[Dict] = None):
+        """Update a single document (update may be an operator dict or a pipeline)."""
+        cls._check_query_indexed(query)
         collection = await cls.get_collection()
         result = await collection.find_one_and_update(
             query, 
             update, 
+            projection=projection,
             upsert=upsert,
             return_document=ReturnDocument.AFTER
         )
-        if result and '_id' in result:
-            result['id'] = str(result['_id'])
-            del result['_id']
-        return convert_objectids(result)
+        clear_request_loader(cls)
+        await cls.invalidate_cache(result.get("_id") if result else None)
+        return cls._with_id(result)
+    
+    @classmethod
+    async def update_many(cls, query: Dict, update) -> int:
+        """Update every document matching a query."""
+        cls._check_query_indexed(query)
+        collection = await cls.get_collection()
+        result = await collection.update_many(query, update)
+        clear_request_loader(cls)
+        await cls.invalidate_cache(all_documents=True)
+        return result.modified_count
     
     @classmethod
     async def delete_one(cls, query: Dict):
         """Delete a single document."""
+        cls._check_query_indexed(query)
         collection = await cls.get_collection()
-        result = await collection.delete_one(query)
+        # Learn the deleted document's ID so its cache entry can be dropped
+        deleted = await collection.find_one_and_delete(query, projection={"_id": 1})
+        clear_request_loader(cls)
+        if deleted is None:
+            return 0
+        await cls.invalidate_cache(deleted["_id"])
+        return 1
+    
+    @classmethod
+    async def delete_many(cls, query: Dict) -> int:
+        """Delete every document matching a query."""
+        cls._check_query_indexed(query)
+        collection = await cls.get_collection()
+        result = await collection.delete_many(query)
+        clear_request_loader(cls)
+        await cls.invalidate_cache(all_documents=True)
         return result.deleted_count
     
+    @classmethod
+    async def _load_batch(cls, ids: List[str]) -> Dict[str, Dict]:
+        """Fetch documents for a batch of string IDs with a single $in query."""
+        object_ids = [ObjectId(doc_id) for doc_id in ids if ObjectId.is_valid(doc_id)]
+        if not object_ids:
+            return {}
+        documents = await cls.find_many({"_id": {"$in": object_ids}})
+        return {document["id"]: document for document in documents}
+    
+    @classmethod
+    def loader(cls) -> BatchLoader:
+        """Get this model's batching loader for the current request."""
+        return get_request_loader(cls, lambda: BatchLoader(cls._load_batch))
+    
+    @classmethod
+    async def load_by_id(cls, doc_id: str) -> Optional[Dict]:
+        """
+        Load a document by ID, batched with concurrent lookups on this model.
+        
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            Dict: Document or None if not found
+        """
+        return await cls.loader().load(str(doc_id))
+    
+    @classmethod
+    async def load_many_by_ids(cls, doc_ids: Iterable[str]) -> List[Optional[Dict]]:
+        """
+        Load several documents by ID with one deduplicated $in query.
+        
+        Args:
+            doc_ids: Document IDs
+            
+        Returns:
+            List[Dict]: Documents in the order of doc_ids, None where not found
+        """
+        return await cls.loader().load_many([str(doc_id) for doc_id in doc_ids])
+    
     @classmethod
     async def count(cls, query: Dict = None):
         """Count documents matching a query."""
         if query is None:
             query = {}
+        cls._check_query_indexed(query)
         collection = await cls.get_collection()
         return await collection.count_documents(query)
     
@@ -157,8 +403,23 @@ class BaseModel:
         """Perform an aggregation pipeline query."""
         collection = await cls.get_collection()
         cursor = collection.aggregate(pipeline)
-        results = await cursor.to_list(length=None)
-        return convert_objectids(results)
+        return await cursor.to_list(length=None)
+    
+    @classmethod
+    async def iter_aggregate(cls, pipeline: List[Dict], batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream the results of an aggregation pipeline.
+        
+        Args:
+            pipeline: Aggregation pipeline
+            batch_size: Number of results fetched from the server per round trip
+            
+        Yields:
+            Dict: Results, one at a time
+        """
+        collection = await cls.get_collection()
+        async for result in collection.aggregate(pipeline, batchSize=batch_size):
+            yield result
     
     @staticmethod
     def prepare_document(document: Dict) -> Dict:
@@ -0,0 +1,299 @@
+"""
+Cache module for read-through caching of hot model reads.
+An in-process LRU with TTL always sits in front; a shared backend
+(Redis, or an in-memory stand-in for local runs and tests) can be added
+behind it so several workers see the same entries and invalidations.
+"""
+import copy
+import os
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Prefix of every key the cache writes to Redis, so it can share a database
+REDIS_KEY_PREFIX = os.getenv("CACHE_REDIS_KEY_PREFIX", "model_cache:")
+# Longest a worker serves an entry from its local tier when a shared backend is configured
+SHARED_LOCAL_TTL_SECONDS = float(os.getenv("CACHE_SHARED_LOCAL_TTL_SECONDS", "1"))
+
+# Marks a cached "not found" so missing documents are not refetched every time
+_MISSING = "__missing__"
+
+
+class LocalCache:
+    """
+    In-process LRU cache with per-entry TTL.
+    Values are copied on the way in and out, so callers may mutate what they get.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Cache a value for ttl seconds, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        """Drop a cached value."""
+        self._entries.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        """Increment a counter. Counters live apart from entries and never expire or evict."""
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def counter(self, key: str) -> int:
+        """Return a counter's value (0 if never incremented)."""
+        return self._counters.get(key, 0)
+
+    async def clear(self):
+        """Drop every entry and counter."""
+        self._entries.clear()
+        self._counters.clear()
+
+
+class MemorySharedCache(LocalCache):
+    """
+    Stand-in for a shared cache server, for local runs and tests.
+    Stores pickled values like a remote backend would, without LRU eviction.
+    """
+
+    def __init__(self):
+        super().__init__(max_entries=float("inf"))
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await super().get(key)
+        return pickle.loads(value) if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await super().set(key, pickle.dumps(value), ttl)
+
+
+class RedisCache:
+    """
+    Shared cache stored in Redis. Requires the optional redis package.
+    Keys are stored under a prefix, so clearing the cache leaves other
+    data in the same Redis database alone.
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = REDIS_KEY_PREFIX):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package") from e
+        self._client = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._client.get(self._prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._client.set(self._prefix + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self._client.delete(self._prefix + key)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(self._prefix + key)
+
+    async def counter(self, key: str) -> int:
+        value = await self._client.get(self._prefix + key)
+        return int(value) if value is not None else 0
+
+    async def clear(self):
+        """Unlink this cache's keys, in batches found by SCAN."""
+        batch = []
+        async for key in self._client.scan_iter(match=f"{self._prefix}*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                await self._client.unlink(*batch)
+                batch = []
+        if batch:
+            await self._client.unlink(*batch)
+
+
+class ModelCache:
+    """
+    Read-through cache used by BaseModel.
+    Document entries are keyed by collection and ID and dropped on writes;
+    their keys also carry an epoch, bumped by bulk writes that cannot name
+    the documents they touched. Query entries carry a per-collection
+    generation, bumped by every write, so any change retires them.
+    """
+
+    def __init__(self, local: LocalCache, shared=None, ttl: float = CACHE_TTL_SECONDS):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.stats: Dict[str, Dict[str, int]] = {}
+        # With a shared backend, the local tier only briefly holds what other
+        # workers may invalidate
+        self._local_ttl = ttl if shared is None else min(ttl, SHARED_LOCAL_TTL_SECONDS)
+
+    def _count(self, namespace: str, counter: str):
+        stats = self.stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+        stats[counter] += 1
+
+    async def _get(self, key: str) -> Optional[Any]:
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                await self.local.set(key, value, self._local_ttl)
+        return value
+
+    async def _set(self, key: str, value: Any, ttl: float):
+        await self.local.set(key, value, min(ttl, self._local_ttl))
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl)
+
+    async def _delete(self, key: str):
+        await self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    async def _counter(self, key: str) -> int:
+        if self.shared is None:
+            return await self.local.counter(key)
+        value = await self.local.get(key)
+        if value is None:
+            value = await self.shared.counter(key)
+            await self.local.set(key, value, self._local_ttl)
+        return value
+
+    async def _incr(self, key: str):
+        if self.shared is not None:
+            await self.shared.incr(key)
+            await self.local.delete(key)
+        else:
+            await self.local.incr(key)
+
+    async def generation(self, namespace: str) -> int:
+        """Current write generation of a namespace, bumped by every write."""
+        return await self._counter(f"{namespace}:generation")
+
+    async def epoch(self, namespace: str) -> int:
+        """Current epoch of a namespace's document entries, bumped by bulk writes."""
+        return await self._counter(f"{namespace}:epoch")
+
+    async def get_or_load(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None) -> Any:
+        """
+        Return a cached value, loading and caching it on a miss.
+
+        Args:
+            namespace: Namespace the key belongs to (usually a collection name)
+            key: Cache key
+            loader: Coroutine function producing the value on a miss
+            ttl: Optional TTL override in seconds
+
+        Returns:
+            Any: Cached or freshly loaded value
+        """
+        value = await self._get(key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return None if value == _MISSING else value
+
+        self._count(namespace, "misses")
+        generation = await self.generation(namespace)
+        value = await loader()
+        # A write that landed while loading may have made the value stale
+        if await self.generation(namespace) == generation:
+            await self._set(key, _MISSING if value is None else value, ttl or self.ttl)
+        return value
+
+    async def invalidate(self, namespace: str, *keys: str, all_documents: bool = False):
+        """
+        Drop cached entries after a write and retire the namespace's cached queries.
+
+        Args:
+            namespace: Namespace written to
+            keys: Specific keys affected by the write
+            all_documents: Also retire every document entry, for writes that
+                may have touched documents whose keys are unknown
+        """
+        for key in keys:
+            await self._delete(key)
+        await self._incr(f"{namespace}:generation")
+        if all_documents:
+            await self._incr(f"{namespace}:epoch")
+        self._count(namespace, "invalidations")
+
+    def get_stats(self) -> Dict:
+        """
+        Hit, miss and invalidation counters per namespace and in total.
+
+        Returns:
+            Dict: Counters with the overall hit rate
+        """
+        totals = {"hits": 0, "misses": 0, "invalidations": 0}
+        for stats in self.stats.values():
+            for counter, value in stats.items():
+                totals[counter] += value
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "backend": type(self.shared).__name__ if self.shared is not None else "local",
+            "entries": len(self.local),
+            "hit_rate": totals["hits"] / lookups if lookups else 0.0,
+            "totals": totals,
+            "namespaces": copy.deepcopy(self.stats),
+        }
+
+    async def clear(self):
+        """Drop every entry and reset the counters."""
+        await self.local.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+        self.stats.clear()
+
+
+def build_cache(backend: str = CACHE_BACKEND) -> ModelCache:
+    """
+    Build the model cache for a backend name.
+
+    Args:
+        backend: "local" (in-process only), "memory" (local plus an in-memory
+            shared stand-in) or "redis" (local plus Redis at REDIS_URL)
+
+    Returns:
+        ModelCache: Configured cache
+    """
+    shared_backends = {
+        "local": lambda: None,
+        "memory": MemorySharedCache,
+        "redis": RedisCache,
+    }
+    if backend not in shared_backends:
+        raise ValueError(f"Unsupported CACHE_BACKEND: {backend}")
+    return ModelCache(LocalCache(), shared_backends[backend]())
+
+
+# Process-wide cache used by the models
+model_cache = build_cache()
@@ -6,8 +6,13 @@ Based on the ChatRoomSchema and ChatMessageSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 
 from .base_model import BaseModel
+from .pagination import page_sort, cursor_for
+from .hub import broadcast, EVENT_MESSAGE, EVENT_MESSAGE_UPDATED, EVENT_MESSAGE_DELETED
+from .pubsub import CHANNEL_CHAT
 
 
 class ChatRoomModel(BaseModel):
@@ -16,6 +21,10 @@ class ChatRoomModel(BaseModel):
     Handles all database interactions for chat rooms.
     """
     collection_name = "chat_rooms"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("is_private", ASCENDING), ("is_direct", ASCENDING)]),
+        IndexModel([("participants", ASCENDING), ("event_id", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_chat_room(
@@ -46,6 +55,7 @@ class ChatRoomModel(BaseModel):
         if participants is None:
             participants = []
             
+        now = datetime.now(timezone.utc)
         chat_room_data = {
             "event_id": event_id,
             "name": name,
@@ -53,8 +63,10 @@ class ChatRoomModel(BaseModel):
             "is_private": is_private,
             "is_direct": is_direct,
             "participants": participants,
-            "messages": [],
-            "created_at": datetime.now(timezone.utc)
+            "message_count": 0,
+            "last_message": None,
+            "last_activity": now,
+            "created_at": now
         }
         
         # Removed db keyword argument since BaseModel.insert_one() doesn't expect it.
@@ -216,6 +228,52 @@ class ChatRoomModel(BaseModel):
             {"_id": ObjectId(chat_room_id)},
             {"$set": filtered_update}
         )
+    
+    @classmethod
+    async def record_message(cls, chat_room_id: str, message: Dict):
+        """
+        Update a chat room's summary after a message is posted.
+        The last message only moves forward, so concurrent posts settle on the newest.
+        
+        Args:
+            chat_room_id: Chat room ID.
+            message: Posted message, with its "id".
+        """
+        await cls.update_one(
+            {"_id": ObjectId(chat_room_id)},
+            [{"$set": {
+                "message_count": {"$add": [{"$ifNull": ["$message_count", 0]}, 1]},
+                "last_message": {"$cond": [
+                    {"$gte": [message["created_at"], "$last_activity"]},
+                    {"$literal": message},
+                    "$last_message"
+                ]},
+                "last_activity": {"$max": ["$last_activity", message["created_at"]]}
+            }}],
+            projection={"_id": 1}
+        )
+    
+    @classmethod
+    async def record_message_deleted(cls, chat_room_id: str, message_id: str,
+                                     latest_message: Optional[Dict]):
+        """
+        Update a chat room's summary after a message is deleted.
+        
+        Args:
+            chat_room_id: Chat room ID.
+            message_id: ID of the deleted message.
+            latest_message: Newest remaining message, replacing it if it was the last one.
+        """
+        await cls.update_one(
+            {"_id": ObjectId(chat_room_id)},
+            {"$inc": {"message_count": -1}},
+            projection={"_id": 1}
+        )
+        await cls.update_one(
+            {"_id": ObjectId(chat_room_id), "last_message.id": message_id},
+            {"$set": {"last_message": latest_message}},
+            projection={"_id": 1}
+        )
 
 
 class ChatMessageModel(BaseModel):
@@ -224,6 +282,10 @@ class ChatMessageModel(BaseModel):
     Handles all database interactions for chat messages.
     """
     collection_name = "chat_messages"
+    indexes = [
+        IndexModel([("chat_room_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("parent_message_id", ASCENDING), ("created_at", ASCENDING)], sparse=True),
+    ]
     
     @classmethod
     async def create_message(cls, text: str, sender_id: str, chat_room_id: str) -> str:
@@ -246,14 +308,13 @@ class ChatMessageModel(BaseModel):
         }
         
         message_id = await cls.insert_one(message_data)
-        message_data["id"] = str(message_id)
+        message = {key: value for key, value in message_data.items() if key != "_id"}
+        message["id"] = str(message_id)
         
-        # Also add message to the chat room's messages array.
-        await ChatRoomModel.update_one(
-            {"_id": ObjectId(chat_room_id)},
-            {"$push": {"messages": message_data}}
-        )
+        # Keep the room's summary current; history is read from this collection
+        await ChatRoomModel.record_message(chat_room_id, message)
         
+        await broadcast(CHANNEL_CHAT, chat_room_id, {"type": EVENT_MESSAGE, "message": message})
         return str(message_id)
     
     @classmethod
@@ -296,6 +357,66 @@ class ChatMessageModel(BaseModel):
             sort=[("created_at", sort_direction)]
         )
     
+    @classmethod
+    async def get_chat_room_messages_page(
+        cls,
+        chat_room_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort_direction: int = -1
+    ) -> Dict:
+        """
+        Get one page of messages for a chat room using keyset pagination.
+        
+        Args:
+            chat_room_id: Chat room ID.
+            limit: Maximum number of messages to return.
+            cursor: Cursor returned with the previous page.
+            sort_direction: Sort direction (-1 for newest first, 1 for oldest first).
+            
+        Returns:
+            Dict: "messages" on this page and "next_cursor" (None on the last page).
+        """
+        page = await cls.find_page(
+            {"chat_room_id": chat_room_id},
+            limit=limit,
+            sort=[("created_at", sort_direction)],
+            cursor=cursor
+        )
+        return {"messages": page["items"], "next_cursor": page["next_cursor"]}
+    
+    @classmethod
+    async def get_messages_after(cls, chat_room_id: str, last_message_id: str,
+                                 limit: int = 500) -> Optional[Dict]:
+        """
+        Get the messages posted to a chat room after a given message, oldest first.
+        Used to resume a client from the last message it saw.
+        
+        Args:
+            chat_room_id: Chat room ID.
+            last_message_id: ID of the last message the client saw.
+            limit: Maximum number of messages to return.
+            
+        Returns:
+            Dict: "messages" after the given one and "next_cursor" (None if none remain),
+            or None if the message is not in the chat room.
+        """
+        last_message = await cls.find_one(
+            {"_id": ObjectId(last_message_id), "chat_room_id": chat_room_id},
+            {"created_at": 1}
+        )
+        if not last_message:
+            return None
+        
+        sort = page_sort([("created_at", 1)])
+        page = await cls.find_page(
+            {"chat_room_id": chat_room_id},
+            limit=limit,
+            sort=sort,
+            cursor=cursor_for(last_message, sort)
+        )
+        return {"messages": page["items"], "next_cursor": page["next_cursor"]}
+    
     @classmethod
     async def delete_message(cls, message_id: str) -> bool:
         """
@@ -314,12 +435,16 @@ class ChatMessageModel(BaseModel):
         # Remove from messages collection.
         deleted_count = await cls.delete_one({"_id": ObjectId(message_id)})
         
-        # Also remove from chat room's messages array.
-        await ChatRoomModel.update_one(
-            {"_id": ObjectId(message["chat_room_id"])},
-            {"$pull": {"messages": {"id": str(message_id)}}}
-        )
-        
+        if deleted_count:
+            latest = await cls.find_many(
+                {"chat_room_id": message["chat_room_id"]},
+                limit=1,
+                sort=[("created_at", -1), ("_id", -1)]
+            )
+            await ChatRoomModel.record_message_deleted(
+                message["chat_room_id"], str(message_id), latest[0] if latest else None
+            )
+            await broadcast(CHANNEL_CHAT, message["chat_room_id"], {"type": EVENT_MESSAGE_DELETED, "message_id": str(message_id)})
         return deleted_count > 0
     
     @classmethod
@@ -344,12 +469,14 @@ class ChatMessageModel(BaseModel):
             {"$set": {"text": text}}
         )
         
-        # Also update in the chat room's messages array.
-        await ChatRoomModel.update_one(
-            {"_id": ObjectId(message["chat_room_id"]), "messages.id": str(message_id)},
-            {"$set": {"messages.$.text": text}}
-        )
-        
+        if updated_message:
+            # Refresh the room summary if this is its last message
+            await ChatRoomModel.update_one(
+                {"_id": ObjectId(message["chat_room_id"]), "last_message.id": str(message_id)},
+                {"$set": {"last_message.text": text}},
+                projection={"_id": 1}
+            )
+            await broadcast(CHANNEL_CHAT, message["chat_room_id"], {"type": EVENT_MESSAGE_UPDATED, "message": updated_message})
         return updated_message
     
     @classmethod
@@ -370,19 +497,144 @@ class ChatMessageModel(BaseModel):
         # Create the reply message.
         message_id = await cls.create_message(text, sender_id, chat_room_id)
         
-        # Get the created message.
-        message = await cls.get_message_by_id(message_id)
-        
         # Add a reference to the parent message.
         updated_message = await cls.update_one(
             {"_id": ObjectId(message_id)},
             {"$set": {"parent_message_id": parent_message_id}}
         )
         
-        # Add this message to the parent's thread list.
+        # Count the reply on the parent; replies are read back by parent_message_id.
         await cls.update_one(
             {"_id": ObjectId(parent_message_id)},
-            {"$push": {"thread_messages": message}}
+            {"$inc": {"thread_count": 1}},
+            projection={"_id": 1}
         )
         
+        if updated_message:
+            await broadcast(CHANNEL_CHAT, chat_room_id, {"type": EVENT_MESSAGE_UPDATED, "message": updated_message})
         return updated_message
+    
+    @classmethod
+    async def get_thread_messages(cls, parent_message_id: str) -> List[Dict]:
+        """
+        Get the replies to a message, oldest first.
+        
+        Args:
+            parent_message_id: ID of the parent message.
+            
+        Returns:
+            List[Dict]: Reply message documents.
+        """
+        return await cls.find_many(
+            {"parent_message_id": parent_message_id},
+            sort=[("created_at", 1)]
+        )
+
+
+class ChatReadModel(BaseModel):
+    """
+    Model for chat room read cursors.
+    One document per user and chat room records the last message read, so a
+    user's unread count is the number of other users' messages after it.
+    """
+    collection_name = "chat_read_cursors"
+    indexes = [
+        IndexModel([("user_id", ASCENDING), ("chat_room_id", ASCENDING)], unique=True),
+    ]
+    
+    @classmethod
+    async def mark_read(cls, chat_room_id: str, user_id: str,
+                        message_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Move a user's read cursor in a chat room up to a message. The cursor never moves back.
+        
+        Args:
+            chat_room_id: Chat room ID.
+            user_id: User ID.
+            message_id: Last message read; the room's latest message if omitted.
+            
+        Returns:
+            Dict: The user's read cursor, or None if the message is not in the room.
+        """
+        if message_id:
+            message = await ChatMessageModel.find_one(
+                {"_id": ObjectId(message_id), "chat_room_id": chat_room_id}, {"created_at": 1}
+            )
+        else:
+            latest = await ChatMessageModel.find_many(
+                {"chat_room_id": chat_room_id},
+                limit=1,
+                sort=[("created_at", -1), ("_id", -1)],
+                projection={"created_at": 1}
+            )
+            message = latest[0] if latest else None
+        if not message:
+            return None
+        
+        read_at, read_id = message["created_at"], ObjectId(message["id"])
+        query = {"user_id": user_id, "chat_room_id": chat_room_id}
+        while True:
+            cursor = await cls.find_one(query, projection={"last_read_message_id": 1, "last_read_at": 1})
+            previous_id = cursor.get("last_read_message_id") if cursor else None
+            if previous_id and (cursor["last_read_at"], ObjectId(previous_id)) >= (read_at, read_id):
+                return cursor
+            
+            # Guard the write on the old cursor, so a concurrent read further on is never undone
+            try:
+                cursor = await cls.update_one(
+                    {**query, "last_read_message_id": previous_id},
+                    {"$set": {"last_read_message_id": str(read_id), "last_read_at": read_at}},
+                    upsert=cursor is None
+                )
+            except DuplicateKeyError:
+                # Another read created the cursor first
+                cursor = None
+            if cursor:
+                return cursor
+    
+    @classmethod
+    async def get_unread_counts(cls, user_id: str,
+                                chat_room_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Unread message counts of a user's chat rooms: the other users' messages
+        after the user's read cursor, counted in one aggregation over the
+        (chat_room_id, created_at) index. Counting from the cursor keeps the
+        counts right when messages are deleted.
+        
+        Args:
+            user_id: User ID.
+            chat_room_ids: Rooms to count; the rooms the user participates in if omitted.
+            
+        Returns:
+            Dict[str, int]: Unread count per chat room ID.
+        """
+        if chat_room_ids is None:
+            query = {"participants": user_id}
+        else:
+            query = {"_id": {"$in": [ObjectId(room_id) for room_id in chat_room_ids]}}
+        rooms = await ChatRoomModel.find_many(query, projection={"_id": 1})
+        if not rooms:
+            return {}
+        cursors = await cls.find_many(
+            {"user_id": user_id, "chat_room_id": {"$in": [room["id"] for room in rooms]}},
+            projection={"chat_room_id": 1, "last_read_message_id": 1, "last_read_at": 1}
+        )
+        cursors = {cursor["chat_room_id"]: cursor for cursor in cursors}
+        
+        unread_by_room = []
+        for room in rooms:
+            branch = {"chat_room_id": room["id"]}
+            cursor = cursors.get(room["id"])
+            if cursor and cursor.get("last_read_message_id"):
+                branch["$or"] = [
+                    {"created_at": {"$gt": cursor["last_read_at"]}},
+                    {"created_at": cursor["last_read_at"], "_id": {"$gt": ObjectId(cursor["last_read_message_id"])}}
+                ]
+            unread_by_room.append(branch)
+        counts = await ChatMessageModel.aggregate([
+            {"$match": {"$or": unread_by_room, "sender_id": {"$ne": user_id}}},
+            {"$group": {"_id": "$chat_room_id", "unread": {"$sum": 1}}}
+        ])
+        unread = {room["id"]: 0 for room in rooms}
+        unread.update({count["_id"]: count["unread"] for count in counts})
+        return unread
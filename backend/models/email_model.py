@@ -2,14 +2,21 @@
 Email model module for handling email functionality.
 Based on the Email Schema.
 """
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from .base_model import BaseModel
+from .scheduler import scheduler, JOB_SEND_CAMPAIGN
 
 class EmailCampaignModel(BaseModel):
     collection_name = "email_campaigns"
+    indexes = [
+        IndexModel([("event_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("schedule_time", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_campaign(cls, event_id: str, name: str, subject: str, 
@@ -34,15 +41,14 @@ class EmailCampaignModel(BaseModel):
                 "opened": 0,
                 "clicked": 0,
                 "bounced": 0
-            },
-            "tracking": []
+            }
         }
         campaign_id = await cls.insert_one(campaign_data)
         return str(campaign_id)
     
     @classmethod
     async def schedule_campaign(cls, campaign_id: str, schedule_time: datetime) -> Optional[Dict]:
-        return await cls.update_one(
+        campaign = await cls.update_one(
             {"_id": ObjectId(campaign_id), "status": "draft"},
             {
                 "$set": {
@@ -52,10 +58,14 @@ class EmailCampaignModel(BaseModel):
                 }
             }
         )
+        if campaign:
+            await scheduler.schedule(f"campaign:{campaign_id}", JOB_SEND_CAMPAIGN, schedule_time,
+                                     {"campaign_id": campaign_id})
+        return campaign
     
     @classmethod
     async def cancel_campaign(cls, campaign_id: str) -> Optional[Dict]:
-        return await cls.update_one(
+        campaign = await cls.update_one(
             {"_id": ObjectId(campaign_id), "status": "scheduled"},
             {
                 "$set": {
@@ -64,89 +74,136 @@ class EmailCampaignModel(BaseModel):
                 }
             }
         )
+        if campaign:
+            await scheduler.cancel(f"campaign:{campaign_id}")
+        return campaign
     
     @classmethod
-    async def record_send(cls, campaign_id: str, recipient_ids: List[str]) -> Optional[Dict]:
-        tracking_entries = []
-        for user_id in recipient_ids:
-            tracking_entries.append({
-                "user_id": user_id,
-                "sent_at": datetime.now(timezone.utc),
-                "opened": False,
-                "opened_at": None,
-                "clicked": False,
-                "clicked_at": None
-            })
+    async def start_sending(cls, campaign_id: str) -> Optional[Dict]:
+        """
+        Move a scheduled campaign that is due to "sending".
+        A campaign already sending is returned again, so an interrupted send can resume.
         
+        Args:
+            campaign_id: Campaign ID
+            
+        Returns:
+            Dict: The campaign, or None if it is not found, not due, cancelled or sent
+        """
+        now = datetime.now(timezone.utc)
         return await cls.update_one(
-            {"_id": ObjectId(campaign_id)},
             {
-                "$set": {
-                    "status": "sent",
-                    "sent_time": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                    "metrics.total_sent": len(recipient_ids)
-                },
-                "$push": {"tracking": {"$each": tracking_entries}}
-            }
+                "_id": ObjectId(campaign_id),
+                "status": {"$in": ["scheduled", "sending"]},
+                "schedule_time": {"$lte": now}
+            },
+            {"$set": {"status": "sending", "updated_at": now}}
         )
     
     @classmethod
-    async def track_open(cls, campaign_id: str, user_id: str) -> Optional[Dict]:
-        now = datetime.now(timezone.utc)
-        campaign = await cls.find_one({"_id": ObjectId(campaign_id)})
-        if not campaign:
-            return None
+    async def reserve_email_job(cls, campaign_id: str) -> Optional[str]:
+        """
+        Get the ID of the email job delivering a campaign, reserving one first if it has none.
+        The ID is stored before the job is created, so a retried send creates
+        (or completes) the same job instead of a second one.
         
-        for entry in campaign.get("tracking", []):
-            if entry.get("user_id") == user_id and entry.get("opened", False):
-                return campaign
+        Args:
+            campaign_id: Campaign ID
+            
+        Returns:
+            str: Email job ID, or None if the campaign is not found
+        """
+        job_id = str(ObjectId())
+        if await cls.update_one(
+            {"_id": ObjectId(campaign_id), "email_job_id": None},
+            {"$set": {"email_job_id": job_id}},
+            projection={"_id": 1}
+        ):
+            return job_id
+        campaign = await cls.find_one({"_id": ObjectId(campaign_id)}, projection={"email_job_id": 1})
+        return campaign.get("email_job_id") if campaign else None
+    
+    @classmethod
+    async def record_send(cls, campaign_id: str, recipient_ids: List[str]) -> Optional[Dict]:
+        """
+        Mark a campaign sent and start tracking its recipients.
+        Recipients already tracked are not counted again, so a retried send is harmless.
         
+        Args:
+            campaign_id: Campaign ID
+            recipient_ids: IDs of the users the campaign was sent to
+            
+        Returns:
+            Dict: Updated campaign or None if not found
+        """
+        now = datetime.now(timezone.utc)
+        newly_tracked = await EmailTrackingModel.record_sends(campaign_id, recipient_ids)
         return await cls.update_one(
+            {"_id": ObjectId(campaign_id)},
             {
-                "_id": ObjectId(campaign_id),
-                "tracking.user_id": user_id
-            },
-            {
-                "$inc": {"metrics.opened": 1},
                 "$set": {
-                    "tracking.$.opened": True,
-                    "tracking.$.opened_at": now,
+                    "status": "sent",
+                    "sent_time": now,
                     "updated_at": now
-                }
+                },
+                "$inc": {"metrics.total_sent": newly_tracked}
             }
         )
     
+    @classmethod
+    async def track_open(cls, campaign_id: str, user_id: str) -> Optional[Dict]:
+        """
+        Record that a recipient opened a campaign; only the first open is counted.
+        
+        Args:
+            campaign_id: Campaign ID
+            user_id: Recipient's user ID
+            
+        Returns:
+            Dict: The recipient's tracking entry, or None if they were not sent the campaign
+        """
+        entry, first = await EmailTrackingModel.record_open(campaign_id, user_id)
+        if first:
+            await cls.increment_metrics(campaign_id, {"opened": 1})
+        return entry
+    
     @classmethod
     async def track_click(cls, campaign_id: str, user_id: str, link_url: str) -> Optional[Dict]:
-        now = datetime.now(timezone.utc)
-        campaign = await cls.find_one({"_id": ObjectId(campaign_id)})
-        if not campaign:
-            return None
+        """
+        Record a recipient's click on a campaign link; only their first click is counted.
         
-        for entry in campaign.get("tracking", []):
-            if entry.get("user_id") == user_id and entry.get("clicked", False):
-                return campaign
+        Args:
+            campaign_id: Campaign ID
+            user_id: Recipient's user ID
+            link_url: URL clicked
+            
+        Returns:
+            Dict: The recipient's tracking entry, or None if they were not sent the campaign
+        """
+        entry, first = await EmailTrackingModel.record_click(campaign_id, user_id, link_url)
+        if first:
+            await cls.increment_metrics(campaign_id, {"clicked": 1})
+        return entry
+    
+    @classmethod
+    async def increment_metrics(cls, campaign_id: str, amounts: Dict[str, int]):
+        """
+        Add to a campaign's metrics counters.
         
-        return await cls.update_one(
+        Args:
+            campaign_id: Campaign ID
+            amounts: Amount to add per metric (e.g. {"opened": 3})
+        """
+        amounts = {f"metrics.{metric}": amount for metric, amount in amounts.items() if amount}
+        if not amounts:
+            return
+        await cls.update_one(
+            {"_id": ObjectId(campaign_id)},
             {
-                "_id": ObjectId(campaign_id),
-                "tracking.user_id": user_id
+                "$inc": amounts,
+                "$set": {"updated_at": datetime.now(timezone.utc)}
             },
-            {
-                "$inc": {"metrics.clicked": 1},
-                "$set": {
-                    "tracking.$.clicked": True,
-                    "tracking.$.clicked_at": now,
-                    "updated_at": now
-                },
-                "$push": {
-                    "tracking.$.clicks": {
-                        "url": link_url,
-                        "timestamp": now
-                    }
-                }
-            }
+            projection={"_id": 1}
         )
     
     @classmethod
@@ -162,7 +219,7 @@ class EmailCampaignModel(BaseModel):
         bounce_rate = (metrics.get("bounced", 0) / total_sent * 100) if total_sent > 0 else 0
         
         return {
-            "campaign_id": str(campaign["_id"]),
+            "campaign_id": campaign["id"],
             "name": campaign.get("name"),
             "status": campaign.get("status"),
             "sent_time": campaign.get("sent_time"),
@@ -179,6 +236,201 @@ class EmailCampaignModel(BaseModel):
             ) if metrics.get("opened", 0) > 0 else 0
         }
 
+class EmailTrackingModel(BaseModel):
+    """
+    Model for the per-recipient tracking of email campaigns.
+    One document per (campaign_id, user_id), so opens and clicks touch a
+    single small document instead of the campaign.
+    """
+    collection_name = "email_tracking"
+    indexes = [
+        IndexModel([("campaign_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+    ]
+    # Most recent clicks kept per recipient; click_count keeps the total
+    MAX_CLICKS_PER_RECIPIENT = 50
+    
+    @classmethod
+    async def record_sends(cls, campaign_id: str, user_ids: List[str]) -> int:
+        """
+        Start tracking the recipients of a campaign.
+        
+        Args:
+            campaign_id: Campaign ID
+            user_ids: Recipients' user IDs
+            
+        Returns:
+            int: Number of recipients not tracked before
+        """
+        now = datetime.now(timezone.utc)
+        collection = await cls.get_collection()
+        tracked = 0
+        user_ids = list(dict.fromkeys(user_ids))
+        for start in range(0, len(user_ids), 1000):
+            result = await collection.bulk_write([
+                UpdateOne(
+                    {"campaign_id": campaign_id, "user_id": user_id},
+                    {"$setOnInsert": {
+                        "sent_at": now,
+                        "opened": False,
+                        "opened_at": None,
+                        "clicked": False,
+                        "clicked_at": None,
+                        "click_count": 0,
+                        "clicks": []
+                    }},
+                    upsert=True
+                )
+                for user_id in user_ids[start:start + 1000]
+            ], ordered=False)
+            tracked += result.upserted_count
+        await cls.invalidate_cache(all_documents=True)
+        return tracked
+    
+    @classmethod
+    async def record_open(cls, campaign_id: str, user_id: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Mark a recipient's campaign as opened.
+        
+        Args:
+            campaign_id: Campaign ID
+            user_id: Recipient's user ID
+            
+        Returns:
+            Tuple[Dict, bool]: The tracking entry (None if not tracked) and whether this was the first open
+        """
+        entry = await cls.update_one(
+            {"campaign_id": campaign_id, "user_id": user_id, "opened": False},
+            {"$set": {"opened": True, "opened_at": datetime.now(timezone.utc)}}
+        )
+        if entry:
+            return entry, True
+        return await cls.find_one({"campaign_id": campaign_id, "user_id": user_id}), False
+    
+    @classmethod
+    async def record_click(cls, campaign_id: str, user_id: str, link_url: str,
+                           clicked_at: Optional[datetime] = None) -> Tuple[Optional[Dict], bool]:
+        """
+        Record a recipient's click on a campaign link.
+        
+        Args:
+            campaign_id: Campaign ID
+            user_id: Recipient's user ID
+            link_url: URL clicked
+            clicked_at: When the click happened (defaults to now)
+            
+        Returns:
+            Tuple[Dict, bool]: The tracking entry (None if not tracked) and whether this was the first click
+        """
+        now = clicked_at or datetime.now(timezone.utc)
+        push = {"$push": {"clicks": {
+            "$each": [{"url": link_url, "timestamp": now}],
+            "$slice": -cls.MAX_CLICKS_PER_RECIPIENT
+        }}, "$inc": {"click_count": 1}}
+        entry = await cls.update_one(
+            {"campaign_id": campaign_id, "user_id": user_id, "clicked": False},
+            {**push, "$set": {"clicked": True, "clicked_at": now}}
+        )
+        if entry:
+            return entry, True
+        return await cls.update_one({"campaign_id": campaign_id, "user_id": user_id}, push), False
+    
+    @classmethod
+    async def record_events(cls, campaign_id: str, opens: Dict[str, datetime],
+                            clicks: Dict[str, List[Dict]], progress: Optional[Dict] = None) -> Dict[str, int]:
+        """
+        Apply a batch of a campaign's opens and clicks with bulk writes.
+        Each step is recorded in progress once it is written, so a batch
+        that failed part way is resumed with the same progress and only the
+        writes that did not happen are repeated.
+        
+        Args:
+            campaign_id: Campaign ID
+            opens: Time of the first open, by user ID
+            clicks: Clicks ({"url", "timestamp"}, oldest first), by user ID
+            progress: Progress of an earlier, failed attempt at the same batch
+            
+        Returns:
+            Dict: Number of recipients who "opened" and "clicked" for the first time
+        """
+        progress = progress if progress is not None else {}
+        counts = progress.setdefault("counts", {"opened": 0, "clicked": 0})
+        done = progress.setdefault("done", set())
+        collection = await cls.get_collection()
+        
+        try:
+            # Flip the flags only where still unset, so modified counts are first opens/clicks.
+            # Repeating a flip matches nothing, so the counts of partly applied batches add up.
+            if opens and "opened" not in done:
+                await cls._bulk_flip(collection, counts, "opened", [
+                    UpdateOne(
+                        {"campaign_id": campaign_id, "user_id": user_id, "opened": False},
+                        {"$set": {"opened": True, "opened_at": opened_at}}
+                    )
+                    for user_id, opened_at in opens.items()
+                ])
+                done.add("opened")
+            if clicks and "clicked" not in done:
+                await cls._bulk_flip(collection, counts, "clicked", [
+                    UpdateOne(
+                        {"campaign_id": campaign_id, "user_id": user_id, "clicked": False},
+                        {"$set": {"clicked": True, "clicked_at": user_clicks[0]["timestamp"]}}
+                    )
+                    for user_id, user_clicks in clicks.items()
+                ])
+                done.add("clicked")
+            if clicks and "clicks" not in done:
+                # Pushes are not idempotent: only recipients whose push failed are retried
+                user_ids = progress.setdefault("click_user_ids", list(clicks))
+                try:
+                    await collection.bulk_write([
+                        UpdateOne(
+                            {"campaign_id": campaign_id, "user_id": user_id},
+                            {
+                                "$push": {"clicks": {"$each": clicks[user_id], "$slice": -cls.MAX_CLICKS_PER_RECIPIENT}},
+                                "$inc": {"click_count": len(clicks[user_id])}
+                            }
+                        )
+                        for user_id in user_ids
+                    ], ordered=False)
+                except BulkWriteError as e:
+                    failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                    progress["click_user_ids"] = [user_id for i, user_id in enumerate(user_ids) if i in failed]
+                    raise
+                done.add("clicks")
+        finally:
+            await cls.invalidate_cache(all_documents=True)
+        return counts
+    
+    @staticmethod
+    async def _bulk_flip(collection, counts: Dict[str, int], metric: str, operations: List[UpdateOne]):
+        """Run the flag updates of one metric, counting the flags flipped even if the write fails part way."""
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            counts[metric] += e.details.get("nModified", 0)
+            raise
+        counts[metric] += result.modified_count
+    
+    @classmethod
+    async def get_campaign_tracking(cls, campaign_id: str, limit: int = 100,
+                                    cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of a campaign's per-recipient tracking entries.
+        
+        Args:
+            campaign_id: Campaign ID
+            limit: Maximum number of entries to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "tracking" entries on this page and "next_cursor" (None on the last page)
+        """
+        page = await cls.find_page(
+            {"campaign_id": campaign_id}, limit=limit, sort=[("user_id", 1)], cursor=cursor
+        )
+        return {"tracking": page["items"], "next_cursor": page["next_cursor"]}
+
+
 class EmailModel(BaseModel):
     collection_name = "email_logs"
 
@@ -191,3 +443,243 @@ class EmailModel(BaseModel):
             "sent_at": datetime.now(timezone.utc)
         }
         await cls.insert_one(log_data)
+
+
+class EmailJobModel(BaseModel):
+    """
+    Model for email delivery jobs.
+    A job is one message sent to many recipients in the background; its
+    per-recipient state lives in EmailDeliveryModel.
+    """
+    collection_name = "email_jobs"
+    indexes = [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+    ]
+    
+    @classmethod
+    async def create_job(cls, subject: str, body: str, recipients: List[str],
+                         event_id: Optional[str] = None, job_id: Optional[str] = None) -> str:
+        """
+        Create a job and a pending delivery for each distinct recipient.
+        With a job_id reserved beforehand, creating the job again only adds
+        the deliveries a failed earlier attempt did not create.
+        
+        Args:
+            subject: Email subject
+            body: HTML body
+            recipients: Recipient email addresses
+            event_id: Optional event the campaign promotes
+            job_id: Optional ID reserved for the job
+            
+        Returns:
+            str: Job ID
+        """
+        recipients = list(dict.fromkeys(email for email in recipients if email))
+        job = {
+            "subject": subject,
+            "body": body,
+            "event_id": event_id,
+            "status": "queued" if recipients else "completed",
+            "total": len(recipients),
+            "counts": {"sent": 0, "failed": 0},
+            "created_at": datetime.now(timezone.utc),
+            "finished_at": None if recipients else datetime.now(timezone.utc)
+        }
+        if job_id is None:
+            job_id = str(await cls.insert_one(job))
+        else:
+            try:
+                await cls.insert_one({"_id": ObjectId(job_id), **job})
+            except DuplicateKeyError:
+                pass
+        await EmailDeliveryModel.create_deliveries(job_id, recipients)
+        return job_id
+    
+    @classmethod
+    async def get_job(cls, job_id: str) -> Optional[Dict]:
+        """
+        Get a job with its progress counters.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            Dict: Job document or None if not found
+        """
+        return await cls.find_one({"_id": ObjectId(job_id)})
+    
+    @classmethod
+    async def get_unfinished_jobs(cls) -> List[Dict]:
+        """
+        Get the jobs that still have deliveries to make, oldest first.
+        
+        Returns:
+            List[Dict]: Queued and running jobs
+        """
+        return await cls.find_many(
+            {"status": {"$in": ["queued", "running"]}},
+            sort=[("created_at", 1)]
+        )
+    
+    @classmethod
+    async def mark_running(cls, job_id: str):
+        """Mark a queued job as being delivered."""
+        await cls.update_one(
+            {"_id": ObjectId(job_id), "status": "queued"},
+            {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}},
+            projection={"_id": 1}
+        )
+    
+    @classmethod
+    async def record_result(cls, job_id: str, sent: bool) -> Optional[Dict]:
+        """
+        Count a finished delivery, completing the job with its last one.
+        
+        Args:
+            job_id: Job ID
+            sent: Whether the delivery succeeded
+            
+        Returns:
+            Dict: The job's status and counts, or None if not found
+        """
+        counter = "counts.sent" if sent else "counts.failed"
+        now = datetime.now(timezone.utc)
+        done = {"$gte": [{"$add": ["$counts.sent", "$counts.failed"]}, "$total"]}
+        return await cls.update_one(
+            {"_id": ObjectId(job_id)},
+            [
+                {"$set": {counter: {"$add": [f"${counter}", 1]}}},
+                {"$set": {
+                    "status": {"$cond": [done, "completed", "$status"]},
+                    "finished_at": {"$cond": [done, now, "$finished_at"]}
+                }}
+            ],
+            projection={"status": 1, "counts": 1, "total": 1}
+        )
+
+
+class EmailDeliveryModel(BaseModel):
+    """
+    Model for the delivery of a job's message to one recipient.
+    Statuses: pending, sending, retrying, sent, failed.
+    """
+    collection_name = "email_deliveries"
+    indexes = [
+        IndexModel([("job_id", ASCENDING), ("email", ASCENDING)], unique=True),
+        IndexModel([("job_id", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)]),
+    ]
+    # Deliveries stuck in "sending" this long (a worker died mid-send) are retried
+    STALE_CLAIM_SECONDS = 600
+    
+    @classmethod
+    async def create_deliveries(cls, job_id: str, emails: List[str]):
+        """
+        Create a pending delivery per recipient of a job.
+        Recipients that already have a delivery for the job are skipped.
+        
+        Args:
+            job_id: Job ID
+            emails: Distinct recipient email addresses
+        """
+        if not emails:
+            return
+        collection = await cls.get_collection()
+        documents = [
+            {"job_id": job_id, "email": email, "status": "pending", "attempts": 0, "last_error": None}
+            for email in emails
+        ]
+        for start in range(0, len(documents), 1000):
+            try:
+                await collection.insert_many(documents[start:start + 1000], ordered=False)
+            except BulkWriteError as e:
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        await cls.invalidate_cache()
+    
+    @classmethod
+    def iter_undelivered(cls, job_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream a job's deliveries that still need sending, including stale claims.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            AsyncIterator[Dict]: Deliveries with their email and attempts
+        """
+        stale = datetime.now(timezone.utc) - timedelta(seconds=cls.STALE_CLAIM_SECONDS)
+        return cls.iter_many(
+            {"job_id": job_id, "$or": [
+                {"status": {"$in": ["pending", "retrying"]}},
+                {"status": "sending", "claimed_at": {"$lt": stale}}
+            ]},
+            sort=[("_id", 1)],
+            projection={"email": 1, "attempts": 1}
+        )
+    
+    @classmethod
+    async def claim(cls, delivery_id: str) -> Optional[Dict]:
+        """
+        Claim a delivery for sending, so no other worker sends it too.
+        
+        Args:
+            delivery_id: Delivery ID
+            
+        Returns:
+            Dict: The claimed delivery, or None if it was already claimed or finished
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=cls.STALE_CLAIM_SECONDS)
+        return await cls.update_one(
+            {"_id": ObjectId(delivery_id), "$or": [
+                {"status": {"$in": ["pending", "retrying"]}},
+                {"status": "sending", "claimed_at": {"$lt": stale}}
+            ]},
+            {"$set": {"status": "sending", "claimed_at": now}, "$inc": {"attempts": 1}}
+        )
+    
+    @classmethod
+    async def mark_sent(cls, delivery_id: str):
+        """Record a successful delivery."""
+        await cls.update_one(
+            {"_id": ObjectId(delivery_id)},
+            {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc), "last_error": None}},
+            projection={"_id": 1}
+        )
+    
+    @classmethod
+    async def mark_failed(cls, delivery_id: str, error: str, retrying: bool):
+        """
+        Record a failed attempt.
+        
+        Args:
+            delivery_id: Delivery ID
+            error: Error reported by the SMTP server or connection
+            retrying: Whether another attempt is scheduled
+        """
+        await cls.update_one(
+            {"_id": ObjectId(delivery_id)},
+            {"$set": {"status": "retrying" if retrying else "failed", "last_error": error}},
+            projection={"_id": 1}
+        )
+    
+    @classmethod
+    async def get_job_deliveries(cls, job_id: str, status: Optional[str] = None,
+                                 limit: int = 100, cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of a job's per-recipient statuses.
+        
+        Args:
+            job_id: Job ID
+            status: Optional status filter
+            limit: Maximum number of deliveries to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "deliveries" on this page and "next_cursor" (None on the last page)
+        """
+        query = {"job_id": job_id}
+        if status:
+            query["status"] = status
+        page = await cls.find_page(query, limit=limit, sort=[("_id", 1)], cursor=cursor)
+        return {"deliveries": page["items"], "next_cursor": page["next_cursor"]}
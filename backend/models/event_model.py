@@ -5,9 +5,21 @@ Based on the EventSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 import uuid
 
 from .base_model import BaseModel
+from .registration_model import RegistrationModel
+from .search import (TEXT_SCORE_PROJECTION, TEXT_SCORE_SORT, text_filter, prefix_filter,
+                     prefix_key, search_keys)
+from .autocomplete import SUGGEST_EVENT, index_event, unindex
+
+
+# Outcomes of EventModel.add_participant
+REGISTRATION_REGISTERED = "registered"
+REGISTRATION_ALREADY_REGISTERED = "already_registered"
+REGISTRATION_SOLD_OUT = "sold_out"
+REGISTRATION_EVENT_NOT_FOUND = "event_not_found"
 
 
 class EventModel(BaseModel):
@@ -16,6 +28,15 @@ class EventModel(BaseModel):
     Handles all database interactions for events.
     """
     collection_name = "events"
+    indexes = [
+        IndexModel([("start_date", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("organizer_id", ASCENDING), ("start_date", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("name", TEXT), ("description", TEXT)],
+                   weights={"name": 10, "description": 2}, name="events_text"),
+        IndexModel([("name_lc", ASCENDING)]),
+    ]
+    # Fields with a lowercase copy for prefix search
+    prefix_fields = ["name"]
     
     @classmethod
     async def create_event(cls, name: str, description: Optional[str], event_type: str,
@@ -36,7 +57,7 @@ class EventModel(BaseModel):
             organizer_id: ID of the event organizer
             venue_id: ID of the venue
             capacity: Maximum number of participants
-            participants: List of user IDs participating in the event
+            participants: List of user IDs to register for the event
             
         Returns:
             str: ID of the created event
@@ -55,17 +76,26 @@ class EventModel(BaseModel):
             "organizer_id": organizer_id,
             "venue_id": venue_id,
             "capacity": capacity,
-            "participants": participants,
+            "participant_count": 0,
             "created_at": datetime.now(timezone.utc)
         }
+        event_data.update(search_keys(event_data, cls.prefix_fields))
         
-        event_id = await cls.insert_one(event_data)
-        return str(event_id)
+        event_id = str(await cls.insert_one(event_data))
+        index_event(event_id, event_data)
+        if participants:
+            registered = await RegistrationModel.create_registrations(event_id, participants, start_date)
+            await cls.update_one(
+                {"_id": ObjectId(event_id)},
+                {"$inc": {"participant_count": registered}},
+                projection={"_id": 1}
+            )
+        return event_id
     
     @classmethod
     async def get_event_by_id(cls, event_id: str) -> Dict:
         """
-        Get event details by ID.
+        Get event details by ID, through the model cache.
         
         Args:
             event_id: Event ID
@@ -73,7 +103,7 @@ class EventModel(BaseModel):
         Returns:
             Dict: Event document or None if not found
         """
-        return await cls.find_one({"_id": ObjectId(event_id)})
+        return await cls.find_by_id_cached(event_id)
     
     @classmethod
     async def update_event(cls, event_id: str, update_data: Dict) -> Optional[Dict]:
@@ -93,11 +123,17 @@ class EventModel(BaseModel):
             "is_virtual", "virtual_meeting_url", "venue_id", "capacity"
         ]
         filtered_update = {k: v for k, v in update_data.items() if k in allowed_fields}
+        filtered_update.update(search_keys(filtered_update, cls.prefix_fields))
         
-        return await cls.update_one(
+        updated_event = await cls.update_one(
             {"_id": ObjectId(event_id)},
             {"$set": filtered_update}
         )
+        if updated_event:
+            index_event(event_id, updated_event)
+        if updated_event and "start_date" in filtered_update:
+            await RegistrationModel.update_event_start_date(event_id, filtered_update["start_date"])
+        return updated_event
     
     @classmethod
     async def delete_event(cls, event_id: str) -> bool:
@@ -111,6 +147,9 @@ class EventModel(BaseModel):
             bool: True if deleted, False otherwise
         """
         deleted_count = await cls.delete_one({"_id": ObjectId(event_id)})
+        if deleted_count > 0:
+            unindex(SUGGEST_EVENT, event_id)
+            await RegistrationModel.delete_event_registrations(event_id)
         return deleted_count > 0
     
     @classmethod
@@ -126,6 +165,28 @@ class EventModel(BaseModel):
         """
         return await cls.find_many({"organizer_id": organizer_id})
     
+    @classmethod
+    async def get_organizer_events(cls, organizer_id: str, upcoming_only: bool = False,
+                                   limit: int = 0, cursor: Optional[str] = None) -> Dict:
+        """
+        Get a page of the events organized by a user, ordered by start date.
+        
+        Args:
+            organizer_id: User ID of the organizer
+            upcoming_only: Only include events that have not started yet
+            limit: Maximum number of events to return (0 for all)
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "events" on this page and "next_cursor" (None on the last page)
+        """
+        query = {"organizer_id": organizer_id}
+        if upcoming_only:
+            query["start_date"] = {"$gt": datetime.now(timezone.utc)}
+        
+        page = await cls.find_page(query, limit=limit, sort=[("start_date", 1)], cursor=cursor)
+        return {"events": page["items"], "next_cursor": page["next_cursor"]}
+    
     @classmethod
     async def get_upcoming_events(cls, limit: int = 10, skip: int = 0) -> List[Dict]:
         """
@@ -147,12 +208,31 @@ class EventModel(BaseModel):
             sort=[("start_date", 1)]
         )
     
+    @staticmethod
+    def _search_criteria(query: str, event_type: Optional[str] = None,
+                         is_virtual: Optional[bool] = None, upcoming_only: bool = False) -> Dict:
+        """Build the filter shared by the event search methods."""
+        search_criteria = text_filter(query) if query and query.strip() else {}
+        
+        if event_type:
+            search_criteria["event_type"] = event_type
+            
+        if is_virtual is not None:
+            search_criteria["is_virtual"] = is_virtual
+        
+        if upcoming_only:
+            search_criteria["start_date"] = {"$gt": datetime.now(timezone.utc)}
+        return search_criteria
+    
     @classmethod
     async def search_events(cls, query: str, event_type: Optional[str] = None,
                          is_virtual: Optional[bool] = None, limit: int = 10,
-                         skip: int = 0) -> List[Dict]:
+                         skip: int = 0, upcoming_only: bool = False) -> List[Dict]:
         """
-        Search for events.
+        Search for events, most relevant first.
+        Matches whole words through the text index (name weighted above
+        description); on the first page, events whose name starts with the
+        query fill any remaining slots so partially typed words still match.
         
         Args:
             query: Search query
@@ -160,54 +240,191 @@ class EventModel(BaseModel):
             is_virtual: Optional virtual event filter
             limit: Maximum number of events to return
             skip: Number of events to skip (for pagination)
+            upcoming_only: Only include events that have not started yet
             
         Returns:
-            List[Dict]: List of matching event documents
+            List[Dict]: List of matching event documents, each with its relevance "score"
         """
-        search_criteria = {
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}}
-            ]
-        }
+        search_criteria = cls._search_criteria(query, event_type, is_virtual, upcoming_only)
+        if "$text" not in search_criteria:
+            return await cls.find_many(search_criteria, limit=limit, skip=skip, sort=[("start_date", 1)])
         
-        if event_type:
-            search_criteria["event_type"] = event_type
+        events = await cls.find_many(
+            search_criteria,
+            limit=limit,
+            skip=skip,
+            sort=TEXT_SCORE_SORT,
+            projection=TEXT_SCORE_PROJECTION
+        )
+        
+        if skip == 0 and len(events) < limit:
+            prefix_criteria = {k: v for k, v in search_criteria.items() if k != "$text"}
+            prefix_criteria.update(prefix_filter("name", query))
+            prefix_criteria["_id"] = {"$nin": [ObjectId(event["id"]) for event in events]}
+            events.extend(await cls.find_many(
+                prefix_criteria,
+                limit=limit - len(events),
+                sort=[(prefix_key("name"), 1)]
+            ))
+        return events
+    
+    @classmethod
+    async def search_events_page(cls, query: str, event_type: Optional[str] = None,
+                                 is_virtual: Optional[bool] = None, limit: int = 10,
+                                 cursor: Optional[str] = None) -> Dict:
+        """
+        Search for events one page at a time, in start date order.
+        
+        Args:
+            query: Search query
+            event_type: Optional event type filter
+            is_virtual: Optional virtual event filter
+            limit: Maximum number of events to return
+            cursor: Cursor returned with the previous page
             
-        if is_virtual is not None:
-            search_criteria["is_virtual"] = is_virtual
+        Returns:
+            Dict: "events" on this page and "next_cursor" (None on the last page)
+        """
+        page = await cls.find_page(
+            cls._search_criteria(query, event_type, is_virtual),
+            limit=limit,
+            sort=[("start_date", 1)],
+            cursor=cursor
+        )
+        return {"events": page["items"], "next_cursor": page["next_cursor"]}
+    
+    @classmethod
+    async def autocomplete_events(cls, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest events whose name starts with a prefix.
+        
+        Args:
+            prefix: Prefix as typed by the user
+            limit: Maximum number of suggestions
             
+        Returns:
+            List[Dict]: Matching events with their name and start date
+        """
+        if not prefix.strip():
+            return []
         return await cls.find_many(
-            search_criteria,
+            prefix_filter("name", prefix),
             limit=limit,
-            skip=skip,
-            sort=[("start_date", 1)]
+            sort=[(prefix_key("name"), 1)],
+            projection={"name": 1, "start_date": 1}
         )
     
     @classmethod
-    async def add_participant(cls, event_id: str, user_id: str) -> Optional[Dict]:
+    async def get_search_facets(cls, query: str, upcoming_only: bool = False) -> Dict:
+        """
+        Count the events matching a search by event type, virtual flag and venue city.
+        
+        Args:
+            query: Search query (empty to count every event)
+            upcoming_only: Only count events that have not started yet
+            
+        Returns:
+            Dict: Lists of {"value", "count"} keyed by "event_type", "is_virtual" and "city"
+        """
+        def count_by(field: str) -> List[Dict]:
+            return [
+                {"$group": {"_id": field, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ]
+        
+        pipeline = [
+            {"$match": cls._search_criteria(query, upcoming_only=upcoming_only)},
+            {"$facet": {
+                "event_type": count_by("$event_type"),
+                "is_virtual": count_by("$is_virtual"),
+                "city": [
+                    {"$lookup": {
+                        "from": "venues",
+                        "let": {"venue_id": {"$convert": {
+                            "input": "$venue_id", "to": "objectId", "onError": None, "onNull": None
+                        }}},
+                        "pipeline": [
+                            {"$match": {"$expr": {"$eq": ["$_id", "$$venue_id"]}}},
+                            {"$project": {"city": 1}}
+                        ],
+                        "as": "venue"
+                    }},
+                    *count_by({"$arrayElemAt": ["$venue.city", 0]})
+                ]
+            }}
+        ]
+        
+        results = await cls.aggregate(pipeline)
+        facets = results[0] if results else {}
+        return {
+            name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets.get(name, [])]
+            for name in ("event_type", "is_virtual", "city")
+        }
+    
+    @classmethod
+    async def add_participant(cls, event_id: str, user_id: str) -> Dict:
         """
         Add a participant to an event.
+        A seat is reserved with a single conditional update, so concurrent
+        signups can never oversell the event, and the unique registration
+        index rejects a second signup by the same user.
         
         Args:
             event_id: Event ID
             user_id: User ID to add
             
         Returns:
-            Dict: Updated event document or None if not found or at capacity
+            Dict: Registration outcome with "status" (registered, already_registered,
+                sold_out or event_not_found) and the current "participant_count"
         """
-        event = await cls.get_event_by_id(event_id)
-        if not event:
-            return None
-            
-        # Check if event is at capacity
-        if len(event.get("participants", [])) >= event.get("capacity", 0) and event.get("capacity", 0) > 0:
-            return None
-            
-        return await cls.update_one(
-            {"_id": ObjectId(event_id)},
-            {"$addToSet": {"participants": user_id}}
+        if await RegistrationModel.is_registered(event_id, user_id):
+            event = await cls.find_one({"_id": ObjectId(event_id)}, {"participant_count": 1})
+            return {
+                "status": REGISTRATION_ALREADY_REGISTERED if event else REGISTRATION_EVENT_NOT_FOUND,
+                "participant_count": event.get("participant_count", 0) if event else 0
+            }
+        
+        reserved = await cls.update_one(
+            {
+                "_id": ObjectId(event_id),
+                # A capacity of 0 means unlimited
+                "$expr": {"$or": [
+                    {"$lte": [{"$ifNull": ["$capacity", 0]}, 0]},
+                    {"$lt": [{"$ifNull": ["$participant_count", 0]}, "$capacity"]}
+                ]}
+            },
+            {"$inc": {"participant_count": 1}},
+            projection={"participant_count": 1, "start_date": 1}
+        )
+        
+        if not reserved:
+            event = await cls.find_one({"_id": ObjectId(event_id)}, {"participant_count": 1})
+            return {
+                "status": REGISTRATION_SOLD_OUT if event else REGISTRATION_EVENT_NOT_FOUND,
+                "participant_count": event.get("participant_count", 0) if event else 0
+            }
+        
+        registration_id = await RegistrationModel.create_registration(
+            event_id, user_id, reserved.get("start_date")
         )
+        if registration_id is None:
+            # A concurrent signup by the same user won the race; give the seat back
+            released = await cls.update_one(
+                {"_id": ObjectId(event_id)},
+                {"$inc": {"participant_count": -1}},
+                projection={"participant_count": 1}
+            )
+            return {
+                "status": REGISTRATION_ALREADY_REGISTERED,
+                "participant_count": released["participant_count"] if released else 0
+            }
+        
+        from .analytics_model import EventAnalyticsModel
+        await EventAnalyticsModel.update_registration_count(event_id)
+        return {
+            "status": REGISTRATION_REGISTERED,
+            "participant_count": reserved["participant_count"]
+        }
     
     @classmethod
     async def remove_participant(cls, event_id: str, user_id: str) -> Optional[Dict]:
@@ -219,12 +436,20 @@ class EventModel(BaseModel):
             user_id: User ID to remove
             
         Returns:
-            Dict: Updated event document or None if not found
+            Dict: Updated event document or None if not found or not registered
         """
-        return await cls.update_one(
+        if not await RegistrationModel.delete_registration(event_id, user_id):
+            return None
+        
+        updated_event = await cls.update_one(
             {"_id": ObjectId(event_id)},
-            {"$pull": {"participants": user_id}}
+            {"$inc": {"participant_count": -1}}
         )
+        
+        if updated_event:
+            from .analytics_model import EventAnalyticsModel
+            await EventAnalyticsModel.update_registration_count(event_id, increment=-1)
+        return updated_event
     
     @classmethod
     async def get_event_participants(cls, event_id: str) -> List[str]:
@@ -237,8 +462,7 @@ class EventModel(BaseModel):
         Returns:
             List[str]: List of participant user IDs
         """
-        event = await cls.get_event_by_id(event_id)
-        return event.get("participants", []) if event else []
+        return await RegistrationModel.get_event_user_ids(event_id)
     
     @classmethod
     async def check_participant(cls, event_id: str, user_id: str) -> bool:
@@ -252,8 +476,30 @@ class EventModel(BaseModel):
         Returns:
             bool: True if user is a participant, False otherwise
         """
-        participants = await cls.get_event_participants(event_id)
-        return user_id in participants
+        return await RegistrationModel.is_registered(event_id, user_id)
+    
+    @classmethod
+    async def get_user_events(cls, user_id: str, upcoming_only: bool = False,
+                              limit: int = 0, cursor: Optional[str] = None) -> Dict:
+        """
+        Get a page of the events a user is registered for, ordered by start date.
+        
+        Args:
+            user_id: User ID
+            upcoming_only: Only include events that have not started yet
+            limit: Maximum number of events to return (0 for all)
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "events" on this page and "next_cursor" (None on the last page)
+        """
+        start_after = datetime.now(timezone.utc) if upcoming_only else None
+        page = await RegistrationModel.get_user_event_ids(user_id, start_after, limit, cursor)
+        events = await cls.load_many_by_ids(page["event_ids"])
+        return {
+            "events": [event for event in events if event],
+            "next_cursor": page["next_cursor"]
+        }
     
     @classmethod
     async def get_event_types(cls) -> List[str]:
@@ -329,17 +575,8 @@ class EventModel(BaseModel):
         Returns:
             List[Dict]: List of stakeholder user documents
         """
-        event = await cls.get_event_by_id(event_id)
-        if not event:
-            return []
-        
         # Get user information for all participants with "stakeholder" role
         from .user_model import UserModel
         
-        stakeholders = []
-        for participant_id in event["participants"]:
-            user = await UserModel.get_user_by_id(participant_id)
-            if user and user.get("role") == "stakeholder":
-                stakeholders.append(user)
-        
-        return stakeholders
\ No newline at end of file
+        users = await UserModel.load_many_by_ids(await cls.get_event_participants(event_id))
+        return [user for user in users if user and user.get("role") == "stakeholder"]
\ No newline at end of file
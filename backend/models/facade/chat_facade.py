@@ -62,8 +62,8 @@ class ChatFacade:
         
         # detailed participants list with user details
         detailed_participants_list = []
-        for participant_id in chat_room.get('participants', []):
-            user = await self.user_model.get_user_by_id(participant_id)
+        users = await self.user_model.load_many_by_ids(chat_room.get('participants', []))
+        for user in users:
             if user:
                 detailed_participants_list.append({
                     'id': user['id'],
@@ -102,7 +102,7 @@ class ChatFacade:
         message = await self.chat_message_model.get_message_by_id(message_id)
         
         # Detail with sender details
-        sender = await self.user_model.get_user_by_id(sender_id)
+        sender = await self.user_model.load_by_id(sender_id)
         if sender:
             message['sender_name'] = f"{sender.get('first_name', '')} {sender.get('last_name', '')}"
         
@@ -128,9 +128,11 @@ class ChatFacade:
         )
         
         # Enrich messages with sender details
+        senders = await self.user_model.load_many_by_ids(
+            message['sender_id'] for message in messages
+        )
         enriched_messages = []
-        for message in messages:
-            sender = await self.user_model.get_user_by_id(message['sender_id'])
+        for message, sender in zip(messages, senders):
             if sender:
                 message['sender_name'] = f"{sender.get('first_name', '')} {sender.get('last_name', '')}"
             enriched_messages.append(ChatMessageSchema(**message))
@@ -2,9 +2,10 @@
 Feedback model module for handling event and session feedback.
 Based on the FeedbackSchema.
 """
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 from .base_model import BaseModel
 
@@ -15,6 +16,11 @@ class FeedbackModel(BaseModel):
     Handles all database interactions for event and session feedback.
     """
     collection_name = "feedback"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("session_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ]
     
     @classmethod
     async def create_feedback(cls, user_id: str, event_id: str, rating: int,
@@ -73,71 +79,6 @@ class FeedbackModel(BaseModel):
         feedback_id = await cls.insert_one(feedback_data)
         return str(feedback_id)
     
-    @classmethod
-    async def create_question(cls, db, user_id, session_id, question_text):
-        doc = {
-            "user_id": user_id,
-            "session_id": session_id,
-            "question": question_text,
-            "answers": [],  # 👈 NEW
-            "created_at": datetime.utcnow()
-        }
-        result = db["questions"].insert_one(doc)
-        return result.inserted_id
-
-    @classmethod
-    async def get_questions_for_session(cls, db, session_id):
-        return list(db["questions"].find({"session_id": session_id}))
-
-    @classmethod
-    async def answer_question(cls, db, question_id, user_id, answer_text):
-        return db["questions"].update_one(
-            {"_id": ObjectId(question_id)},
-            {
-                "$push": {
-                    "answers": {
-                        "user_id": user_id,
-                        "text": answer_text,
-                        "timestamp": datetime.utcnow()
-                    }
-                }
-            }
-        )
-    
-    @classmethod
-    async def get_questions_for_session(cls, db, session_id: str) -> List[Dict]:
-        """
-        Retrieve all questions for a given session.
-        
-        Args:
-            db: Database session/connection reference.
-            session_id: Session ID.
-        
-        Returns:
-            List[Dict]: List of question documents.
-        """
-        questions = await cls.find_many({"session_id": session_id}, sort=[("created_at", -1)])
-        return questions
-    
-    @classmethod
-    async def answer_question(cls, db, question_id: str, answer_text: str) -> Optional[Dict]:
-        """
-        Answer a question by updating its answer field.
-        
-        Args:
-            db: Database session/connection reference.
-            question_id: The question's ID.
-            answer_text: The answer text.
-        
-        Returns:
-            Dict: The updated question document, or None if not found.
-        """
-        updated_question = await cls.update_one(
-            {"_id": ObjectId(question_id)},
-            {"$set": {"answer": answer_text, "answered_at": datetime.now(timezone.utc)}}
-        )
-        return updated_question
-
     @classmethod
     async def get_feedback_by_id(cls, feedback_id: str) -> Dict:
         """
@@ -169,6 +110,25 @@ class FeedbackModel(BaseModel):
             
         return await cls.find_many(query, sort=[("created_at", -1)])
     
+    @classmethod
+    def iter_event_feedback(cls, event_id: str, include_anonymous: bool = True,
+                            batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream all feedback for a specific event, newest first.
+        
+        Args:
+            event_id: Event ID.
+            include_anonymous: Whether to include anonymous feedback.
+            batch_size: Number of feedback documents fetched per round trip.
+            
+        Returns:
+            AsyncIterator[Dict]: Feedback documents.
+        """
+        query = {"event_id": event_id}
+        if not include_anonymous:
+            query["is_anonymous"] = False
+        return cls.iter_many(query, sort=[("created_at", -1)], batch_size=batch_size)
+    
     @classmethod
     async def get_session_feedback(cls, session_id: str, include_anonymous: bool = True) -> List[Dict]:
         """
@@ -0,0 +1,181 @@
+"""
+Hub module fanning live events out to the clients connected to this worker.
+Each connected WebSocket subscribes to a topic (a chat room, a poll or a
+session's Q&A leaderboard) and gets a bounded send queue. Publishing never
+waits on a client: one whose queue is full is cut off and reconnects,
+resuming where it left off.
+Events reach the hubs through the event bus, so every worker sees them.
+"""
+import asyncio
+import os
+from typing import Dict, Optional, Set
+
+from .pubsub import event_bus, CHANNEL_CHAT, CHANNEL_POLLS
+
+
+# Events buffered per client before it counts as too slow and is disconnected
+SEND_QUEUE_SIZE = int(os.getenv("CHAT_SEND_QUEUE_SIZE", "256"))
+
+# Chat room event types
+EVENT_MESSAGE = "message"
+EVENT_MESSAGE_UPDATED = "message_updated"
+EVENT_MESSAGE_DELETED = "message_deleted"
+
+# Poll event types
+EVENT_POLL_UPDATED = "poll_updated"
+EVENT_POLL_CLOSED = "poll_closed"
+
+# Q&A event types: a question changed (on the bus), and the leaderboard sent to clients
+EVENT_QUESTION_CHANGED = "question_changed"
+EVENT_LEADERBOARD = "leaderboard"
+EVENT_LEADERBOARD_DELTA = "leaderboard_delta"
+
+
+class Subscriber:
+    """
+    One connected client of a topic.
+    Events wait in a bounded queue until the client's send loop takes them.
+    """
+
+    def __init__(self, topic: str, queue_size: int = SEND_QUEUE_SIZE):
+        self.topic = topic
+        self.queue: "asyncio.Queue[Dict]" = asyncio.Queue(maxsize=queue_size)
+        # Set once the client fell behind; its send loop should then disconnect it
+        self.overflowed = asyncio.Event()
+
+    def offer(self, event: Dict) -> bool:
+        """
+        Queue an event without waiting.
+
+        Args:
+            event: Event to send
+
+        Returns:
+            bool: False if the queue was full and the client is now overflowed
+        """
+        if self.overflowed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed.set()
+            return False
+
+    async def next_event(self) -> Optional[Dict]:
+        """
+        Wait for the next event to send.
+
+        Returns:
+            Dict: Next event, or None once the client has overflowed
+        """
+        if self.overflowed.is_set():
+            return None
+        get = asyncio.ensure_future(self.queue.get())
+        overflow = asyncio.ensure_future(self.overflowed.wait())
+        done, _ = await asyncio.wait({get, overflow}, return_when=asyncio.FIRST_COMPLETED)
+        overflow.cancel()
+        if get in done:
+            return get.result()
+        get.cancel()
+        return None
+
+
+class Hub:
+    """In-process registry of the subscribers to each topic."""
+
+    def __init__(self):
+        self._topics: Dict[str, Set[Subscriber]] = {}
+        self.stats = {"published": 0, "delivered": 0, "overflowed": 0}
+
+    def subscribe(self, topic: str) -> Subscriber:
+        """
+        Register a client for a topic's events.
+
+        Args:
+            topic: Topic ID (chat room or poll ID)
+
+        Returns:
+            Subscriber: Subscriber to read events from
+        """
+        subscriber = Subscriber(topic)
+        self._topics.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """
+        Remove a client from its topic.
+
+        Args:
+            subscriber: Subscriber returned by subscribe
+        """
+        subscribers = self._topics.get(subscriber.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._topics[subscriber.topic]
+
+    def publish(self, topic: str, event: Dict) -> int:
+        """
+        Send an event to this worker's clients of a topic, without waiting on any of them.
+
+        Args:
+            topic: Topic ID
+            event: Event with a "type" and its payload
+
+        Returns:
+            int: Number of clients the event was queued for
+        """
+        self.stats["published"] += 1
+        delivered = 0
+        for subscriber in list(self._topics.get(topic, ())):
+            if subscriber.offer(event):
+                delivered += 1
+            else:
+                self.stats["overflowed"] += 1
+                self.unsubscribe(subscriber)
+        self.stats["delivered"] += delivered
+        return delivered
+
+    def client_count(self, topic: str) -> int:
+        """Number of this worker's clients of a topic."""
+        return len(self._topics.get(topic, ()))
+
+    def get_stats(self) -> Dict:
+        """
+        Connection and delivery counters.
+
+        Returns:
+            Dict: Topics and clients connected, with publish counters
+        """
+        return {
+            "topics": len(self._topics),
+            "clients": sum(len(subscribers) for subscribers in self._topics.values()),
+            **self.stats,
+        }
+
+    def deliver(self, message: Dict):
+        """Bus handler: publish a bus message's event to its topic."""
+        self.publish(message["topic"], message["event"])
+
+
+# Process-wide hubs behind the chat room, poll and Q&A leaderboard WebSockets
+chat_hub = Hub()
+poll_hub = Hub()
+question_hub = Hub()
+
+event_bus.subscribe(CHANNEL_CHAT, chat_hub.deliver)
+event_bus.subscribe(CHANNEL_POLLS, poll_hub.deliver)
+
+
+async def broadcast(channel: str, topic: str, event: Dict):
+    """
+    Publish an event to a topic's clients on every worker.
+
+    Args:
+        channel: Bus channel (CHANNEL_CHAT, CHANNEL_POLLS or CHANNEL_QUESTIONS)
+        topic: Topic ID (chat room, poll or session ID)
+        event: Event with a "type" and its payload
+    """
+    await event_bus.publish(channel, {"topic": topic, "event": event})
@@ -0,0 +1,96 @@
+"""
+Jobs module with the handlers the scheduler runs.
+Polls are closed when they end, scheduled reports are generated and
+distributed at their frequency, and scheduled campaigns are handed to the
+mailer once due. Importing this module registers the handlers.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .analytics_model import ReportConfigModel
+from .email_model import EmailCampaignModel, EmailJobModel
+from .mailer import mailer
+from .poll_model import PollModel
+from .registration_model import RegistrationModel
+from .scheduler import scheduler, JOB_CLOSE_POLL, JOB_SEND_REPORT, JOB_SEND_CAMPAIGN
+from .user_model import UserModel
+
+
+async def close_poll(payload: Dict) -> Optional[datetime]:
+    """Close a poll at its end time, unless it was extended or closed meanwhile."""
+    await PollModel.close_if_expired(payload["poll_id"])
+    return None
+
+
+async def send_report(payload: Dict) -> Optional[datetime]:
+    """Generate and distribute a scheduled report, then arm its next run."""
+    config_id = payload["config_id"]
+    config = await ReportConfigModel.get_report_config(config_id)
+    next_run_at = ReportConfigModel.next_run_at(config) if config else None
+    if next_run_at is None:
+        # Deleted or no longer scheduled
+        return None
+
+    report = await ReportConfigModel.generate_report(config_id)
+    if "error" in report:
+        return None
+    distribution = await ReportConfigModel.distribute_report(config_id, report)
+    await ReportConfigModel.record_distribution(config_id, distribution)
+    return next_run_at
+
+
+async def campaign_recipients(campaign: Dict) -> List[Tuple[str, str]]:
+    """
+    Resolve a campaign's audience to its recipients.
+    The audience names users ("user_ids") or an event whose attendees
+    receive it ("event_id", defaulting to the campaign's event), optionally
+    narrowed to some roles ("roles").
+
+    Args:
+        campaign: Campaign document
+
+    Returns:
+        List[Tuple[str, str]]: (user_id, email) of each recipient with an email
+    """
+    audience = campaign.get("audience") or {}
+    roles = set(audience.get("roles") or [])
+    if audience.get("user_ids"):
+        users = await UserModel.load_many_by_ids(audience["user_ids"])
+        people = [(user["id"], user.get("email"), user.get("role")) for user in users if user]
+    else:
+        event_id = audience.get("event_id") or campaign["event_id"]
+        people = [
+            (attendee["user_id"], attendee.get("email"), attendee.get("role"))
+            async for attendee in RegistrationModel.iter_event_attendees(event_id)
+        ]
+    return [(user_id, email) for user_id, email, role in people if email and (not roles or role in roles)]
+
+
+async def send_campaign(payload: Dict) -> Optional[datetime]:
+    """Hand a due campaign to the mailer and start tracking its recipients."""
+    campaign_id = payload["campaign_id"]
+    campaign = await EmailCampaignModel.start_sending(campaign_id)
+    if not campaign:
+        # Cancelled, rescheduled or already sent
+        return None
+
+    recipients = await campaign_recipients(campaign)
+    # Reserve the job ID on the campaign first, so a retry completes the same job
+    job_id = await EmailCampaignModel.reserve_email_job(campaign_id)
+    if job_id is None:
+        return None
+    await EmailJobModel.create_job(
+        subject=campaign["subject"],
+        body=campaign["body_html"],
+        recipients=[email for _, email in recipients],
+        event_id=campaign.get("event_id"),
+        job_id=job_id
+    )
+    mailer.submit(job_id)
+    await EmailCampaignModel.record_send(campaign_id, [user_id for user_id, _ in recipients])
+    return None
+
+
+scheduler.register(JOB_CLOSE_POLL, close_poll)
+scheduler.register(JOB_SEND_REPORT, send_report)
+scheduler.register(JOB_SEND_CAMPAIGN, send_campaign)
@@ -0,0 +1,162 @@
+"""
+Batch loader module for coalescing per-ID lookups.
+Provides a DataLoader-style loader that merges concurrent ID lookups
+into a single query and caches the results for the current request.
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+# Loaders for the current request, keyed by model class.
+# None means no request scope is active and loaders are not cached.
+_request_loaders: ContextVar[Optional[Dict[Any, "BatchLoader"]]] = ContextVar(
+    "request_loaders", default=None
+)
+
+
+class BatchLoader:
+    """
+    Collects keys requested during the same event loop tick and resolves
+    them with one call to the batch function.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                 max_batch_size: int = 1000):
+        """
+        Initialize the loader.
+
+        Args:
+            batch_fn: Coroutine taking a list of keys and returning a dict of key -> value.
+                Keys missing from the dict resolve to None.
+            max_batch_size: Maximum number of keys sent to batch_fn at once
+        """
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        # Keys waiting for the next dispatch, with the futures to resolve
+        self._queue: List[Tuple[Hashable, asyncio.Future]] = []
+
+    def _enqueue(self, key: Hashable) -> asyncio.Future:
+        """Return the future for a key, queueing it for the next dispatch if new."""
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.append((key, future))
+
+        # Dispatch once every coroutine scheduled in this tick has queued its keys
+        if len(self._queue) == 1:
+            loop.call_soon(lambda: loop.create_task(self._dispatch()))
+        return future
+
+    async def _dispatch(self):
+        """Resolve every queued key with as few batch calls as possible."""
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self._max_batch_size):
+            batch = queue[start:start + self._max_batch_size]
+            try:
+                results = await self._batch_fn([key for key, _ in batch])
+            except Exception as e:
+                for key, future in batch:
+                    # Failures are not cached, so a later load retries
+                    if self._cache.get(key) is future:
+                        del self._cache[key]
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # The futures are resolved directly; clear() may have dropped them from the cache
+            for key, future in batch:
+                if not future.done():
+                    future.set_result(results.get(key))
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Load a single value.
+
+        Args:
+            key: Key to load
+
+        Returns:
+            Any: Loaded value or None if not found
+        """
+        return await self._enqueue(key)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """
+        Load several values with a single batch call.
+
+        Args:
+            keys: Keys to load (duplicates are fetched once)
+
+        Returns:
+            List[Any]: Values in the same order as keys, None where not found
+        """
+        futures = [self._enqueue(key) for key in keys]
+        if not futures:
+            return []
+        return list(await asyncio.gather(*futures))
+
+    def prime(self, key: Hashable, value: Any):
+        """Seed the cache with an already known value."""
+        if key in self._cache:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._cache[key] = future
+
+    def clear(self, key: Optional[Hashable] = None):
+        """
+        Drop one cached key, or the whole cache when no key is given.
+        Keys still waiting for dispatch stay cached, since their query runs
+        after the write that cleared them; loads already sent are dropped
+        but still resolve for the callers awaiting them.
+        """
+        queued = {queued_key for queued_key, _ in self._queue}
+        keys = list(self._cache) if key is None else [key]
+        for cached_key in keys:
+            if cached_key not in queued:
+                self._cache.pop(cached_key, None)
+
+
+def get_request_loader(owner: Any, factory: Callable[[], BatchLoader]) -> BatchLoader:
+    """
+    Get the loader for owner in the current request scope.
+    Outside a request scope a fresh, uncached loader is returned.
+
+    Args:
+        owner: Key identifying the loader (usually a model class)
+        factory: Callable building a new loader
+
+    Returns:
+        BatchLoader: Loader for the current scope
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return factory()
+    loader = loaders.get(owner)
+    if loader is None:
+        loader = loaders[owner] = factory()
+    return loader
+
+
+def clear_request_loader(owner: Any):
+    """Invalidate the cached results of owner's loader in the current request scope."""
+    loaders = _request_loaders.get()
+    if loaders and owner in loaders:
+        loaders[owner].clear()
+
+
+@contextmanager
+def loader_scope():
+    """Open a request scope in which loaders cache their results."""
+    token = _request_loaders.set({})
+    try:
+        yield
+    finally:
+        _request_loaders.reset(token)
@@ -0,0 +1,291 @@
+"""
+Mailer module delivering email jobs in the background.
+A job's deliveries are streamed into a bounded queue and sent by a fixed
+pool of workers, each holding one persistent SMTP connection, so a large
+campaign neither blocks the request that created it nor opens a
+connection per recipient. Failed sends are retried with exponential
+backoff; every recipient's status is kept in EmailDeliveryModel.
+
+The SMTP server is configured with SMTP_HOST, SMTP_PORT and SMTP_USE_SSL;
+point them at a local sink (python -m devtools.smtp_sink) to try
+campaigns without sending real mail.
+"""
+import asyncio
+import os
+import smtplib
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from .email_model import EmailJobModel, EmailDeliveryModel
+
+load_dotenv()
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+EMAIL_SENDER = os.getenv("EMAIL_SENDER")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")  # Use App Password if Gmail 2FA is on
+
+# Concurrent SMTP connections, and deliveries waiting for one
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_QUEUE_SIZE = int(os.getenv("SMTP_QUEUE_SIZE", "1000"))
+# Attempts per recipient, and the delay before the first retry (doubled each time)
+SMTP_MAX_ATTEMPTS = int(os.getenv("SMTP_MAX_ATTEMPTS", "4"))
+SMTP_RETRY_BASE_SECONDS = float(os.getenv("SMTP_RETRY_BASE_SECONDS", "2"))
+
+# A queued delivery: (job_id, delivery_id, email)
+Delivery = Tuple[str, str, str]
+
+
+def is_permanent(error: Exception) -> bool:
+    """
+    Whether a send failure will not go away on retry.
+    5xx replies (unknown mailbox, rejected message) are permanent; 4xx
+    replies and dropped connections are worth retrying.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SMTPConnection:
+    """
+    Persistent SMTP connection, opened and logged into on first use.
+    Blocking; the mailer drives it from a worker thread.
+    """
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, use_ssl: bool = SMTP_USE_SSL,
+                 sender: Optional[str] = EMAIL_SENDER, password: Optional[str] = EMAIL_PASSWORD):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.sender = sender
+        self.password = password
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = smtp_class(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        if self.password:
+            server.login(self.sender, self.password)
+        return server
+
+    def send(self, to: str, message: str):
+        """
+        Send one message, reconnecting if the server dropped the connection.
+
+        Args:
+            to: Recipient email address
+            message: Encoded message
+        """
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.sendmail(self.sender, to, message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Not a reply from the server; the next send starts afresh
+            self.close()
+            raise
+        except smtplib.SMTPResponseException as e:
+            # 421: the server is closing the connection
+            if e.smtp_code == 421:
+                self.close()
+            raise
+
+    def close(self):
+        """Close the connection, if open."""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            pass
+        self._server = None
+
+
+class Mailer:
+    """
+    Background delivery of email jobs.
+    Each job gets a feeder task streaming its undelivered recipients into
+    the shared queue; SMTP_POOL_SIZE workers take deliveries off the queue,
+    claim them (so several app workers never send the same one) and send
+    them over their own connection.
+    """
+
+    def __init__(self, pool_size: int = SMTP_POOL_SIZE, queue_size: int = SMTP_QUEUE_SIZE,
+                 max_attempts: int = SMTP_MAX_ATTEMPTS, retry_base: float = SMTP_RETRY_BASE_SECONDS,
+                 connection_factory=SMTPConnection):
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.connection_factory = connection_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._connections: list = []
+        self._feeders: Dict[str, asyncio.Task] = {}
+        self._retries: Set[asyncio.Task] = set()
+        # Subject and body of the jobs being delivered
+        self._jobs: Dict[str, Dict] = {}
+        self.stats = {"sent": 0, "failed": 0, "retried": 0}
+
+    async def start(self):
+        """Start the workers and resume jobs left unfinished by a restart."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        for _ in range(self.pool_size):
+            connection = self.connection_factory()
+            self._connections.append(connection)
+            self._workers.append(asyncio.create_task(self._work(connection)))
+        for job in await EmailJobModel.get_unfinished_jobs():
+            self.submit(job["id"])
+
+    def submit(self, job_id: str):
+        """
+        Queue a job's undelivered recipients for sending.
+
+        Args:
+            job_id: Job ID
+        """
+        if self._queue is None:
+            raise RuntimeError("Mailer is not started")
+        if job_id in self._feeders:
+            return
+        task = asyncio.create_task(self._feed(job_id))
+        self._feeders[job_id] = task
+        task.add_done_callback(lambda _: self._feeders.pop(job_id, None))
+
+    async def _feed(self, job_id: str):
+        """Stream a job's undelivered recipients into the queue, waiting while it is full."""
+        try:
+            job = await EmailJobModel.get_job(job_id)
+            if not job or job["status"] == "completed":
+                return
+            self._jobs[job_id] = self._content(job)
+            await EmailJobModel.mark_running(job_id)
+            async for delivery in EmailDeliveryModel.iter_undelivered(job_id):
+                await self._queue.put((job_id, delivery["id"], delivery["email"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Mailer ERROR] Failed to queue job {job_id}: {str(e)}")
+
+    @staticmethod
+    def _content(job: Dict) -> Dict:
+        return {"subject": job["subject"], "body": job["body"]}
+
+    async def _job_content(self, job_id: str) -> Optional[Dict]:
+        content = self._jobs.get(job_id)
+        if content is None:
+            job = await EmailJobModel.get_job(job_id)
+            if job:
+                content = self._jobs[job_id] = self._content(job)
+        return content
+
+    @staticmethod
+    def build_message(sender: Optional[str], to: str, subject: str, body: str) -> str:
+        """Build the HTML message sent to one recipient."""
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = sender or ""
+        message["To"] = to
+        message.attach(MIMEText(body, "html"))
+        return message.as_string()
+
+    async def _work(self, connection: SMTPConnection):
+        """Send queued deliveries over one connection until stopped."""
+        while True:
+            delivery = await self._queue.get()
+            try:
+                await self._deliver(connection, *delivery)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Mailer ERROR] Delivery {delivery[1]} failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, connection: SMTPConnection, job_id: str, delivery_id: str, email: str):
+        """Claim, send and record one delivery, scheduling a retry on a transient failure."""
+        claimed = await EmailDeliveryModel.claim(delivery_id)
+        if claimed is None:
+            return
+        content = await self._job_content(job_id)
+        if content is None:
+            return
+
+        try:
+            message = self.build_message(connection.sender, email, content["subject"], content["body"])
+            await asyncio.to_thread(connection.send, email, message)
+        except Exception as e:
+            retrying = not is_permanent(e) and claimed["attempts"] < self.max_attempts
+            await EmailDeliveryModel.mark_failed(delivery_id, str(e) or type(e).__name__, retrying)
+            if retrying:
+                self.stats["retried"] += 1
+                delay = self.retry_base * 2 ** (claimed["attempts"] - 1)
+                self._retry_later((job_id, delivery_id, email), delay)
+            else:
+                self.stats["failed"] += 1
+                await self._record_result(job_id, sent=False)
+            return
+
+        self.stats["sent"] += 1
+        await EmailDeliveryModel.mark_sent(delivery_id)
+        await self._record_result(job_id, sent=True)
+
+    async def _record_result(self, job_id: str, sent: bool):
+        job = await EmailJobModel.record_result(job_id, sent)
+        if job and job["status"] == "completed":
+            self._jobs.pop(job_id, None)
+
+    def _retry_later(self, delivery: Delivery, delay: float):
+        """Requeue a delivery after a delay, without holding up a worker."""
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self._queue.put(delivery)
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def stop(self):
+        """Stop the workers and close their connections; unsent deliveries resume on the next start."""
+        if self._queue is None:
+            return
+        tasks = [*self._feeders.values(), *self._retries, *self._workers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(asyncio.to_thread(connection.close) for connection in self._connections))
+        self._feeders.clear()
+        self._retries.clear()
+        self._workers.clear()
+        self._connections.clear()
+        self._jobs.clear()
+        self._queue = None
+
+    def get_stats(self) -> Dict:
+        """
+        Queue depth and delivery counters of this worker.
+
+        Returns:
+            Dict: Pool size, queued and retrying deliveries, active jobs and counters
+        """
+        return {
+            "pool_size": self.pool_size,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "retrying": len(self._retries),
+            "active_jobs": len(self._feeders),
+            **self.stats,
+        }
+
+
+# Process-wide mailer; started and stopped with the app
+mailer = Mailer()
@@ -0,0 +1,660 @@
+"""
+Migration runner module for bootstrapping the database.
+Creates the indexes each model declares and applies versioned data
+migrations exactly once, recording them in the schema_migrations collection.
+A worker running a migration holds a lease on it; if the worker dies the
+lease goes stale and another worker takes the migration over, while the
+rest wait for it to be applied before serving.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, List, Tuple
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from .base_model import BaseModel, Database
+
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+# A running migration whose lease was not renewed for this long is taken over
+MIGRATION_LEASE_SECONDS = float(os.getenv("MIGRATION_LEASE_SECONDS", "60"))
+# How often workers waiting for another worker's migration check on it
+MIGRATION_POLL_SECONDS = float(os.getenv("MIGRATION_POLL_SECONDS", "1"))
+
+# Versioned data migrations as (version, name, coroutine taking the database).
+# Append new entries with increasing versions; never reorder or edit applied ones.
+MIGRATIONS: List[Tuple[int, str, Callable[..., Awaitable[None]]]] = []
+
+
+def migration(version: int, name: str):
+    """Register a coroutine as a versioned migration."""
+    def decorator(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return fn
+    return decorator
+
+
+def _all_models(cls=BaseModel) -> List[type]:
+    """Return every BaseModel subclass, depth first."""
+    models = []
+    for subclass in cls.__subclasses__():
+        models.append(subclass)
+        models.extend(_all_models(subclass))
+    return models
+
+
+def collect_index_specs() -> Dict[str, List[IndexModel]]:
+    """
+    Gather the index declarations of every model.
+
+    Returns:
+        Dict[str, List[IndexModel]]: Index models keyed by collection name
+    """
+    # Import the modules that declare models so their subclasses are registered
+    import models  # noqa: F401
+    from controller.services.materials import database as materials_db
+    from controller.services.messages import database as messages_db
+    from . import pubsub
+
+    specs: Dict[str, List[IndexModel]] = {}
+    for model in _all_models():
+        if model.collection_name and model.indexes:
+            specs.setdefault(model.collection_name, []).extend(model.indexes)
+
+    specs.setdefault("materials", []).extend(materials_db.INDEXES)
+    specs.setdefault("messages", []).extend(messages_db.INDEXES)
+    specs.setdefault("conversations", []).extend(messages_db.CONVERSATION_INDEXES)
+    specs.setdefault(pubsub.BUS_COLLECTION, []).extend(pubsub.INDEXES)
+    return specs
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every declared index. Safe to run on each startup, since
+    MongoDB treats re-creating an identical index as a no-op.
+
+    Args:
+        db: Async database instance
+
+    Returns:
+        Dict[str, List[str]]: Index names ensured, keyed by collection name
+    """
+    ensured = {}
+    for collection_name, indexes in collect_index_specs().items():
+        try:
+            ensured[collection_name] = await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # Keep booting; a conflicting or duplicate-violating index must be fixed by hand
+            print(f"[migrations] Could not create indexes on {collection_name}: {e}")
+    return ensured
+
+
+async def _claim(collection, version: int, name: str, owner: str) -> bool:
+    """
+    Claim a migration version, waiting while another worker runs it.
+
+    Returns:
+        bool: True if this worker must run the migration, False once it is applied
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=MIGRATION_LEASE_SECONDS)
+        try:
+            await collection.insert_one({
+                "_id": version,
+                "name": name,
+                "status": "running",
+                "owner": owner,
+                "started_at": now,
+                "lease_until": lease_until
+            })
+            return True
+        except DuplicateKeyError:
+            pass
+
+        # Take over a run whose worker stopped renewing its lease
+        stale = await collection.find_one_and_update(
+            {
+                "_id": version,
+                "status": "running",
+                "$or": [
+                    {"lease_until": {"$lt": now}},
+                    # Claims recorded before leases existed
+                    {"lease_until": {"$exists": False},
+                     "started_at": {"$lt": now - timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+                ]
+            },
+            {"$set": {"owner": owner, "started_at": now, "lease_until": lease_until}}
+        )
+        if stale:
+            print(f"[migrations] Took over {version}: {name} from {stale.get('owner')}")
+            return True
+
+        current = await collection.find_one({"_id": version}, {"status": 1})
+        if current and current.get("status") == "applied":
+            return False
+        if current:
+            await asyncio.sleep(MIGRATION_POLL_SECONDS)
+
+
+async def _renew_lease(collection, version: int, owner: str):
+    """Keep renewing the lease of a migration while it runs."""
+    while True:
+        await asyncio.sleep(MIGRATION_LEASE_SECONDS / 3)
+        await collection.update_one(
+            {"_id": version, "owner": owner, "status": "running"},
+            {"$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=MIGRATION_LEASE_SECONDS)}}
+        )
+
+
+async def apply_migrations(db) -> List[int]:
+    """
+    Apply pending versioned migrations in order.
+    Each version is claimed with a lease, so only one worker runs it at a
+    time; the others wait until it is applied, and take it over if the
+    lease goes stale. Migrations must therefore be safe to run again.
+
+    Args:
+        db: Async database instance
+
+    Returns:
+        List[int]: Versions applied by this call
+    """
+    collection = db[MIGRATIONS_COLLECTION]
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if not await _claim(collection, version, name, owner):
+            continue
+
+        renewer = asyncio.create_task(_renew_lease(collection, version, owner))
+        try:
+            await fn(db)
+        except Exception:
+            # Release the claim so a waiting worker or the next startup retries this version
+            await collection.delete_one({"_id": version, "owner": owner})
+            raise
+        finally:
+            renewer.cancel()
+
+        await collection.update_one(
+            {"_id": version, "owner": owner},
+            {
+                "$set": {"status": "applied", "applied_at": datetime.now(timezone.utc)},
+                "$unset": {"lease_until": ""}
+            }
+        )
+        print(f"[migrations] Applied {version}: {name}")
+        applied.append(version)
+    return applied
+
+
+async def run_migrations():
+    """Bootstrap indexes and apply pending migrations on the models' database."""
+    db = await Database.get_db()
+    ensured = await ensure_indexes(db)
+    print(f"[migrations] Ensured indexes on {len(ensured)} collections")
+    await apply_migrations(db)
+
+
+@migration(1, "drop legacy unique indexes on unused *_id fields")
+async def drop_legacy_id_indexes(db):
+    """
+    The old init_db created unique indexes on fields no document has,
+    which rejects every insert after the first. Drop them if present.
+    """
+    legacy = {
+        "events": "event_id_1",
+        "venues": "venue_id_1",
+        "sessions": "session_id_1",
+        "feedback": "feedback_id_1",
+        "chat": "chat_id_1",
+    }
+    for collection_name, index_name in legacy.items():
+        existing = await db[collection_name].index_information()
+        if index_name in existing:
+            await db[collection_name].drop_index(index_name)
+
+
+@migration(2, "backfill events.participant_count")
+async def backfill_participant_count(db):
+    """Seed the maintained participant counter from the embedded participant lists."""
+    await db["events"].update_many(
+        {"participant_count": {"$exists": False}},
+        [{"$set": {"participant_count": {"$size": {"$ifNull": ["$participants", []]}}}}]
+    )
+
+
+@migration(3, "move events.participants into the registrations collection")
+async def backfill_registrations(db):
+    """
+    Create one registration per embedded participant, recount each event
+    from its registrations and drop the embedded participant lists.
+    """
+    events = db["events"].find(
+        {"participants": {"$exists": True}},
+        {"participants": 1, "start_date": 1, "created_at": 1}
+    )
+    async for event in events:
+        event_id = str(event["_id"])
+        participants = list(dict.fromkeys(event.get("participants") or []))
+        if participants:
+            await db["registrations"].bulk_write([
+                UpdateOne(
+                    {"event_id": event_id, "user_id": user_id},
+                    {"$setOnInsert": {
+                        "start_date": event.get("start_date"),
+                        "registered_at": event.get("created_at")
+                    }},
+                    upsert=True
+                )
+                for user_id in participants
+            ], ordered=False)
+
+        participant_count = await db["registrations"].count_documents({"event_id": event_id})
+        await db["events"].update_one(
+            {"_id": event["_id"]},
+            {"$set": {"participant_count": participant_count}, "$unset": {"participants": ""}}
+        )
+
+
+@migration(4, "drop indexes superseded by keyset pagination indexes")
+async def drop_superseded_indexes(db):
+    """
+    Paginated sorts now end in _id, so the indexes they use gained an _id
+    suffix. The shorter indexes they replace are prefixes and can go.
+    """
+    superseded = {
+        "events": ["start_date_1", "organizer_id_1_start_date_1"],
+        "registrations": ["user_id_1_start_date_1"],
+        "chat_messages": ["chat_room_id_1_created_at_-1"],
+        "payments": ["user_id_1"],
+    }
+    for collection_name, index_names in superseded.items():
+        existing = await db[collection_name].index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                await db[collection_name].drop_index(index_name)
+
+
+@migration(5, "backfill lowercase prefix search fields")
+async def backfill_prefix_search_fields(db):
+    """Add the *_lc copies used by prefix search to existing events and venues."""
+    from .event_model import EventModel
+    from .venue_model import VenueModel
+    from .search import search_keys
+
+    for model in (EventModel, VenueModel):
+        collection = db[model.collection_name]
+        projection = {field: 1 for field in model.prefix_fields}
+        updates = []
+        async for document in collection.find({}, projection):
+            keys = search_keys(document, model.prefix_fields)
+            if keys:
+                updates.append(UpdateOne({"_id": document["_id"]}, {"$set": keys}))
+            if len(updates) >= 1000:
+                await collection.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+
+
+@migration(6, "replace embedded chat messages with room summaries")
+async def summarize_chat_rooms(db):
+    """
+    Chat history is read from chat_messages only. Give each room its
+    message count, last message and last activity, then drop the embedded
+    room message arrays and the copies of replies kept on thread parents.
+    """
+    rooms = db["chat_rooms"]
+    updates = []
+    summaries = db["chat_messages"].aggregate([
+        {"$sort": {"chat_room_id": 1, "created_at": -1, "_id": -1}},
+        {"$group": {
+            "_id": "$chat_room_id",
+            "message_count": {"$sum": 1},
+            "last_message": {"$first": {
+                "id": {"$toString": "$_id"},
+                "text": "$text",
+                "sender_id": "$sender_id",
+                "chat_room_id": "$chat_room_id",
+                "created_at": "$created_at"
+            }}
+        }}
+    ], allowDiskUse=True)
+    async for summary in summaries:
+        if not ObjectId.is_valid(summary["_id"]):
+            continue
+        updates.append(UpdateOne({"_id": ObjectId(summary["_id"])}, {"$set": {
+            "message_count": summary["message_count"],
+            "last_message": summary["last_message"],
+            "last_activity": summary["last_message"]["created_at"]
+        }}))
+        if len(updates) >= 1000:
+            await rooms.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await rooms.bulk_write(updates, ordered=False)
+
+    await rooms.update_many(
+        {"message_count": {"$exists": False}},
+        [{"$set": {"message_count": 0, "last_message": None, "last_activity": "$created_at"}}]
+    )
+    await rooms.update_many({"messages": {"$exists": True}}, {"$unset": {"messages": ""}})
+    await db["chat_messages"].update_many(
+        {"thread_messages": {"$exists": True}},
+        [{"$set": {"thread_count": {"$size": "$thread_messages"}}}, {"$unset": "thread_messages"}]
+    )
+
+
+@migration(7, "build direct message conversations")
+async def backfill_conversations(db):
+    """
+    Build one conversation per pair of users who exchanged direct messages,
+    with its last message and message count. Unread counts start at zero.
+    """
+    conversations = db["conversations"]
+    updates = []
+    summaries = db["messages"].aggregate([
+        {"$sort": {"timestamp": -1}},
+        {"$group": {
+            "_id": {"$concat": [
+                {"$min": ["$sender", "$recipient"]}, ":", {"$max": ["$sender", "$recipient"]}
+            ]},
+            "message_count": {"$sum": 1},
+            "last_message": {"$first": {
+                "id": {"$toString": "$_id"},
+                "sender": "$sender",
+                "recipient": "$recipient",
+                "content": "$content",
+                "timestamp": "$timestamp"
+            }}
+        }}
+    ], allowDiskUse=True)
+    async for summary in summaries:
+        participants = summary["_id"].split(":")
+        updates.append(UpdateOne({"_id": summary["_id"]}, {"$set": {
+            "participants": participants,
+            "last_message": summary["last_message"],
+            "last_timestamp": summary["last_message"]["timestamp"],
+            "message_count": summary["message_count"],
+            "unread": {user_id: 0 for user_id in participants}
+        }}, upsert=True))
+        if len(updates) >= 1000:
+            await conversations.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await conversations.bulk_write(updates, ordered=False)
+
+
+@migration(8, "move email campaign tracking into its own collection")
+async def backfill_email_tracking(db):
+    """
+    Create one tracking entry per embedded campaign tracking entry, recount
+    each campaign's metrics from its entries and drop the embedded arrays.
+    """
+    campaigns = db["email_campaigns"].find({"tracking": {"$exists": True}}, {"tracking": 1})
+    async for campaign in campaigns:
+        campaign_id = str(campaign["_id"])
+        entries = {entry["user_id"]: entry for entry in campaign.get("tracking") or [] if entry.get("user_id")}
+        if entries:
+            await db["email_tracking"].bulk_write([
+                UpdateOne(
+                    {"campaign_id": campaign_id, "user_id": user_id},
+                    {"$setOnInsert": {
+                        "sent_at": entry.get("sent_at"),
+                        "opened": bool(entry.get("opened")),
+                        "opened_at": entry.get("opened_at"),
+                        "clicked": bool(entry.get("clicked")),
+                        "clicked_at": entry.get("clicked_at"),
+                        "click_count": len(entry.get("clicks") or []),
+                        "clicks": entry.get("clicks") or []
+                    }},
+                    upsert=True
+                )
+                for user_id, entry in entries.items()
+            ], ordered=False)
+
+        tracking = db["email_tracking"]
+        await db["email_campaigns"].update_one(
+            {"_id": campaign["_id"]},
+            {
+                "$set": {
+                    "metrics.total_sent": await tracking.count_documents({"campaign_id": campaign_id}),
+                    "metrics.opened": await tracking.count_documents({"campaign_id": campaign_id, "opened": True}),
+                    "metrics.clicked": await tracking.count_documents({"campaign_id": campaign_id, "clicked": True})
+                },
+                "$unset": {"tracking": ""}
+            }
+        )
+
+
+@migration(9, "move poll voters into the poll_votes collection")
+async def backfill_poll_votes(db):
+    """
+    Create one vote per embedded poll voter, so the unique index keeps them
+    from voting again, then replace the voter lists with a voter count. The
+    options chosen were never stored per voter, so those votes have none.
+    """
+    polls = db["polls"].find({"voters": {"$exists": True}}, {"voters": 1, "created_at": 1})
+    async for poll in polls:
+        poll_id = str(poll["_id"])
+        voters = list(dict.fromkeys(poll.get("voters") or []))
+        if voters:
+            await db["poll_votes"].bulk_write([
+                UpdateOne(
+                    {"poll_id": poll_id, "user_id": user_id},
+                    {"$setOnInsert": {"option_indices": None, "created_at": poll.get("created_at")}},
+                    upsert=True
+                )
+                for user_id in voters
+            ], ordered=False)
+
+        await db["polls"].update_one(
+            {"_id": poll["_id"]},
+            {"$set": {"voter_count": len(voters)}, "$unset": {"voters": ""}}
+        )
+
+
+@migration(10, "move poll answers and question voters into vote collections")
+async def backfill_answer_and_question_votes(db):
+    """
+    Create a vote per answer embedded in text-answered polls and per
+    question voter, then drop the embedded lists so reads carry tallies only.
+    """
+    polls = db["polls"].find({"answers": {"$exists": True}}, {"answers": 1})
+    async for poll in polls:
+        poll_id = str(poll["_id"])
+        answers = {answer["user_id"]: answer.get("answer") for answer in poll.get("answers") or [] if answer.get("user_id")}
+        if answers:
+            await db["poll_votes"].bulk_write([
+                UpdateOne(
+                    {"poll_id": poll_id, "user_id": user_id},
+                    {"$setOnInsert": {"option_indices": [], "answer": answer, "created_at": None}},
+                    upsert=True
+                )
+                for user_id, answer in answers.items()
+            ], ordered=False)
+        await db["polls"].update_one({"_id": poll["_id"]}, {"$unset": {"answers": ""}})
+
+    questions = db["questions"].find({"voters": {"$exists": True}}, {"voters": 1, "created_at": 1})
+    async for question in questions:
+        question_id = str(question["_id"])
+        voters = list(dict.fromkeys(question.get("voters") or []))
+        if voters:
+            await db["question_votes"].bulk_write([
+                UpdateOne(
+                    {"question_id": question_id, "user_id": user_id},
+                    {"$setOnInsert": {"created_at": question.get("created_at")}},
+                    upsert=True
+                )
+                for user_id in voters
+            ], ordered=False)
+        await db["questions"].update_one({"_id": question["_id"]}, {"$unset": {"voters": ""}})
+
+
+@migration(11, "arm scheduler timers for open polls, scheduled campaigns and scheduled reports")
+async def backfill_scheduled_jobs(db):
+    """
+    Create the timers the scheduler would have set for polls still open,
+    campaigns waiting to go out and scheduled reports, so they no longer
+    depend on someone touching them after they are due.
+    """
+    from dateutil import parser
+    from .analytics_model import ReportConfigModel
+    from .scheduler import JOB_CLOSE_POLL, JOB_SEND_CAMPAIGN, JOB_SEND_REPORT, as_utc
+
+    now = datetime.now(timezone.utc)
+    timers = []
+    async for poll in db["polls"].find({"status": "active", "ends_at": {"$ne": None}}, {"ends_at": 1}):
+        ends_at = poll["ends_at"]
+        if isinstance(ends_at, str):
+            ends_at = parser.isoparse(ends_at)
+        if isinstance(ends_at, datetime):
+            timers.append((f"poll:{poll['_id']}", JOB_CLOSE_POLL, as_utc(ends_at), {"poll_id": str(poll["_id"])}))
+
+    campaigns = db["email_campaigns"].find({"status": "scheduled"}, {"schedule_time": 1})
+    async for campaign in campaigns:
+        timers.append((f"campaign:{campaign['_id']}", JOB_SEND_CAMPAIGN,
+                       as_utc(campaign.get("schedule_time") or now), {"campaign_id": str(campaign["_id"])}))
+
+    reports = db["report_configs"].find({"is_scheduled": True}, {"is_scheduled": 1, "schedule_frequency": 1})
+    async for config in reports:
+        run_at = ReportConfigModel.next_run_at(config, now)
+        if run_at is not None:
+            timers.append((f"report:{config['_id']}", JOB_SEND_REPORT, run_at, {"config_id": str(config["_id"])}))
+
+    for start in range(0, len(timers), 1000):
+        await db["scheduled_jobs"].bulk_write([
+            UpdateOne(
+                {"_id": name},
+                {"$setOnInsert": {
+                    "kind": kind,
+                    "payload": payload,
+                    "run_at": run_at,
+                    "status": "scheduled",
+                    "attempts": 0,
+                    "created_at": now,
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+            for name, kind, run_at, payload in timers[start:start + 1000]
+        ], ordered=False)
+
+
+@migration(12, "bring questions from every Q&A route into the question model's shape")
+async def normalize_questions(db):
+    """
+    Questions were written in three shapes: the Q&A routes stored
+    "question" and a single "answer", the networking routes "question" and
+    an "answers" list, and the question model "question_text" and
+    "answer_text". Rewrite the first two into the model's shape and drop
+    the index the (session_id, status, votes) index replaces.
+    """
+    existing = await db["questions"].index_information()
+    if "session_id_1_votes_-1_created_at_1" in existing:
+        await db["questions"].drop_index("session_id_1_votes_-1_created_at_1")
+
+    legacy = db["questions"].find({"$or": [
+        {"question": {"$exists": True}},
+        {"answer": {"$exists": True}},
+        {"status": {"$exists": False}}
+    ]})
+    updates = []
+    async for question in legacy:
+        answers = [
+            {
+                "user_id": answer.get("user_id"),
+                "text": answer.get("text"),
+                "answered_at": answer.get("answered_at") or answer.get("timestamp")
+            }
+            for answer in question.get("answers") or [] if answer.get("text")
+        ]
+        answer_text = question.get("answer_text") or question.get("answer") or None
+        answered_by = question.get("answered_by")
+        answered_at = question.get("answered_at")
+        if answers and not answer_text:
+            answer_text, answered_by, answered_at = answers[-1]["text"], answers[-1]["user_id"], answers[-1]["answered_at"]
+        elif answer_text and not answers:
+            answers = [{"user_id": answered_by, "text": answer_text, "answered_at": answered_at}]
+
+        updates.append(UpdateOne({"_id": question["_id"]}, {
+            "$set": {
+                "question_text": question.get("question_text") or question.get("question") or "",
+                "session_id": question.get("session_id"),
+                "event_id": question.get("event_id"),
+                "is_anonymous": question.get("is_anonymous", False),
+                "status": question.get("status") or ("answered" if answer_text else "pending"),
+                "votes": question.get("votes", 0),
+                "created_at": question.get("created_at") or question["_id"].generation_time,
+                "answer_text": answer_text,
+                "answered_by": answered_by,
+                "answered_at": answered_at,
+                "answers": answers
+            },
+            "$unset": {"question": "", "answer": ""}
+        }))
+        if len(updates) >= 1000:
+            await db["questions"].bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await db["questions"].bulk_write(updates, ordered=False)
+
+
+@migration(13, "move attendance timelines into their own collection")
+async def backfill_attendance_timeline(db):
+    """
+    Registrations used to append to an array on the event's analytics
+    document. Copy each embedded timeline into attendance_timeline and
+    drop the arrays.
+    """
+    analytics = db["event_analytics"].find(
+        {"attendance_timeline": {"$exists": True}}, {"event_id": 1, "attendance_timeline": 1}
+    )
+    async for document in analytics:
+        points = [point for point in document.get("attendance_timeline") or [] if point.get("timestamp")]
+        for start in range(0, len(points), 1000):
+            await db["attendance_timeline"].bulk_write([
+                UpdateOne(
+                    {"event_id": document["event_id"], "timestamp": point["timestamp"], "action": point.get("action")},
+                    {"$setOnInsert": {
+                        "total_registrations": point.get("total_registrations", 0),
+                        "total_check_ins": point.get("total_check_ins", 0)
+                    }},
+                    upsert=True
+                )
+                for point in points[start:start + 1000]
+            ], ordered=False)
+        await db["event_analytics"].update_one({"_id": document["_id"]}, {"$unset": {"attendance_timeline": ""}})
+
+
+@migration(14, "record poll tally baselines for votes migrated without their options")
+async def backfill_poll_tally_baselines(db):
+    """
+    Poll tallies are recounted from poll_votes, but the votes migration 9
+    created do not say which options they chose. For each poll with such
+    votes, keep the part of its option tallies the known votes do not
+    explain as legacy_option_votes, which recounts add back.
+    """
+    poll_ids = await db["poll_votes"].distinct("poll_id", {"option_indices": None})
+    for poll_id in poll_ids:
+        if not ObjectId.is_valid(poll_id):
+            continue
+        poll = await db["polls"].find_one({"_id": ObjectId(poll_id)}, {"options": 1, "legacy_option_votes": 1})
+        if not poll or "legacy_option_votes" in poll:
+            continue
+        known = [0] * len(poll.get("options") or [])
+        async for vote in db["poll_votes"].find({"poll_id": poll_id, "option_indices": {"$ne": None}}, {"option_indices": 1}):
+            for idx in vote.get("option_indices") or []:
+                if 0 <= idx < len(known):
+                    known[idx] += 1
+        await db["polls"].update_one({"_id": poll["_id"]}, {"$set": {"legacy_option_votes": [
+            max((option.get("votes") or 0) - known[idx], 0) for idx, option in enumerate(poll.get("options") or [])
+        ]}})
@@ -0,0 +1,110 @@
+"""
+Pagination module for keyset (cursor) pagination.
+A cursor is an opaque token holding the sort key values of the last
+document on a page, so the next page starts with an indexed range
+query instead of skipping over every earlier document.
+"""
+import base64
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId, json_util
+
+
+SortSpec = List[Tuple[str, int]]
+
+
+def page_sort(sort: Optional[SortSpec]) -> SortSpec:
+    """
+    Make a sort order total by appending _id as the final tie-breaker.
+
+    Args:
+        sort: List of (field, direction) pairs
+
+    Returns:
+        SortSpec: Sort order ending in _id
+    """
+    sort = list(sort or [])
+    if not any(field == "_id" for field, _ in sort):
+        direction = sort[-1][1] if sort else 1
+        sort.append(("_id", direction))
+    return sort
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode sort key values into an opaque cursor token.
+
+    Args:
+        values: Sort key values of the last document on a page
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    raw = json_util.dumps(list(values)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decode a cursor token back into sort key values.
+
+    Args:
+        cursor: Token produced by encode_cursor
+
+    Returns:
+        List[Any]: Sort key values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def cursor_for(document: Dict, sort: SortSpec) -> str:
+    """
+    Build the cursor pointing just past a document.
+
+    Args:
+        document: Document as returned by the models (with "id" instead of "_id")
+        sort: Sort order used for the page, as returned by page_sort
+
+    Returns:
+        str: Cursor token
+    """
+    values = []
+    for field, _ in sort:
+        if field == "_id":
+            values.append(ObjectId(document["id"]))
+        else:
+            values.append(document.get(field))
+    return encode_cursor(values)
+
+
+def keyset_filter(sort: SortSpec, values: Sequence[Any]) -> Dict:
+    """
+    Build the filter matching the documents that sort after the cursor values.
+
+    Args:
+        sort: Sort order used for the page, as returned by page_sort
+        values: Decoded cursor values, one per sort field
+
+    Returns:
+        Dict: Query selecting documents after the cursor
+
+    Raises:
+        ValueError: If the values do not match the sort order
+    """
+    if len(values) != len(sort):
+        raise ValueError("Cursor does not match the sort order")
+
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        branch = {prior_field: values[index] for index, (prior_field, _) in enumerate(sort[:position])}
+        branch[field] = {"$gt" if direction > 0 else "$lt": values[position]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
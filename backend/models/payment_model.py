@@ -2,9 +2,10 @@
 Payment model module for handling payment and financial management.
 Based on the payment schemas.
 """
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 import uuid
 
 from .base_model import BaseModel
@@ -16,6 +17,10 @@ class PaymentModel(BaseModel):
     Handles all database interactions for payments.
     """
     collection_name = "payments"
+    indexes = [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("status", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_payment(cls, user_id: str, event_id: str, amount: float, 
@@ -108,6 +113,28 @@ class PaymentModel(BaseModel):
         """
         return await cls.find_many({"user_id": user_id})
     
+    @classmethod
+    async def get_user_payments_page(cls, user_id: str, limit: int = 50,
+                                     cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of a user's payments, newest first, using keyset pagination.
+        
+        Args:
+            user_id: User ID
+            limit: Maximum number of payments to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "payments" on this page and "next_cursor" (None on the last page)
+        """
+        page = await cls.find_page(
+            {"user_id": user_id},
+            limit=limit,
+            sort=[("created_at", -1)],
+            cursor=cursor
+        )
+        return {"payments": page["items"], "next_cursor": page["next_cursor"]}
+    
     @classmethod
     async def get_event_payments(cls, event_id: str) -> List[Dict]:
         """
@@ -121,6 +148,20 @@ class PaymentModel(BaseModel):
         """
         return await cls.find_many({"event_id": event_id})
     
+    @classmethod
+    def iter_event_payments(cls, event_id: str, batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream all payments for an event.
+        
+        Args:
+            event_id: Event ID
+            batch_size: Number of payments fetched per round trip
+            
+        Returns:
+            AsyncIterator[Dict]: Payment documents
+        """
+        return cls.iter_many({"event_id": event_id}, batch_size=batch_size)
+    
     @classmethod
     async def update_payment_status(cls, payment_id: str, status: str, 
                                  payment_reference: Optional[str] = None) -> Optional[Dict]:
@@ -252,6 +293,9 @@ class RefundModel(BaseModel):
     Handles all database interactions for refunds.
     """
     collection_name = "refunds"
+    indexes = [
+        IndexModel([("payment_id", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_refund(cls, payment_id: str, amount: float, reason: str, 
@@ -398,6 +442,9 @@ class DiscountCodeModel(BaseModel):
     Handles all database interactions for discount codes.
     """
     collection_name = "discount_codes"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("code", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_discount_code(cls, event_id: str, code: str, discount_type: str,
@@ -661,6 +708,9 @@ class SponsorshipModel(BaseModel):
     Handles all database interactions for sponsorships.
     """
     collection_name = "sponsorships"
+    indexes = [
+        IndexModel([("event_id", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_sponsorship(cls, event_id: str, organization_name: str,
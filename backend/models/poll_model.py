@@ -2,21 +2,34 @@
 Poll model module for handling polling functionality.
 Based on the PollSchema.
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 import uuid
 from dateutil import parser  # pip install python-dateutil
 
 from .base_model import BaseModel
+from .hub import broadcast, EVENT_POLL_CLOSED
+from .pubsub import CHANNEL_POLLS
+from .poll_tally import poll_tallies
+from .scheduler import scheduler, JOB_CLOSE_POLL
 
 
 class PollModel(BaseModel):
     """
     Model for poll data operations.
     Handles all database interactions for polls and polling options.
+    Votes are recorded in PollVoteModel; the option tallies on the poll
+    document are recounted from them by the poll_tallies aggregator.
     """
     collection_name = "polls"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING)]),
+    ]
+    # Polls are returned without the voter list some older documents still carry
+    projection = {"voters": 0, "legacy_option_votes": 0}
 
     @classmethod
     async def create_poll(cls, event_id: str, created_by: str, question: str, 
@@ -39,7 +52,7 @@ class PollModel(BaseModel):
             "is_multiple_choice": is_multiple_choice,
             "duration": duration,
             "status": "active",
-            "voters": [],
+            "voter_count": 0,
             "created_at": now_utc,
             "ends_at": ends_at_utc
         }
@@ -51,6 +64,8 @@ class PollModel(BaseModel):
         poll_data["poll_id"] = str(uuid.uuid4())
 
         poll_id = await cls.insert_one(poll_data)
+        # Close the poll when it ends, even if nobody votes or looks at it then
+        await scheduler.schedule(f"poll:{poll_id}", JOB_CLOSE_POLL, ends_at_utc, {"poll_id": str(poll_id)})
         return str(poll_id)
 
     @classmethod
@@ -62,7 +77,38 @@ class PollModel(BaseModel):
         Returns:
             Dict: The poll document, or None if not found.
         """
-        return await cls.find_one({"_id": ObjectId(poll_id)})
+        return await cls.find_one({"_id": ObjectId(poll_id)}, projection=cls.projection)
+
+    @classmethod
+    async def get_polls_by_ids(cls, poll_ids: List[str]) -> List[Dict]:
+        """
+        Retrieve several polls by ID with one query.
+
+        Args:
+            poll_ids: Poll IDs
+
+        Returns:
+            List[Dict]: The polls found, in no particular order
+        """
+        return await cls.find_many(
+            {"_id": {"$in": [ObjectId(poll_id) for poll_id in poll_ids]}}, projection=cls.projection
+        )
+
+    @staticmethod
+    def _ends_at(poll: Dict) -> Optional[datetime]:
+        """A poll's end time as an aware datetime."""
+        poll_ends_at = poll.get("ends_at")
+        if isinstance(poll_ends_at, str):
+            poll_ends_at = parser.parse(poll_ends_at)
+        if poll_ends_at and poll_ends_at.tzinfo is None:
+            poll_ends_at = poll_ends_at.replace(tzinfo=timezone.utc)
+        return poll_ends_at
+
+    @classmethod
+    def _has_expired(cls, poll: Dict) -> bool:
+        """Whether an active poll has passed its end time."""
+        poll_ends_at = cls._ends_at(poll)
+        return poll["status"] == "active" and poll_ends_at is not None and poll_ends_at < datetime.now(timezone.utc)
 
     @classmethod
     async def get_event_polls(cls, event_id: str, status: Optional[str] = None, 
@@ -73,84 +119,131 @@ class PollModel(BaseModel):
         if session_id:
             query["session_id"] = session_id
 
-        polls = await cls.find_many(query, sort=[("created_at", -1)])
-        now_utc = datetime.now(timezone.utc)
+        polls = await cls.find_many(query, sort=[("created_at", -1)], projection=cls.projection)
 
         for poll in polls:
-            poll_ends_at = poll.get("ends_at")
-
-            # Ensure poll_ends_at is aware
-            if isinstance(poll_ends_at, str):
-                poll_ends_at = parser.parse(poll_ends_at)
-            if poll_ends_at and poll_ends_at.tzinfo is None:
-                poll_ends_at = poll_ends_at.replace(tzinfo=timezone.utc)
-
-            # Compare times if poll is active
-            if poll["status"] == "active" and poll_ends_at and poll_ends_at < now_utc:
+            if cls._has_expired(poll):
                 poll["status"] = "closed"
-                await cls.update_one(
-                    {"_id": ObjectId(poll["_id"])},
-                    {"$set": {"status": "closed"}}
-                )
+                await cls.close_poll(poll["id"])
 
         return polls
 
     @classmethod
     async def vote_on_poll(cls, poll_id: str, user_id: str, option_indices: List[int]) -> Optional[Dict]:
-        poll = await cls.get_poll_by_id(poll_id)
-        if not poll:
-            return None
-
-        if poll["status"] != "active":
-            return None
+        """
+        Record a user's vote with one write; a user votes at most once per poll.
 
-        poll_ends_at = poll.get("ends_at")
-        # Ensure poll_ends_at is aware
-        if isinstance(poll_ends_at, str):
-            poll_ends_at = parser.parse(poll_ends_at)
-        if poll_ends_at and poll_ends_at.tzinfo is None:
-            poll_ends_at = poll_ends_at.replace(tzinfo=timezone.utc)
+        Args:
+            poll_id: Poll ID
+            user_id: Voter's user ID
+            option_indices: Indices of the chosen options
 
-        # If poll has ended, mark it closed and return
-        if poll_ends_at and poll_ends_at < datetime.now(timezone.utc):
-            await cls.update_one(
-                {"_id": ObjectId(poll_id)},
-                {"$set": {"status": "closed"}}
-            )
+        Returns:
+            Dict: The poll with its live tallies, or None if the vote was rejected
+        """
+        poll = await poll_tallies.get(poll_id)
+        if not poll or poll["status"] != "active":
             return None
 
-        if user_id in poll.get("voters", []):
-            return None
+        if cls._has_expired(poll):
+            # The cached end time may predate an extension; check before closing
+            current = await cls.get_poll_by_id(poll_id)
+            if not current or cls._has_expired(current):
+                await cls.close_poll(poll_id)
+                return None
+            poll_tallies.set_poll(current)
 
         # Validate option indices
         if not option_indices or any(idx < 0 or idx >= len(poll["options"]) for idx in option_indices):
             return None
 
         # If not multiple choice, only accept the first option
-        if not poll["is_multiple_choice"] and len(option_indices) > 1:
+        if not poll.get("is_multiple_choice") and len(option_indices) > 1:
             option_indices = [option_indices[0]]
+        option_indices = list(dict.fromkeys(option_indices))
 
-        # Increment votes for each chosen option
-        for idx in option_indices:
-            await cls.update_one(
-                {"_id": ObjectId(poll_id)},
-                {"$inc": {f"options.{idx}.votes": 1}}
-            )
+        if not await PollVoteModel.record_vote(poll_id, user_id, option_indices):
+            return None
 
-        # Add the user to the list of voters
-        await cls.update_one(
-            {"_id": ObjectId(poll_id)},
-            {"$addToSet": {"voters": user_id}}
-        )
+        poll_tallies.add_vote(poll_id, option_indices)
+        return poll_tallies.view(poll_id)
 
-        return await cls.get_poll_by_id(poll_id)
+    @classmethod
+    async def rebuild_tallies(cls, poll_ids: List[str]):
+        """
+        Recount polls' option tallies and voter counts from their votes, with one bulk write.
+        The votes are the source of truth, so a recount also repairs tallies
+        a worker lost by dying before it flushed. Tallies only move up, so a
+        recount that finishes after a newer one cannot lower them.
+
+        Args:
+            poll_ids: Poll IDs
+        """
+        if not poll_ids:
+            return
+        counts = await PollVoteModel.count_votes(poll_ids)
+        # Votes migrated without their options are counted by a baseline on the poll
+        baselines = {
+            poll["id"]: poll["legacy_option_votes"]
+            for poll in await cls.find_many(
+                {"_id": {"$in": [ObjectId(poll_id) for poll_id in poll_ids]}, "legacy_option_votes": {"$exists": True}},
+                projection={"legacy_option_votes": 1}
+            )
+        }
+        updates = []
+        for poll_id in poll_ids:
+            voters, option_votes = counts.get(poll_id, (0, {}))
+            tallies = dict(enumerate(baselines.get(poll_id) or []))
+            for idx, votes in option_votes.items():
+                tallies[idx] = tallies.get(idx, 0) + votes
+            maxima = {f"options.{idx}.votes": votes for idx, votes in tallies.items() if votes}
+            if voters:
+                maxima["voter_count"] = voters
+            if maxima:
+                updates.append(UpdateOne({"_id": ObjectId(poll_id)}, {"$max": maxima}))
+        if not updates:
+            return
+        collection = await cls.get_collection()
+        await collection.bulk_write(updates, ordered=False)
+        await cls.invalidate_cache(*(ObjectId(poll_id) for poll_id in poll_ids))
 
     @classmethod
     async def close_poll(cls, poll_id: str) -> Optional[Dict]:
-        return await cls.update_one(
+        closed_poll = await cls.update_one(
             {"_id": ObjectId(poll_id)},
-            {"$set": {"status": "closed"}}
+            {"$set": {"status": "closed"}},
+            projection=cls.projection
         )
+        if closed_poll:
+            await scheduler.cancel(f"poll:{poll_id}")
+            poll_tallies.set_status(poll_id, "closed")
+            # Recount from the votes so the closed poll shows final tallies, whatever any worker flushed
+            await cls.rebuild_tallies([poll_id])
+            await poll_tallies.flush(poll_id)
+            closed_poll = await cls.get_poll_by_id(poll_id) or closed_poll
+            await cls.publish_closed(poll_id)
+        return closed_poll
+
+    @classmethod
+    async def close_if_expired(cls, poll_id: str) -> Optional[Dict]:
+        """
+        Close a poll whose end time has passed; scheduled for each poll's end.
+
+        Args:
+            poll_id: Poll ID
+
+        Returns:
+            Dict: The closed poll, or None if it is gone, closed or was extended
+        """
+        poll = await cls.get_poll_by_id(poll_id)
+        if not poll or not cls._has_expired(poll):
+            return None
+        return await cls.close_poll(poll_id)
+
+    @classmethod
+    async def publish_closed(cls, poll_id: str):
+        """Tell the poll's live clients, on every worker, that it closed."""
+        await broadcast(CHANNEL_POLLS, str(poll_id), {"type": EVENT_POLL_CLOSED, "poll_id": str(poll_id)})
 
     @classmethod
     async def extend_poll(cls, poll_id: str, additional_seconds: int) -> Optional[Dict]:
@@ -158,33 +251,38 @@ class PollModel(BaseModel):
         if not poll or poll["status"] != "active":
             return None
 
-        poll_ends_at = poll.get("ends_at")
-        # Ensure poll_ends_at is aware
-        if isinstance(poll_ends_at, str):
-            poll_ends_at = parser.parse(poll_ends_at)
-        if poll_ends_at and poll_ends_at.tzinfo is None:
-            poll_ends_at = poll_ends_at.replace(tzinfo=timezone.utc)
+        poll_ends_at = cls._ends_at(poll)
 
         # Extend the poll end time to be at least now, plus additional_seconds
         now_utc = datetime.now(timezone.utc)
         new_end_time = max(poll_ends_at or now_utc, now_utc) + timedelta(seconds=additional_seconds)
 
-        return await cls.update_one(
+        extended_poll = await cls.update_one(
             {"_id": ObjectId(poll_id)},
-            {"$set": {"ends_at": new_end_time}}
+            {"$set": {"ends_at": new_end_time}},
+            projection=cls.projection
         )
+        if extended_poll:
+            poll_tallies.set_poll(extended_poll)
+            await scheduler.schedule(f"poll:{poll_id}", JOB_CLOSE_POLL, new_end_time, {"poll_id": poll_id})
+        return extended_poll
 
     @classmethod
     async def get_poll_results(cls, poll_id: str) -> Optional[Dict]:
-        poll = await cls.get_poll_by_id(poll_id)
+        """
+        Get a poll's live results, served from the in-memory tallies.
+
+        Args:
+            poll_id: Poll ID
+
+        Returns:
+            Dict: Options with votes and percentages, totals and status, or None if not found
+        """
+        poll = await poll_tallies.get(poll_id)
         if not poll:
             return None
 
-        total_votes = 0
-        for option in poll["options"]:
-            total_votes += option["votes"]
-
-        total_voters = len(poll.get("voters", []))
+        total_votes = poll["total_votes"]
         options_with_percentage = []
         for option in poll["options"]:
             # Safely compute percentage
@@ -201,7 +299,7 @@ class PollModel(BaseModel):
             "question": poll["question"],
             "options": options_with_percentage,
             "total_votes": total_votes,
-            "total_voters": total_voters,
+            "total_voters": poll["total_voters"],
             "status": poll["status"],
             "created_at": poll["created_at"],
             "ends_at": poll["ends_at"]
@@ -210,4 +308,96 @@ class PollModel(BaseModel):
     @classmethod
     async def delete_poll(cls, poll_id: str) -> bool:
         deleted_count = await cls.delete_one({"_id": ObjectId(poll_id)})
+        if deleted_count > 0:
+            poll_tallies.forget(poll_id)
+            await scheduler.cancel(f"poll:{poll_id}")
+            await PollVoteModel.delete_many({"poll_id": poll_id})
         return deleted_count > 0
+
+
+class PollVoteModel(BaseModel):
+    """
+    Model for poll votes, one per voter and poll.
+    The unique index is what keeps a user from voting twice.
+    """
+    collection_name = "poll_votes"
+    indexes = [
+        IndexModel([("poll_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+    ]
+
+    @classmethod
+    async def record_vote(cls, poll_id: str, user_id: str, option_indices: List[int],
+                          answer: Optional[str] = None) -> bool:
+        """
+        Record a user's vote on a poll.
+
+        Args:
+            poll_id: Poll ID
+            user_id: Voter's user ID
+            option_indices: Indices of the chosen options
+            answer: Text of the chosen option, for polls answered by text
+
+        Returns:
+            bool: False if the user had already voted
+        """
+        vote = {
+            "poll_id": poll_id,
+            "user_id": user_id,
+            "option_indices": option_indices,
+            "created_at": datetime.now(timezone.utc)
+        }
+        if answer is not None:
+            vote["answer"] = answer
+        try:
+            await cls.insert_one(vote)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @classmethod
+    async def count_votes(cls, poll_ids: List[str]) -> Dict[str, Tuple[int, Dict[int, int]]]:
+        """
+        Count the votes of several polls with one aggregation.
+
+        Args:
+            poll_ids: Poll IDs
+
+        Returns:
+            Dict: Per poll ID, its number of voters and the votes per option index
+        """
+        results = await cls.aggregate([
+            {"$match": {"poll_id": {"$in": poll_ids}}},
+            {"$facet": {
+                "voters": [{"$group": {"_id": "$poll_id", "count": {"$sum": 1}}}],
+                "options": [
+                    {"$unwind": "$option_indices"},
+                    {"$group": {"_id": {"poll_id": "$poll_id", "idx": "$option_indices"}, "count": {"$sum": 1}}}
+                ]
+            }}
+        ])
+        counts: Dict[str, Tuple[int, Dict[int, int]]] = {}
+        if not results:
+            return counts
+        for voters in results[0]["voters"]:
+            counts[voters["_id"]] = (voters["count"], {})
+        for option in results[0]["options"]:
+            counts[option["_id"]["poll_id"]][1][option["_id"]["idx"]] = option["count"]
+        return counts
+
+    @classmethod
+    async def get_user_votes(cls, user_id: str, poll_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get a user's own votes on several polls.
+
+        Args:
+            user_id: Voter's user ID
+            poll_ids: Poll IDs
+
+        Returns:
+            Dict[str, Dict]: The user's vote per poll ID, for the polls they voted on
+        """
+        votes = await cls.find_many(
+            {"poll_id": {"$in": poll_ids}, "user_id": user_id},
+            projection={"poll_id": 1, "option_indices": 1, "answer": 1}
+        )
+        return {vote["poll_id"]: vote for vote in votes}
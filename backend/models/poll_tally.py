@@ -0,0 +1,274 @@
+"""
+Poll tally module aggregating live poll results in memory.
+A vote is one insert into the poll_votes collection; its tally is added
+here rather than to the poll document, so a burst of votes does not queue
+up behind a single hot document. Every POLL_TICK_SECONDS the polls whose
+tallies moved are pushed to their connected clients, and every
+POLL_FLUSH_SECONDS the polls that received votes are recounted from
+poll_votes into the poll documents with one bulk write and the loaded
+tallies are refreshed from them, which also brings in the votes other
+workers recorded. Polls are recounted as well when a worker loads them
+and when they close, so the durable votes stay the source of truth and
+tallies a dead worker never flushed are repaired.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from .hub import poll_hub, EVENT_POLL_UPDATED, EVENT_POLL_CLOSED
+from .pubsub import event_bus, CHANNEL_POLLS
+
+
+POLL_TICK_SECONDS = float(os.getenv("POLL_TICK_SECONDS", "0.25"))
+POLL_FLUSH_SECONDS = float(os.getenv("POLL_FLUSH_SECONDS", "1"))
+# Polls without votes or readers for this long are dropped from memory
+POLL_IDLE_SECONDS = float(os.getenv("POLL_IDLE_SECONDS", "600"))
+
+
+class PollTallies:
+    """
+    Live tallies of the polls this worker has seen recently.
+    Each poll keeps the tallies last read from its document ("base") and
+    the votes this worker recorded since ("pending"); the live tally is
+    their sum. A vote recorded while its poll is recounted can show twice
+    until the next flush; the poll document never counts it twice.
+    """
+
+    def __init__(self, tick: float = POLL_TICK_SECONDS, flush_interval: float = POLL_FLUSH_SECONDS,
+                 idle_seconds: float = POLL_IDLE_SECONDS):
+        self.tick = tick
+        self.flush_interval = flush_interval
+        self.idle_seconds = idle_seconds
+        self._polls: Dict[str, Dict] = {}
+        self._pending: Dict[str, Dict] = {}
+        # Deltas being written; still counted until the refreshed base includes them
+        self._in_flight: Dict[str, Dict] = {}
+        self._dirty: Set[str] = set()
+        self._touched: Dict[str, float] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"votes": 0, "pushes": 0, "flushes": 0, "failed_flushes": 0, "last_flush_ms": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._polls)
+
+    @staticmethod
+    def _empty_delta(option_count: int) -> Dict:
+        return {"votes": [0] * option_count, "voters": 0}
+
+    async def get(self, poll_id: str) -> Optional[Dict]:
+        """
+        Get a poll with its live tallies, loading it on first use.
+
+        Args:
+            poll_id: Poll ID
+
+        Returns:
+            Dict: Poll without its voters, with live option votes and totals, or None if not found
+        """
+        if poll_id not in self._polls:
+            from .poll_model import PollModel
+            await PollModel.rebuild_tallies([poll_id])
+            poll = await PollModel.get_poll_by_id(poll_id)
+            if not poll:
+                return None
+            # Another request may have loaded it meanwhile; keep the first copy
+            self._polls.setdefault(poll_id, poll)
+        self._touched[poll_id] = time.monotonic()
+        return self.view(poll_id)
+
+    def view(self, poll_id: str) -> Optional[Dict]:
+        """Poll with its live tallies, if loaded."""
+        poll = self._polls.get(poll_id)
+        if poll is None:
+            return None
+        votes = [option.get("votes", 0) for option in poll["options"]]
+        voters = poll.get("voter_count", 0)
+        for delta in (self._pending.get(poll_id), self._in_flight.get(poll_id)):
+            if delta:
+                votes = [count + added for count, added in zip(votes, delta["votes"])]
+                voters += delta["voters"]
+        options = [{**option, "votes": votes[idx]} for idx, option in enumerate(poll["options"])]
+        return {
+            **poll,
+            "options": options,
+            "total_votes": sum(votes),
+            "total_voters": voters
+        }
+
+    def add_vote(self, poll_id: str, option_indices: List[int]):
+        """
+        Count a recorded vote towards a loaded poll's tallies.
+
+        Args:
+            poll_id: Poll ID
+            option_indices: Validated, distinct option indices chosen
+        """
+        poll = self._polls[poll_id]
+        pending = self._pending.setdefault(poll_id, self._empty_delta(len(poll["options"])))
+        for idx in option_indices:
+            pending["votes"][idx] += 1
+        pending["voters"] += 1
+        self._dirty.add(poll_id)
+        self._touched[poll_id] = time.monotonic()
+        self.stats["votes"] += 1
+
+    def set_poll(self, poll: Dict):
+        """Replace a loaded poll's document after a change such as an extension."""
+        if poll["id"] in self._polls:
+            self._polls[poll["id"]] = poll
+            self._dirty.add(poll["id"])
+
+    def forget(self, poll_id: str):
+        """Drop a deleted poll, discarding its pending votes."""
+        for entries in (self._polls, self._pending, self._touched):
+            entries.pop(poll_id, None)
+        self._dirty.discard(poll_id)
+
+    def set_status(self, poll_id: str, status: str):
+        """Update a loaded poll's status, e.g. when another worker closed it."""
+        if poll_id in self._polls:
+            self._polls[poll_id]["status"] = status
+
+    def handle_event(self, message: Dict):
+        """Bus handler: keep loaded polls' status in step with close events from any worker."""
+        if message["event"].get("type") == EVENT_POLL_CLOSED:
+            self.set_status(message["topic"], "closed")
+
+    def push(self) -> int:
+        """
+        Send the polls whose tallies moved to their clients on this worker.
+
+        Returns:
+            int: Number of polls pushed
+        """
+        dirty, self._dirty = self._dirty, set()
+        for poll_id in dirty:
+            poll = self.view(poll_id)
+            if poll is None:
+                continue
+            poll_hub.publish(poll_id, {
+                "type": EVENT_POLL_UPDATED,
+                "poll_id": poll_id,
+                "options": poll["options"],
+                "total_votes": poll["total_votes"],
+                "total_voters": poll["total_voters"],
+                "status": poll["status"]
+            })
+        self.stats["pushes"] += len(dirty)
+        return len(dirty)
+
+    async def flush(self, poll_id: Optional[str] = None) -> int:
+        """
+        Recount the polls with pending votes into their documents and refresh the loaded tallies.
+
+        Args:
+            poll_id: Only flush this poll (all polls if None)
+
+        Returns:
+            int: Number of pending votes flushed
+        """
+        from .poll_model import PollModel
+
+        async with self._lock:
+            if poll_id is None:
+                deltas, self._pending = self._pending, {}
+            else:
+                deltas = {poll_id: self._pending.pop(poll_id)} if poll_id in self._pending else {}
+            self._in_flight = deltas
+            started = time.perf_counter()
+            try:
+                await PollModel.rebuild_tallies(list(deltas))
+            except Exception as e:
+                print(f"[PollTallies ERROR] Flush failed, keeping {len(deltas)} polls pending: {str(e)}")
+                self.stats["failed_flushes"] += 1
+                self._in_flight = {}
+                for failed_id, delta in deltas.items():
+                    self._merge(failed_id, delta)
+                return 0
+
+            refresh_ids = list(deltas) if poll_id is not None else list(self._polls)
+            try:
+                for poll in await PollModel.get_polls_by_ids(refresh_ids) if refresh_ids else []:
+                    previous = self._polls.get(poll["id"])
+                    if previous is None:
+                        continue
+                    if (previous["options"] != poll["options"] or previous["status"] != poll["status"]
+                            or previous.get("voter_count") != poll.get("voter_count")):
+                        self._dirty.add(poll["id"])
+                    self._polls[poll["id"]] = poll
+            except Exception as e:
+                # The deltas are written; the next flush refreshes the tallies
+                print(f"[PollTallies ERROR] Refresh failed: {str(e)}")
+            finally:
+                self._in_flight = {}
+
+            self.stats["flushes"] += 1
+            self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return sum(delta["voters"] for delta in deltas.values())
+
+    def _merge(self, poll_id: str, delta: Dict):
+        """Add a delta back into a poll's pending tallies."""
+        pending = self._pending.setdefault(poll_id, self._empty_delta(len(delta["votes"])))
+        for idx, votes in enumerate(delta["votes"]):
+            pending["votes"][idx] += votes
+        pending["voters"] += delta["voters"]
+
+    def _evict_idle(self):
+        """Drop polls nobody voted in or read lately, once their votes are written."""
+        cutoff = time.monotonic() - self.idle_seconds
+        for poll_id in [poll_id for poll_id, touched in self._touched.items() if touched < cutoff]:
+            if poll_id in self._pending:
+                continue
+            self._polls.pop(poll_id, None)
+            self._touched.pop(poll_id, None)
+            self._dirty.discard(poll_id)
+
+    async def _run(self):
+        """Push at the tick rate; flush, refresh and evict every flush interval."""
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            await asyncio.sleep(self.tick)
+            self.push()
+            if time.monotonic() >= next_flush:
+                await self.flush()
+                self._evict_idle()
+                next_flush = time.monotonic() + self.flush_interval
+
+    async def start(self):
+        """Start pushing and flushing."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background loop and write what is still pending."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await self.flush()
+
+    def get_stats(self) -> Dict:
+        """
+        Loaded polls, pending deltas and counters of this worker.
+
+        Returns:
+            Dict: Poll counts, tick settings and counters
+        """
+        return {
+            "polls": len(self._polls),
+            "pending_polls": len(self._pending),
+            "tick_seconds": self.tick,
+            "flush_seconds": self.flush_interval,
+            **self.stats,
+        }
+
+
+# Process-wide tallies; pushed and flushed while the app runs
+poll_tallies = PollTallies()
+
+event_bus.subscribe(CHANNEL_POLLS, poll_tallies.handle_event)
@@ -0,0 +1,210 @@
+"""
+Pub/sub module carrying live updates between workers.
+Models publish chat, poll and question events to the event bus, and every worker's
+bus hands them to its local hubs, so a client connected to any worker sees
+events published on any other without sticky sessions. The backend is
+chosen with PUBSUB_BACKEND:
+- "memory": delivers within the process only (one worker, tests)
+- "mongo": publishes into a collection every worker tails through a change
+  stream (needs a replica set, as change streams do)
+- "broker": uses the pub/sub channels of a local Redis broker (requires
+  the optional redis package)
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from bson import json_util
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import OperationFailure
+
+
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "memory")
+BROKER_URL = os.getenv("PUBSUB_BROKER_URL", "redis://localhost:6379/0")
+
+# Collection the mongo backend publishes into, and how long events are kept
+BUS_COLLECTION = "bus_events"
+BUS_EVENT_TTL_SECONDS = int(os.getenv("PUBSUB_EVENT_TTL_SECONDS", "300"))
+INDEXES = [
+    IndexModel([("created_at", ASCENDING)], expireAfterSeconds=BUS_EVENT_TTL_SECONDS),
+]
+
+# Channels
+CHANNEL_CHAT = "chat"
+CHANNEL_POLLS = "polls"
+CHANNEL_QUESTIONS = "questions"
+
+# Seconds to wait before reconnecting a lost listener
+RECONNECT_DELAY_SECONDS = 1
+
+Handler = Callable[[Dict], None]
+
+
+class MemoryBus:
+    """
+    Event bus delivering within this process only.
+    The other backends build on it for their local delivery.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        """
+        Register a handler for a channel's messages on this worker.
+
+        Args:
+            channel: Channel name
+            handler: Callable taking the message; must not block
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def _dispatch(self, channel: str, message: Dict):
+        """Hand a message to the channel's local handlers."""
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(message)
+            except Exception as e:
+                print(f"[EventBus ERROR] Handler for {channel} failed: {str(e)}")
+
+    async def publish(self, channel: str, message: Dict):
+        """
+        Publish a message to every worker's handlers of a channel.
+
+        Args:
+            channel: Channel name
+            message: Message to deliver
+        """
+        self._dispatch(channel, message)
+
+    async def _listen(self):
+        """Receive messages published by other workers (none for this backend)."""
+
+    async def start(self):
+        """Start receiving messages from other workers."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._run_listener())
+
+    async def _run_listener(self):
+        """Keep the listener running, reconnecting after failures."""
+        while True:
+            try:
+                await self._listen()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[EventBus ERROR] {self.name} listener failed, reconnecting: {str(e)}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def stop(self):
+        """Stop receiving messages."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+class MongoChangeStreamBus(MemoryBus):
+    """
+    Event bus publishing through MongoDB.
+    Messages are inserted into BUS_COLLECTION; each worker tails the
+    collection's change stream and delivers what it sees, its own
+    messages included. A TTL index keeps the collection small.
+    """
+    name = "mongo"
+
+    def __init__(self):
+        super().__init__()
+        self._resume_token = None
+
+    @staticmethod
+    async def _collection():
+        from .base_model import Database
+        return (await Database.get_db())[BUS_COLLECTION]
+
+    async def publish(self, channel: str, message: Dict):
+        collection = await self._collection()
+        await collection.insert_one({
+            "channel": channel,
+            "message": message,
+            "created_at": datetime.now(timezone.utc)
+        })
+
+    async def _listen(self):
+        collection = await self._collection()
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        try:
+            async with collection.watch(pipeline, resume_after=self._resume_token) as stream:
+                async for change in stream:
+                    self._resume_token = stream.resume_token
+                    document = change["fullDocument"]
+                    self._dispatch(document["channel"], document["message"])
+        except OperationFailure:
+            # The resume point may have left the oplog; carry on from now
+            self._resume_token = None
+            raise
+
+
+class BrokerBus(MemoryBus):
+    """
+    Event bus publishing through the pub/sub channels of a Redis broker.
+    Messages are encoded with bson.json_util so dates and IDs survive.
+    """
+    name = "broker"
+    channel_prefix = "events:"
+
+    def __init__(self, url: str = BROKER_URL):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("PUBSUB_BACKEND=broker requires the redis package") from e
+        self._client = redis.from_url(url)
+
+    async def publish(self, channel: str, message: Dict):
+        await self._client.publish(self.channel_prefix + channel, json_util.dumps(message))
+
+    async def _listen(self):
+        pubsub = self._client.pubsub()
+        await pubsub.psubscribe(self.channel_prefix + "*")
+        try:
+            async for received in pubsub.listen():
+                if received["type"] != "pmessage":
+                    continue
+                channel = received["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                self._dispatch(channel[len(self.channel_prefix):], json_util.loads(received["data"]))
+        finally:
+            await pubsub.aclose()
+
+
+def build_bus(backend: str = PUBSUB_BACKEND) -> MemoryBus:
+    """
+    Build the event bus for a backend name.
+
+    Args:
+        backend: "memory", "mongo" or "broker"
+
+    Returns:
+        MemoryBus: Configured event bus
+    """
+    backends = {
+        "memory": MemoryBus,
+        "mongo": MongoChangeStreamBus,
+        "broker": BrokerBus,
+    }
+    if backend not in backends:
+        raise ValueError(f"Unsupported PUBSUB_BACKEND: {backend}")
+    return backends[backend]()
+
+
+# Process-wide bus; started and stopped with the app
+event_bus = build_bus()
@@ -0,0 +1,335 @@
+"""
+Question board module ranking each live session's questions in memory.
+Audience apps keep the most upvoted questions of a session on screen.
+Instead of every refresh sorting the session's questions in MongoDB, each
+worker loads a session's questions once into a ranked list and keeps it
+current from the question events that asking, upvoting and answering
+publish on the event bus, so it also sees changes made on other workers.
+Every QA_TICK_SECONDS the sessions whose top QA_TOP_N changed send the
+difference to their connected clients.
+"""
+import asyncio
+import bisect
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from .hub import question_hub, Subscriber, EVENT_QUESTION_CHANGED, EVENT_LEADERBOARD, EVENT_LEADERBOARD_DELTA
+from .pubsub import event_bus, CHANNEL_QUESTIONS
+
+
+QA_TICK_SECONDS = float(os.getenv("QA_TICK_SECONDS", "0.5"))
+QA_TOP_N = int(os.getenv("QA_TOP_N", "20"))
+# Sessions without readers or clients for this long are dropped from memory
+QA_IDLE_SECONDS = float(os.getenv("QA_IDLE_SECONDS", "600"))
+
+# Questions left off the leaderboard
+HIDDEN_STATUSES = {"dismissed"}
+
+# Position of a question: most votes first, then oldest first
+RankKey = Tuple[int, float, str]
+
+
+def rank_key(question: Dict) -> RankKey:
+    """Sort key of a question on its session's board."""
+    created_at = question.get("created_at")
+    if isinstance(created_at, datetime):
+        created_at = (created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)).timestamp()
+    else:
+        created_at = 0.0
+    return (-(question.get("votes") or 0), created_at, str(question["id"]))
+
+
+class SessionBoard:
+    """
+    The questions of one session, kept sorted by rank_key.
+    Reordering after a vote is a binary search and a list move, not a sort.
+    """
+
+    def __init__(self, questions: List[Dict]):
+        self.questions: Dict[str, Dict] = {}
+        self._keys: Dict[str, RankKey] = {}
+        self._order: List[RankKey] = []
+        # Leaderboard last sent to clients: question ID -> (rank, question)
+        self.pushed: Dict[str, Tuple[int, Dict]] = {}
+        for question in questions:
+            self.upsert(question)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def upsert(self, question: Dict):
+        """
+        Add a question or apply a newer copy of it.
+        Upvotes are never taken back, so a copy carrying fewer votes than
+        the one held (an event overtaken by a later one) keeps the higher count.
+        """
+        question_id = str(question["id"])
+        current = self.questions.get(question_id)
+        if current is not None:
+            if (current.get("votes") or 0) > (question.get("votes") or 0):
+                question = {**question, "votes": current["votes"]}
+            del self._order[bisect.bisect_left(self._order, self._keys[question_id])]
+        key = rank_key(question)
+        bisect.insort(self._order, key)
+        self._keys[question_id] = key
+        self.questions[question_id] = question
+
+    def ranked(self, status: Optional[str] = None, limit: int = 0) -> List[Dict]:
+        """
+        Questions in rank order.
+
+        Args:
+            status: Only questions with this status
+            limit: Maximum number of questions (0 for all)
+
+        Returns:
+            List[Dict]: Questions, most upvoted first
+        """
+        questions = []
+        for key in self._order:
+            question = self.questions[key[2]]
+            if status and question.get("status") != status:
+                continue
+            questions.append(question)
+            if limit and len(questions) >= limit:
+                break
+        return questions
+
+    def top(self, limit: int) -> Dict[str, Tuple[int, Dict]]:
+        """Leaderboard of the top questions not hidden, keyed by question ID."""
+        top = {}
+        for key in self._order:
+            question = self.questions[key[2]]
+            if question.get("status") in HIDDEN_STATUSES:
+                continue
+            top[key[2]] = (len(top) + 1, question)
+            if len(top) >= limit:
+                break
+        return top
+
+
+class QuestionBoards:
+    """
+    Ranked question boards of the sessions this worker serves.
+    Boards are loaded on first use; question events for sessions not
+    loaded are ignored, since the load reads them from the database.
+    """
+
+    def __init__(self, tick: float = QA_TICK_SECONDS, top_n: int = QA_TOP_N,
+                 idle_seconds: float = QA_IDLE_SECONDS):
+        self.tick = tick
+        self.top_n = top_n
+        self.idle_seconds = idle_seconds
+        self._boards: Dict[str, SessionBoard] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        # Events that arrived while their session was loading
+        self._early: Dict[str, List[Dict]] = {}
+        self._dirty: Set[str] = set()
+        self._touched: Dict[str, float] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self.stats = {"loads": 0, "events": 0, "pushes": 0}
+
+    def __len__(self) -> int:
+        return len(self._boards)
+
+    async def get(self, session_id: str) -> SessionBoard:
+        """
+        Get a session's board, loading it on first use.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            SessionBoard: The session's ranked questions
+        """
+        self._touched[session_id] = time.monotonic()
+        board = self._boards.get(session_id)
+        if board is not None:
+            return board
+        if session_id not in self._loading:
+            self._loading[session_id] = asyncio.ensure_future(self._load(session_id))
+        return await asyncio.shield(self._loading[session_id])
+
+    async def _load(self, session_id: str) -> SessionBoard:
+        """Read a session's questions and replay the events received meanwhile."""
+        from .question_model import QuestionModel
+
+        self._early[session_id] = []
+        try:
+            board = SessionBoard(await QuestionModel.load_session_questions(session_id))
+            for question in self._early[session_id]:
+                board.upsert(question)
+            board.pushed = board.top(self.top_n)
+            self._boards[session_id] = board
+            self.stats["loads"] += 1
+            return board
+        finally:
+            self._early.pop(session_id, None)
+            self._loading.pop(session_id, None)
+
+    async def ranked(self, session_id: str, status: Optional[str] = None, limit: int = 0) -> List[Dict]:
+        """
+        A session's questions in rank order, served from memory.
+
+        Args:
+            session_id: Session ID
+            status: Optional status filter (pending, answered, dismissed)
+            limit: Maximum number of questions (0 for all)
+
+        Returns:
+            List[Dict]: Copies of the questions, most upvoted first
+        """
+        board = await self.get(session_id)
+        return [dict(question) for question in board.ranked(status, limit)]
+
+    async def leaderboard(self, session_id: str, limit: int) -> List[Dict]:
+        """
+        A session's top questions as on its leaderboard, without dismissed ones.
+
+        Args:
+            session_id: Session ID
+            limit: Number of questions
+
+        Returns:
+            List[Dict]: Questions with their "rank", most upvoted first
+        """
+        top = (await self.get(session_id)).top(limit)
+        return self._entries(top, top)
+
+    def apply(self, session_id: str, question: Dict):
+        """
+        Apply a changed question to its session's board, if loaded.
+
+        Args:
+            session_id: Session ID
+            question: The question as stored, with its "id"
+        """
+        self.stats["events"] += 1
+        if session_id in self._early:
+            self._early[session_id].append(question)
+        board = self._boards.get(session_id)
+        if board is None:
+            return
+        board.upsert(question)
+        self._dirty.add(session_id)
+
+    def handle_event(self, message: Dict):
+        """Bus handler: apply question events from any worker."""
+        event = message["event"]
+        if event.get("type") == EVENT_QUESTION_CHANGED:
+            for question in event["questions"]:
+                self.apply(message["topic"], question)
+
+    @staticmethod
+    def _entries(top: Dict[str, Tuple[int, Dict]], question_ids) -> List[Dict]:
+        return [{**top[question_id][1], "rank": top[question_id][0]} for question_id in question_ids]
+
+    def _push_session(self, session_id: str) -> bool:
+        """Send a session's clients the leaderboard entries that moved or changed since the last push."""
+        board = self._boards.get(session_id)
+        if board is None:
+            return False
+        top = board.top(self.top_n)
+        updated = [question_id for question_id, entry in top.items() if board.pushed.get(question_id) != entry]
+        removed = [question_id for question_id in board.pushed if question_id not in top]
+        board.pushed = top
+        if not updated and not removed:
+            return False
+        question_hub.publish(session_id, {
+            "type": EVENT_LEADERBOARD_DELTA,
+            "session_id": session_id,
+            "questions": self._entries(top, updated),
+            "removed": removed
+        })
+        return True
+
+    def push(self) -> int:
+        """
+        Send the leaderboard changes of every changed session to its clients on this worker.
+
+        Returns:
+            int: Number of sessions pushed
+        """
+        dirty, self._dirty = self._dirty, set()
+        pushed = sum(self._push_session(session_id) for session_id in dirty)
+        self.stats["pushes"] += pushed
+        return pushed
+
+    async def subscribe(self, session_id: str) -> Tuple[Subscriber, Dict]:
+        """
+        Subscribe a client to a session's leaderboard.
+        Pending changes go out to the existing clients first, so the
+        snapshot and the deltas that follow it line up.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Tuple[Subscriber, Dict]: Subscriber to read deltas from, and the current leaderboard
+        """
+        board = await self.get(session_id)
+        self._push_session(session_id)
+        self._dirty.discard(session_id)
+        subscriber = question_hub.subscribe(session_id)
+        snapshot = {
+            "type": EVENT_LEADERBOARD,
+            "session_id": session_id,
+            "questions": self._entries(board.pushed, board.pushed)
+        }
+        return subscriber, snapshot
+
+    def _evict_idle(self):
+        """Drop boards of sessions nobody read or watched lately."""
+        cutoff = time.monotonic() - self.idle_seconds
+        for session_id in [session_id for session_id, touched in self._touched.items() if touched < cutoff]:
+            if question_hub.client_count(session_id):
+                self._touched[session_id] = time.monotonic()
+                continue
+            self._boards.pop(session_id, None)
+            self._touched.pop(session_id, None)
+            self._dirty.discard(session_id)
+
+    async def _run(self):
+        """Push changes at the tick rate and evict idle boards."""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.push()
+            self._evict_idle()
+
+    async def start(self):
+        """Start pushing leaderboard changes."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background loop."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def get_stats(self) -> Dict:
+        """
+        Loaded boards and counters of this worker.
+
+        Returns:
+            Dict: Session and question counts, settings and counters
+        """
+        return {
+            "sessions": len(self._boards),
+            "questions": sum(len(board) for board in self._boards.values()),
+            "tick_seconds": self.tick,
+            "top_n": self.top_n,
+            **self.stats,
+        }
+
+
+# Process-wide boards; pushed while the app runs
+question_boards = QuestionBoards()
+
+event_bus.subscribe(CHANNEL_QUESTIONS, question_boards.handle_event)
@@ -5,27 +5,46 @@ Based on the QuestionSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
 
 from .base_model import BaseModel
+from .hub import broadcast, EVENT_QUESTION_CHANGED
+from .pubsub import CHANNEL_QUESTIONS
+from .question_board import question_boards
 
 class QuestionModel(BaseModel):
     """
-    Model for Q&A sessions.
+    Model for Q&A sessions; the one store for questions, whichever route
+    asks, answers or moderates them.
     Handles all database interactions for questions during sessions.
+    Every change is published as a question event, which keeps the
+    in-memory session rankings of question_boards current on all workers.
     """
     collection_name = "questions"
+    indexes = [
+        IndexModel([("session_id", ASCENDING), ("status", ASCENDING), ("votes", DESCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING)]),
+    ]
+    # Questions are returned without the voter list some older documents still carry
+    projection = {"voters": 0}
+    # Moderation actions; restoring a dismissed question makes it pending or answered again
+    MODERATION_ACTIONS = ("dismiss", "restore")
     
     @classmethod
-    async def add_question(cls, session_id: str, user_id: str, question_text: str, 
-                        is_anonymous: bool = False) -> str:
+    async def add_question(cls, session_id: Optional[str], user_id: str, question_text: str, 
+                        is_anonymous: bool = False, event_id: Optional[str] = None,
+                        answer_text: Optional[str] = None) -> str:
         """
         Add a question during a Q&A session.
         
         Args:
-            session_id: Session ID
+            session_id: Session ID (None for a question about the whole event)
             user_id: User ID asking the question
             question_text: The question text
             is_anonymous: Whether the question should be anonymous
+            event_id: Optional event ID
+            answer_text: Optional answer given with the question
             
         Returns:
             str: ID of the created question
@@ -34,20 +53,50 @@ class QuestionModel(BaseModel):
         
         question_data = {
             "session_id": session_id,
+            "event_id": event_id,
             "user_id": user_id,
             "question_text": question_text,
             "is_anonymous": is_anonymous,
             "status": "pending",  # pending, answered, dismissed
             "votes": 0,
-            "voters": [],
             "created_at": now,
             "answered_at": None,
-            "answer_text": None
+            "answer_text": None,
+            "answered_by": None,
+            "answers": []
         }
+        if answer_text:
+            question_data.update(cls._answer_fields(answer_text, user_id, now))
+            question_data["answers"] = [{"user_id": user_id, "text": answer_text, "answered_at": now}]
         
         question_id = await cls.insert_one(question_data)
+        question_data.pop("_id", None)
+        await cls.publish_changed([{**question_data, "id": str(question_id)}])
         return str(question_id)
     
+    @classmethod
+    async def publish_changed(cls, questions: List[Dict]):
+        """Tell every worker's question boards about changed questions, one event per session."""
+        sessions: Dict[str, List[Dict]] = {}
+        for question in questions:
+            if question and question.get("session_id"):
+                sessions.setdefault(question["session_id"], []).append(question)
+        for session_id, changed in sessions.items():
+            await broadcast(CHANNEL_QUESTIONS, session_id, {"type": EVENT_QUESTION_CHANGED, "questions": changed})
+    
+    @classmethod
+    async def get_question(cls, question_id: str) -> Optional[Dict]:
+        """
+        Get a question by ID.
+        
+        Args:
+            question_id: Question ID
+            
+        Returns:
+            Dict: Question document or None if not found
+        """
+        return await cls.find_one({"_id": ObjectId(question_id)}, projection=cls.projection)
+    
     @classmethod
     async def upvote_question(cls, question_id: str, user_id: str) -> Optional[Dict]:
         """
@@ -58,50 +107,133 @@ class QuestionModel(BaseModel):
             user_id: User ID upvoting the question
             
         Returns:
-            Dict: Updated question document or None if not found
+            Dict: Updated question document or None if not found or already upvoted
         """
-        question = await cls.find_one({"_id": ObjectId(question_id)})
-        if not question or user_id in question.get("voters", []):
+        question = await cls.find_one({"_id": ObjectId(question_id)}, projection={"_id": 1})
+        if not question or not await QuestionVoteModel.record_vote(question_id, user_id):
             return None
             
-        return await cls.update_one(
+        question = await cls.update_one(
             {"_id": ObjectId(question_id)},
-            {
-                "$inc": {"votes": 1},
-                "$addToSet": {"voters": user_id}
-            }
+            {"$inc": {"votes": 1}},
+            projection=cls.projection
         )
+        await cls.publish_changed([question])
+        return question
+    
+    @staticmethod
+    def _answer_fields(answer_text: str, answered_by: Optional[str], now: datetime) -> Dict:
+        return {
+            "status": "answered",
+            "answer_text": answer_text,
+            "answered_by": answered_by,
+            "answered_at": now
+        }
+    
+    @classmethod
+    def _answer_update(cls, answer_text: str, answered_by: Optional[str], now: datetime) -> Dict:
+        """Update making an answer the question's current one, keeping earlier answers."""
+        return {
+            "$set": cls._answer_fields(answer_text, answered_by, now),
+            "$push": {"answers": {"user_id": answered_by, "text": answer_text, "answered_at": now}}
+        }
     
     @classmethod
-    async def answer_question(cls, question_id: str, answer_text: str) -> Optional[Dict]:
+    async def answer_question(cls, question_id: str, answer_text: str,
+                              answered_by: Optional[str] = None) -> Optional[Dict]:
         """
         Answer a question.
         
         Args:
             question_id: Question ID
             answer_text: The answer text
+            answered_by: Optional ID of the user answering
             
         Returns:
             Dict: Updated question document or None if not found
         """
-        now = datetime.now(timezone.utc)
-        
-        return await cls.update_one(
+        question = await cls.update_one(
             {"_id": ObjectId(question_id)},
-            {
-                "$set": {
-                    "status": "answered",
-                    "answer_text": answer_text,
-                    "answered_at": now
-                }
-            }
+            cls._answer_update(answer_text, answered_by, datetime.now(timezone.utc)),
+            projection=cls.projection
         )
+        await cls.publish_changed([question])
+        return question
+    
+    @classmethod
+    async def answer_questions(cls, answers: Dict[str, str], answered_by: Optional[str] = None) -> List[Dict]:
+        """
+        Answer several questions with one bulk write.
+        
+        Args:
+            answers: Answer text keyed by question ID
+            answered_by: Optional ID of the user answering
+            
+        Returns:
+            List[Dict]: The answered questions (unknown IDs are skipped)
+        """
+        object_ids = [ObjectId(question_id) for question_id in answers]
+        if not object_ids:
+            return []
+        now = datetime.now(timezone.utc)
+        collection = await cls.get_collection()
+        await collection.bulk_write([
+            UpdateOne({"_id": ObjectId(question_id)}, cls._answer_update(answer_text, answered_by, now))
+            for question_id, answer_text in answers.items()
+        ], ordered=False)
+        await cls.invalidate_cache(*object_ids)
+        return await cls._reload_and_publish(object_ids)
+    
+    @classmethod
+    async def moderate_questions(cls, question_ids: List[str], action: str) -> List[Dict]:
+        """
+        Dismiss questions, hiding them from the session leaderboard, or restore dismissed ones.
+        
+        Args:
+            question_ids: Question IDs
+            action: "dismiss" or "restore"
+            
+        Returns:
+            List[Dict]: The moderated questions (unknown IDs are skipped)
+            
+        Raises:
+            ValueError: If the action is unknown
+        """
+        if action not in cls.MODERATION_ACTIONS:
+            raise ValueError(f"Unknown moderation action: {action}")
+        object_ids = [ObjectId(question_id) for question_id in question_ids]
+        if not object_ids:
+            return []
+        now = datetime.now(timezone.utc)
+        if action == "dismiss":
+            await cls.update_many(
+                {"_id": {"$in": object_ids}},
+                {"$set": {"status": "dismissed", "moderated_at": now}}
+            )
+        else:
+            # Answered questions come back answered, the rest pending
+            await cls.update_many(
+                {"_id": {"$in": object_ids}, "status": "dismissed", "answer_text": {"$nin": [None, ""]}},
+                {"$set": {"status": "answered", "moderated_at": now}}
+            )
+            await cls.update_many(
+                {"_id": {"$in": object_ids}, "status": "dismissed"},
+                {"$set": {"status": "pending", "moderated_at": now}}
+            )
+        return await cls._reload_and_publish(object_ids)
+    
+    @classmethod
+    async def _reload_and_publish(cls, object_ids: List[ObjectId]) -> List[Dict]:
+        """Read back questions changed by a batch write and publish them."""
+        questions = await cls.find_many({"_id": {"$in": object_ids}}, projection=cls.projection)
+        await cls.publish_changed(questions)
+        return questions
     
     @classmethod
     async def get_session_questions(cls, session_id: str, 
                                  status: Optional[str] = None) -> List[Dict]:
         """
-        Get questions for a session.
+        Get questions for a session, from the session's in-memory ranking.
         
         Args:
             session_id: Session ID
@@ -110,9 +242,71 @@ class QuestionModel(BaseModel):
         Returns:
             List[Dict]: List of question documents sorted by votes
         """
-        query = {"session_id": session_id}
+        return await question_boards.ranked(session_id, status)
+    
+    @classmethod
+    async def load_session_questions(cls, session_id: str) -> List[Dict]:
+        """
+        Read all of a session's questions from the database, to be ranked in memory.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            List[Dict]: List of question documents
+        """
+        return await cls.find_many({"session_id": session_id}, projection=cls.projection)
+    
+    @classmethod
+    async def list_questions(cls, event_id: Optional[str] = None, status: Optional[str] = None,
+                             limit: int = 0) -> List[Dict]:
+        """
+        Get the newest questions, of an event or of all events.
         
+        Args:
+            event_id: Optional event ID
+            status: Optional status filter (pending, answered, dismissed)
+            limit: Maximum number of questions (0 for all)
+            
+        Returns:
+            List[Dict]: List of question documents, newest first
+        """
+        query = {}
+        if event_id:
+            query["event_id"] = event_id
         if status:
             query["status"] = status
+        return await cls.find_many(query, limit=limit, sort=[("created_at", -1)], projection=cls.projection)
+
+
+class QuestionVoteModel(BaseModel):
+    """
+    Model for question upvotes, one per user and question.
+    The unique index is what keeps a user from upvoting twice.
+    """
+    collection_name = "question_votes"
+    indexes = [
+        IndexModel([("question_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+    ]
+    
+    @classmethod
+    async def record_vote(cls, question_id: str, user_id: str) -> bool:
+        """
+        Record a user's upvote of a question.
+        
+        Args:
+            question_id: Question ID
+            user_id: User ID upvoting the question
             
-        return await cls.find_many(query, sort=[("votes", -1), ("created_at", 1)])
\ No newline at end of file
+        Returns:
+            bool: False if the user had already upvoted it
+        """
+        try:
+            await cls.insert_one({
+                "question_id": question_id,
+                "user_id": user_id,
+                "created_at": datetime.now(timezone.utc)
+            })
+        except DuplicateKeyError:
+            return False
+        return True
@@ -0,0 +1,268 @@
+"""
+Registration model module for handling event participation.
+Each registration links one user to one event, replacing the
+participant list that used to be embedded in the event document.
+"""
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime, timezone
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .base_model import BaseModel
+
+
+class RegistrationModel(BaseModel):
+    """
+    Model for event registration data operations.
+    Handles all database interactions for event registrations.
+    """
+    collection_name = "registrations"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("start_date", ASCENDING), ("_id", ASCENDING)]),
+    ]
+
+    @classmethod
+    async def create_registration(cls, event_id: str, user_id: str,
+                                  start_date: Optional[datetime] = None) -> Optional[str]:
+        """
+        Register a user for an event.
+
+        Args:
+            event_id: Event ID
+            user_id: User ID
+            start_date: Start date of the event, denormalized for listing a user's events
+
+        Returns:
+            str: ID of the created registration or None if already registered
+        """
+        registration_data = {
+            "event_id": event_id,
+            "user_id": user_id,
+            "start_date": start_date,
+            "registered_at": datetime.now(timezone.utc)
+        }
+
+        try:
+            registration_id = await cls.insert_one(registration_data)
+        except DuplicateKeyError:
+            return None
+        return str(registration_id)
+
+    @classmethod
+    async def create_registrations(cls, event_id: str, user_ids: List[str],
+                                   start_date: Optional[datetime] = None) -> int:
+        """
+        Register several users for an event with unordered bulk inserts,
+        skipping existing registrations.
+
+        Args:
+            event_id: Event ID
+            user_ids: User IDs
+            start_date: Start date of the event
+
+        Returns:
+            int: Number of registrations created
+        """
+        registered_at = datetime.now(timezone.utc)
+        documents = [
+            {"event_id": event_id, "user_id": user_id, "start_date": start_date, "registered_at": registered_at}
+            for user_id in dict.fromkeys(user_ids)
+        ]
+        collection = await cls.get_collection()
+        created = 0
+        for start in range(0, len(documents), 1000):
+            try:
+                result = await collection.insert_many(documents[start:start + 1000], ordered=False)
+                created += len(result.inserted_ids)
+            except BulkWriteError as e:
+                # Duplicate keys are users already registered
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+                created += e.details.get("nInserted", 0)
+        if created:
+            await cls.invalidate_cache()
+        return created
+
+    @classmethod
+    async def delete_registration(cls, event_id: str, user_id: str) -> bool:
+        """
+        Cancel a user's registration for an event.
+
+        Args:
+            event_id: Event ID
+            user_id: User ID
+
+        Returns:
+            bool: True if a registration was removed, False otherwise
+        """
+        deleted_count = await cls.delete_one({"event_id": event_id, "user_id": user_id})
+        return deleted_count > 0
+
+    @classmethod
+    async def is_registered(cls, event_id: str, user_id: str) -> bool:
+        """
+        Check if a user is registered for an event.
+
+        Args:
+            event_id: Event ID
+            user_id: User ID
+
+        Returns:
+            bool: True if registered, False otherwise
+        """
+        registration = await cls.find_one(
+            {"event_id": event_id, "user_id": user_id},
+            {"_id": 1}
+        )
+        return registration is not None
+
+    @classmethod
+    async def get_registered_event_ids(cls, user_id: str, event_ids: List[str]) -> List[str]:
+        """
+        Get which of the given events a user is registered for.
+
+        Args:
+            user_id: User ID
+            event_ids: Event IDs to check
+
+        Returns:
+            List[str]: IDs of the events the user is registered for
+        """
+        registrations = await cls.find_many(
+            {"user_id": user_id, "event_id": {"$in": list(event_ids)}},
+            projection={"event_id": 1}
+        )
+        return [registration["event_id"] for registration in registrations]
+
+    @classmethod
+    async def get_event_user_ids(cls, event_id: str) -> List[str]:
+        """
+        Get the IDs of all users registered for an event.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            List[str]: List of user IDs
+        """
+        registrations = await cls.find_many(
+            {"event_id": event_id},
+            projection={"user_id": 1}
+        )
+        return [registration["user_id"] for registration in registrations]
+
+    @classmethod
+    def iter_event_attendees(cls, event_id: str, batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream the registrations for an event joined with the registered users.
+
+        Args:
+            event_id: Event ID
+            batch_size: Number of attendees fetched per round trip
+
+        Returns:
+            AsyncIterator[Dict]: Attendee rows with the user's ID, name, email and role
+        """
+        pipeline = [
+            {"$match": {"event_id": event_id}},
+            {"$sort": {"_id": 1}},
+            {"$lookup": {
+                "from": "users",
+                "let": {"user_id": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None}}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_id"]}}},
+                    {"$project": {"first_name": 1, "last_name": 1, "email": 1, "role": 1}}
+                ],
+                "as": "user"
+            }},
+            {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
+            {"$project": {
+                "_id": 0,
+                "user_id": 1,
+                "first_name": "$user.first_name",
+                "last_name": "$user.last_name",
+                "email": "$user.email",
+                "role": "$user.role",
+                "registered_at": 1
+            }}
+        ]
+        return cls.iter_aggregate(pipeline, batch_size=batch_size)
+
+    @classmethod
+    async def get_event_user_ids_for_events(cls, event_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Get the IDs of the users registered for several events with one query.
+
+        Args:
+            event_ids: Event IDs
+
+        Returns:
+            Dict[str, List[str]]: User IDs keyed by event ID
+        """
+        user_ids = {event_id: [] for event_id in event_ids}
+        registrations = await cls.find_many(
+            {"event_id": {"$in": list(event_ids)}},
+            projection={"event_id": 1, "user_id": 1}
+        )
+        for registration in registrations:
+            user_ids.setdefault(registration["event_id"], []).append(registration["user_id"])
+        return user_ids
+
+    @classmethod
+    async def get_user_event_ids(cls, user_id: str, start_after: Optional[datetime] = None,
+                                 limit: int = 0, cursor: Optional[str] = None) -> Dict:
+        """
+        Get a page of the events a user is registered for, ordered by start date.
+
+        Args:
+            user_id: User ID
+            start_after: Only include events starting after this time
+            limit: Maximum number of event IDs to return (0 for all)
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Dict: "event_ids" on this page and "next_cursor" (None on the last page)
+        """
+        query = {"user_id": user_id}
+        if start_after is not None:
+            query["start_date"] = {"$gt": start_after}
+
+        page = await cls.find_page(
+            query,
+            limit=limit,
+            sort=[("start_date", 1)],
+            cursor=cursor,
+            projection={"event_id": 1}
+        )
+        return {
+            "event_ids": [registration["event_id"] for registration in page["items"]],
+            "next_cursor": page["next_cursor"]
+        }
+
+    @classmethod
+    async def update_event_start_date(cls, event_id: str, start_date: datetime) -> int:
+        """
+        Keep the denormalized start date in step with the event.
+
+        Args:
+            event_id: Event ID
+            start_date: New start date
+
+        Returns:
+            int: Number of registrations updated
+        """
+        return await cls.update_many({"event_id": event_id}, {"$set": {"start_date": start_date}})
+
+    @classmethod
+    async def delete_event_registrations(cls, event_id: str) -> int:
+        """
+        Remove every registration for an event.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            int: Number of registrations removed
+        """
+        return await cls.delete_many({"event_id": event_id})
@@ -0,0 +1,219 @@
+"""
+Schedule model module for the background job scheduler.
+Timers are stored one per job in scheduled_jobs, keyed by a job name such
+as "poll:<poll_id>", so re-arming a timer overwrites it instead of adding
+another. The scheduler lease lives in scheduler_locks.
+"""
+from typing import Dict, List, Optional, Any
+from datetime import datetime, timezone, timedelta
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .base_model import BaseModel
+
+
+class ScheduledJobModel(BaseModel):
+    """
+    Model for scheduled job timers.
+    A timer is "scheduled" until a worker claims it, "running" while its
+    handler runs and "failed" once it ran out of attempts; finished
+    one-off timers are deleted.
+    """
+    collection_name = "scheduled_jobs"
+    indexes = [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)]),
+    ]
+
+    @classmethod
+    async def set_timer(cls, name: str, kind: str, run_at: datetime,
+                        payload: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+        """
+        Arm a timer, replacing the job's previous timer if it has one.
+
+        Args:
+            name: Unique job name
+            kind: Handler kind the job runs
+            run_at: When the job is due
+            payload: Arguments passed to the handler
+
+        Returns:
+            Dict: The armed timer
+        """
+        now = datetime.now(timezone.utc)
+        return await cls.update_one(
+            {"_id": name},
+            {
+                "$set": {
+                    "kind": kind,
+                    "payload": payload or {},
+                    "run_at": run_at,
+                    "status": "scheduled",
+                    "attempts": 0,
+                    "updated_at": now
+                },
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+
+    @classmethod
+    async def cancel_timer(cls, name: str) -> bool:
+        """
+        Remove a job's timer.
+
+        Args:
+            name: Job name
+
+        Returns:
+            bool: True if a timer was removed
+        """
+        return await cls.delete_one({"_id": name}) > 0
+
+    @classmethod
+    async def get_due(cls, until: datetime, limit: int = 1000) -> List[Dict]:
+        """
+        Get the scheduled timers due before a time, earliest first.
+
+        Args:
+            until: Upper bound of run_at
+            limit: Maximum number of timers
+
+        Returns:
+            List[Dict]: Timers with their name as "id"
+        """
+        return await cls.find_many(
+            {"status": "scheduled", "run_at": {"$lte": until}},
+            limit=limit,
+            sort=[("run_at", ASCENDING)],
+            projection={"run_at": 1}
+        )
+
+    @classmethod
+    async def release_stale(cls) -> int:
+        """
+        Put back running timers whose lease expired, e.g. after their worker died.
+
+        Returns:
+            int: Number of timers released
+        """
+        return await cls.update_many(
+            {"status": "running", "lease_until": {"$lt": datetime.now(timezone.utc)}},
+            {"$set": {"status": "scheduled"}, "$unset": {"owner": "", "lease_until": ""}}
+        )
+
+    @classmethod
+    async def claim(cls, name: str, owner: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Atomically take a due timer, so only one worker runs it.
+
+        Args:
+            name: Job name
+            owner: ID of the claiming worker
+            lease_seconds: How long the claim holds before the timer is released
+
+        Returns:
+            Dict: The claimed timer, or None if it is not due or already taken
+        """
+        now = datetime.now(timezone.utc)
+        return await cls.update_one(
+            {"_id": name, "status": "scheduled", "run_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "running",
+                    "owner": owner,
+                    "lease_until": now + timedelta(seconds=lease_seconds),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            }
+        )
+
+    @classmethod
+    async def complete(cls, name: str, owner: str, next_run_at: Optional[datetime] = None):
+        """
+        Finish a claimed timer, re-arming it for its next run or removing it.
+        A timer re-armed while it ran is left as it is.
+
+        Args:
+            name: Job name
+            owner: ID of the worker that claimed it
+            next_run_at: When to run the job again (None for one-off jobs)
+        """
+        query = {"_id": name, "status": "running", "owner": owner}
+        if next_run_at is None:
+            await cls.delete_one(query)
+            return
+        now = datetime.now(timezone.utc)
+        await cls.update_one(query, {
+            "$set": {
+                "status": "scheduled",
+                "run_at": next_run_at,
+                "attempts": 0,
+                "last_run_at": now,
+                "updated_at": now
+            },
+            "$unset": {"owner": "", "lease_until": "", "last_error": ""}
+        })
+
+    @classmethod
+    async def fail(cls, name: str, owner: str, error: str, retry_at: Optional[datetime] = None):
+        """
+        Record a failed run of a claimed timer.
+
+        Args:
+            name: Job name
+            owner: ID of the worker that claimed it
+            error: Error message
+            retry_at: When to try again (None to give up and mark the timer failed)
+        """
+        update = {"status": "failed", "last_error": error, "updated_at": datetime.now(timezone.utc)}
+        if retry_at:
+            update.update({"status": "scheduled", "run_at": retry_at})
+        await cls.update_one(
+            {"_id": name, "status": "running", "owner": owner},
+            {"$set": update, "$unset": {"owner": "", "lease_until": ""}}
+        )
+
+
+class SchedulerLockModel(BaseModel):
+    """
+    Model for named leases held by one worker at a time.
+    A lease is renewed by its holder and free for the taking once expired.
+    """
+    collection_name = "scheduler_locks"
+
+    @classmethod
+    async def acquire(cls, name: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Take or renew a lease.
+
+        Args:
+            name: Lease name
+            owner: ID of the worker asking for it
+            lease_seconds: How long the lease holds without renewal
+
+        Returns:
+            bool: True if the worker holds the lease
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            lease = await cls.update_one(
+                {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=lease_seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            return False
+        return lease is not None
+
+    @classmethod
+    async def release(cls, name: str, owner: str):
+        """
+        Give up a lease early, so another worker can take over at once.
+
+        Args:
+            name: Lease name
+            owner: ID of the worker holding it
+        """
+        await cls.delete_one({"_id": name, "owner": owner})
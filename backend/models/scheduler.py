@@ -0,0 +1,272 @@
+"""
+Scheduler module running timed jobs in the background.
+Timers live in the scheduled_jobs collection, one per job, so a timer set
+on any worker survives restarts. The worker holding the scheduler lease
+loads the timers due within SCHEDULER_LOOKAHEAD_SECONDS into a heap,
+sleeps until the earliest one, claims it with a conditional update and
+runs its handler, at most SCHEDULER_CONCURRENCY at a time. Timers armed on
+the leader join its heap at once; timers armed elsewhere are picked up by
+the next reload, every SCHEDULER_POLL_SECONDS.
+
+A handler takes the job's payload and returns when to run the job again,
+or None when it is done. A failed run is retried with exponential backoff
+up to SCHEDULER_MAX_ATTEMPTS times.
+"""
+import asyncio
+import heapq
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .schedule_model import ScheduledJobModel, SchedulerLockModel
+
+
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "5"))
+SCHEDULER_LOOKAHEAD_SECONDS = float(os.getenv("SCHEDULER_LOOKAHEAD_SECONDS", "60"))
+# How long the leader holds the lease without renewing, and a claimed job its timer
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "30"))
+SCHEDULER_JOB_LEASE_SECONDS = float(os.getenv("SCHEDULER_JOB_LEASE_SECONDS", "600"))
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+# Runs per job before it is marked failed, and the delay before the first retry (doubled each time)
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv("SCHEDULER_MAX_ATTEMPTS", "5"))
+SCHEDULER_RETRY_BASE_SECONDS = float(os.getenv("SCHEDULER_RETRY_BASE_SECONDS", "30"))
+
+LEADER_LOCK = "scheduler"
+
+# Job kinds
+JOB_CLOSE_POLL = "close_poll"
+JOB_SEND_REPORT = "send_report"
+JOB_SEND_CAMPAIGN = "send_campaign"
+
+Handler = Callable[[Dict], Awaitable[Optional[datetime]]]
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Treat a naive datetime as UTC."""
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+class Scheduler:
+    """
+    Timer queue shared by all workers through MongoDB and run by one of them.
+    The heap holds (run_at, name) entries; an entry is stale once the
+    job's timer moved, which _queued tells apart.
+    """
+
+    def __init__(self, poll_interval: float = SCHEDULER_POLL_SECONDS,
+                 lookahead: float = SCHEDULER_LOOKAHEAD_SECONDS,
+                 lease_seconds: float = SCHEDULER_LEASE_SECONDS,
+                 job_lease_seconds: float = SCHEDULER_JOB_LEASE_SECONDS,
+                 concurrency: int = SCHEDULER_CONCURRENCY,
+                 max_attempts: int = SCHEDULER_MAX_ATTEMPTS,
+                 retry_base: float = SCHEDULER_RETRY_BASE_SECONDS):
+        self.poll_interval = poll_interval
+        self.lookahead = lookahead
+        self.lease_seconds = lease_seconds
+        self.job_lease_seconds = job_lease_seconds
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._handlers: Dict[str, Handler] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        # Run time of each job's live heap entry
+        self._queued: Dict[str, datetime] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "failures": 0, "retries": 0, "lost_claims": 0, "leader_changes": 0}
+
+    def register(self, kind: str, handler: Handler):
+        """
+        Set the coroutine that runs jobs of a kind.
+
+        Args:
+            kind: Job kind
+            handler: Coroutine taking the job's payload, returning its next run time or None
+        """
+        self._handlers[kind] = handler
+
+    async def schedule(self, name: str, kind: str, run_at: datetime, payload: Optional[Dict] = None):
+        """
+        Arm a job's timer, replacing any earlier one. Callable from any worker.
+
+        Args:
+            name: Unique job name, e.g. "poll:<poll_id>"
+            kind: Job kind
+            run_at: When the job is due
+            payload: Arguments passed to the handler
+        """
+        run_at = as_utc(run_at)
+        await ScheduledJobModel.set_timer(name, kind, run_at, payload)
+        self._push(name, run_at)
+
+    async def cancel(self, name: str):
+        """
+        Remove a job's timer; a run already under way finishes.
+
+        Args:
+            name: Job name
+        """
+        await ScheduledJobModel.cancel_timer(name)
+        self._queued.pop(name, None)
+
+    def _push(self, name: str, run_at: datetime):
+        """Add a timer to the heap if this worker leads and it is due soon."""
+        if not self.is_leader or self._queued.get(name) == run_at:
+            return
+        if run_at > datetime.now(timezone.utc) + timedelta(seconds=self.lookahead):
+            return
+        self._queued[name] = run_at
+        heapq.heappush(self._heap, (run_at, name))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _load(self):
+        """Release timers of dead workers and queue the ones due soon."""
+        await ScheduledJobModel.release_stale()
+        until = datetime.now(timezone.utc) + timedelta(seconds=self.lookahead)
+        for timer in await ScheduledJobModel.get_due(until):
+            self._push(timer["id"], as_utc(timer["run_at"]))
+
+    async def _lead(self) -> bool:
+        """Take or renew the scheduler lease; drop the heap when it is lost."""
+        try:
+            leader = await SchedulerLockModel.acquire(LEADER_LOCK, self.owner, self.lease_seconds)
+        except Exception as e:
+            print(f"[Scheduler ERROR] Lease renewal failed: {str(e)}")
+            leader = False
+        if leader != self.is_leader:
+            self.stats["leader_changes"] += 1
+            print(f"[Scheduler] {self.owner} {'took' if leader else 'lost'} the scheduler lease")
+        self.is_leader = leader
+        if not leader:
+            self._heap.clear()
+            self._queued.clear()
+        return leader
+
+    async def _run(self):
+        """Renew the lease, reload timers and start the jobs that come due."""
+        next_poll = 0.0
+        while True:
+            if time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + self.poll_interval
+                if await self._lead():
+                    try:
+                        await self._load()
+                    except Exception as e:
+                        print(f"[Scheduler ERROR] Loading timers failed: {str(e)}")
+
+            now = datetime.now(timezone.utc)
+            while self._heap and self._heap[0][0] <= now and len(self._tasks) < self.concurrency:
+                run_at, name = heapq.heappop(self._heap)
+                if self._queued.get(name) != run_at:
+                    continue
+                del self._queued[name]
+                task = asyncio.create_task(self._execute(name))
+                self._tasks.add(task)
+                task.add_done_callback(self._finished)
+
+            timeout = next_poll - time.monotonic()
+            if self._heap and len(self._tasks) < self.concurrency:
+                timeout = min(timeout, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, name: str):
+        """Claim and run one job, then re-arm, remove or retry its timer."""
+        try:
+            job = await ScheduledJobModel.claim(name, self.owner, self.job_lease_seconds)
+            if job is None:
+                # Moved, cancelled or taken by a previous leader
+                self.stats["lost_claims"] += 1
+                return
+            handler = self._handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler for job kind {job['kind']}")
+                next_run_at = await handler(job.get("payload") or {})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failures"] += 1
+                print(f"[Scheduler ERROR] Job {name} failed: {str(e)}")
+                retry_at = None
+                if handler is not None and job["attempts"] < self.max_attempts:
+                    self.stats["retries"] += 1
+                    delay = self.retry_base * 2 ** (job["attempts"] - 1)
+                    retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                await ScheduledJobModel.fail(name, self.owner, str(e) or type(e).__name__, retry_at)
+                if retry_at:
+                    self._push(name, retry_at)
+                return
+
+            self.stats["runs"] += 1
+            if next_run_at is not None:
+                next_run_at = as_utc(next_run_at)
+            await ScheduledJobModel.complete(name, self.owner, next_run_at)
+            if next_run_at is not None:
+                self._push(name, next_run_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Scheduler ERROR] Job {name} could not be recorded: {str(e)}")
+
+    def _finished(self, task: asyncio.Task):
+        """Free a job's slot and let the loop start the next due job."""
+        self._tasks.discard(task)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        """Start competing for the lease and running due jobs."""
+        if self._runner is None:
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop running jobs and hand the lease over; interrupted jobs are rerun once their claim expires."""
+        if self._runner is None:
+            return
+        tasks = [self._runner, *self._tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.is_leader:
+            try:
+                await SchedulerLockModel.release(LEADER_LOCK, self.owner)
+            except Exception as e:
+                print(f"[Scheduler ERROR] Releasing the lease failed: {str(e)}")
+        self.is_leader = False
+        self._heap.clear()
+        self._queued.clear()
+        self._tasks.clear()
+        self._runner = None
+
+    def get_stats(self) -> Dict:
+        """
+        Leadership, queued timers and run counters of this worker.
+
+        Returns:
+            Dict: Owner ID, leader flag, queued and running jobs, handlers and counters
+        """
+        return {
+            "owner": self.owner,
+            "leader": self.is_leader,
+            "queued": len(self._queued),
+            "running": len(self._tasks),
+            "concurrency": self.concurrency,
+            "handlers": sorted(self._handlers),
+            **self.stats,
+        }
+
+
+# Process-wide scheduler; started and stopped with the app
+scheduler = Scheduler()
@@ -0,0 +1,83 @@
+"""
+Search helpers shared by the searchable models.
+Full-text queries go through each collection's weighted text index.
+Prefix (autocomplete) queries go through lowercase copies of the searched
+fields, so an anchored regex becomes an index range scan.
+"""
+import re
+from typing import Dict, List, Optional
+
+
+# Projection and sort exposing the text index relevance score
+TEXT_SCORE_PROJECTION = {"score": {"$meta": "textScore"}}
+TEXT_SCORE_SORT = [("score", {"$meta": "textScore"})]
+
+
+def normalize(value: Optional[str]) -> str:
+    """Normalize a string for prefix matching."""
+    return " ".join((value or "").split()).lower()
+
+
+def prefix_key(field: str) -> str:
+    """Name of the lowercase field backing prefix matches on field."""
+    return f"{field}_lc"
+
+
+def search_keys(document: Dict, fields: List[str]) -> Dict:
+    """
+    Build the lowercase prefix fields for a document being written.
+
+    Args:
+        document: Document or update containing some of the fields
+        fields: Fields that support prefix matching
+
+    Returns:
+        Dict: Lowercase copies of the fields present in the document
+    """
+    return {
+        prefix_key(field): normalize(document[field])
+        for field in fields
+        if isinstance(document.get(field), str)
+    }
+
+
+def text_filter(query: str) -> Dict:
+    """
+    Build a full-text filter. Input is passed as search terms, never as a pattern.
+
+    Args:
+        query: Search terms as typed by the user
+
+    Returns:
+        Dict: $text filter
+    """
+    return {"$text": {"$search": query}}
+
+
+def prefix_filter(field: str, prefix: str) -> Dict:
+    """
+    Build an index-backed, case-insensitive prefix filter.
+    The input is escaped, so it can never run as a regular expression.
+
+    Args:
+        field: Field that supports prefix matching
+        prefix: Prefix as typed by the user
+
+    Returns:
+        Dict: Anchored regex filter on the lowercase copy of field
+    """
+    return {prefix_key(field): {"$regex": "^" + re.escape(normalize(prefix))}}
+
+
+def exact_filter(field: str, value: str) -> Dict:
+    """
+    Build a case-insensitive equality filter on a field that supports prefix matching.
+
+    Args:
+        field: Field that supports prefix matching
+        value: Value as typed by the user
+
+    Returns:
+        Dict: Equality filter on the lowercase copy of field
+    """
+    return {prefix_key(field): normalize(value)}
@@ -5,6 +5,7 @@ Based on the SessionSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 from .base_model import BaseModel
 
@@ -15,6 +16,11 @@ class SessionModel(BaseModel):
     Handles all database interactions for event sessions.
     """
     collection_name = "sessions"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("start_time", ASCENDING)]),
+        IndexModel([("speaker_id", ASCENDING), ("start_time", ASCENDING)]),
+        IndexModel([("attendees_ids", ASCENDING), ("start_time", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_session(cls, event_id: str, title: str, start_time: datetime,
@@ -125,7 +131,7 @@ class SessionModel(BaseModel):
     @classmethod
     async def get_event_sessions(cls, event_id: str, session_type: Optional[str] = None) -> List[Dict]:
         """
-        Get all sessions for a specific event.
+        Get all sessions for a specific event, through the model cache.
         
         Args:
             event_id: Event ID
@@ -139,7 +145,29 @@ class SessionModel(BaseModel):
         if session_type:
             query["session_type"] = session_type
             
-        return await cls.find_many(query, sort=[("start_time", 1)])
+        return await cls.find_many_cached(
+            f"event_sessions:{event_id}:{session_type or ''}", query, sort=[("start_time", 1)]
+        )
+    
+    @classmethod
+    async def get_sessions_for_events(cls, event_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Get the sessions of several events with one query.
+        
+        Args:
+            event_ids: Event IDs
+            
+        Returns:
+            Dict[str, List[Dict]]: Session documents ordered by start time, keyed by event ID
+        """
+        sessions_by_event = {event_id: [] for event_id in event_ids}
+        sessions = await cls.find_many(
+            {"event_id": {"$in": list(event_ids)}},
+            sort=[("event_id", 1), ("start_time", 1)]
+        )
+        for session in sessions:
+            sessions_by_event.setdefault(session["event_id"], []).append(session)
+        return sessions_by_event
     
     @classmethod
     async def get_speaker_sessions(cls, speaker_id: str) -> List[Dict]:
@@ -352,16 +380,19 @@ class SessionModel(BaseModel):
         Returns:
             List[Dict]: List of reminder data including user IDs and message content
         """
-        event = await cls.get_event_by_id(event_id)
+        from .event_model import EventModel
+        from .user_model import UserModel
+        
+        event = await EventModel.get_event_by_id(event_id)
         if not event:
             return []
         
         # Get all participants who should receive notifications
-        from .user_model import UserModel
+        participant_ids = await EventModel.get_event_participants(event_id)
+        participants = await UserModel.load_many_by_ids(participant_ids)
         
         reminders = []
-        for participant_id in event["participants"]:
-            participant = await UserModel.get_user_by_id(participant_id)
+        for participant_id, participant in zip(participant_ids, participants):
             if participant and participant.get("receive_notifications", True):
                 reminder_time = event["start_date"] - timedelta(days=days_before)
                 
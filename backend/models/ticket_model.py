@@ -2,9 +2,10 @@
 Ticket model module for handling event tickets.
 Based on the TicketSchema.
 """
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 import uuid
 import json
 import base64
@@ -20,6 +21,12 @@ class TicketModel(BaseModel):
     Handles all database interactions for event tickets.
     """
     collection_name = "tickets"
+    indexes = [
+        IndexModel([("event_id", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("event_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("ticket_number", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("event_id", ASCENDING)]),
+    ]
     
     @classmethod
     async def create_ticket(cls, user_id: str, event_id: str, 
@@ -135,6 +142,47 @@ class TicketModel(BaseModel):
             
         return await cls.find_many(query)
     
+    @classmethod
+    async def get_event_tickets_page(cls, event_id: str, status: Optional[str] = None,
+                                     limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of the tickets for an event using keyset pagination.
+        
+        Args:
+            event_id: Event ID
+            status: Optional status filter
+            limit: Maximum number of tickets to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            Dict: "tickets" on this page and "next_cursor" (None on the last page)
+        """
+        query = {"event_id": event_id}
+        if status:
+            query["status"] = status
+        
+        page = await cls.find_page(query, limit=limit, sort=[("_id", 1)], cursor=cursor)
+        return {"tickets": page["items"], "next_cursor": page["next_cursor"]}
+    
+    @classmethod
+    def iter_event_tickets(cls, event_id: str, status: Optional[str] = None,
+                           batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        Stream all tickets for an event, without their QR codes.
+        
+        Args:
+            event_id: Event ID
+            status: Optional ticket status filter
+            batch_size: Number of tickets fetched per round trip
+            
+        Returns:
+            AsyncIterator[Dict]: Ticket documents
+        """
+        query = {"event_id": event_id}
+        if status:
+            query["status"] = status
+        return cls.iter_many(query, sort=[("_id", 1)], projection={"qr_code": 0}, batch_size=batch_size)
+    
     @classmethod
     async def update_ticket_status(cls, ticket_id: str, status: str) -> Optional[Dict]:
         """
@@ -0,0 +1,225 @@
+"""
+Tracking buffer module coalescing email open and click events.
+Pixels and link redirects arrive in bursts right after a campaign goes
+out, so events are acknowledged from memory, deduplicated while they
+wait, and written as one bulk batch per campaign once TRACKING_FLUSH_SIZE
+events are buffered or every TRACKING_FLUSH_INTERVAL_SECONDS, whichever
+comes first. A batch whose writes fail is kept with the steps it already
+wrote and resumed from there on the next flush, so retries neither lose
+first opens nor push clicks twice. Events still buffered when a worker
+dies are lost; opens and clicks are engagement metrics, not records.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .email_model import EmailCampaignModel, EmailTrackingModel
+
+
+TRACKING_FLUSH_SIZE = int(os.getenv("TRACKING_FLUSH_SIZE", "1000"))
+TRACKING_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACKING_FLUSH_INTERVAL_SECONDS", "2"))
+# Events held at most while flushes fail; further events are dropped
+TRACKING_MAX_BUFFERED = int(os.getenv("TRACKING_MAX_BUFFERED", "100000"))
+
+# Event types
+EVENT_OPEN = "open"
+EVENT_CLICK = "click"
+
+# A recipient of a campaign: (campaign_id, user_id)
+Recipient = Tuple[str, str]
+
+
+class TrackingBuffer:
+    """
+    In-memory buffer of open and click events.
+    Opens are kept once per recipient and clicks once per recipient and
+    URL, with the time of their first occurrence, so a pixel loaded ten
+    times in a burst costs one write.
+    """
+
+    def __init__(self, flush_size: int = TRACKING_FLUSH_SIZE,
+                 flush_interval: float = TRACKING_FLUSH_INTERVAL_SECONDS,
+                 max_buffered: int = TRACKING_MAX_BUFFERED):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._opens: Dict[Recipient, datetime] = {}
+        self._clicks: Dict[Recipient, Dict[str, datetime]] = {}
+        self._size = 0
+        # Campaign batches whose flush failed, resumed on the next flush
+        self._retries: List[Dict] = []
+        self._retrying = 0
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"accepted": 0, "duplicates": 0, "dropped": 0, "flushes": 0,
+                      "failed_flushes": 0, "last_flush_ms": 0.0}
+
+    def __len__(self) -> int:
+        return self._size + self._retrying
+
+    def record(self, event_type: str, campaign_id: str, user_id: str,
+               url: Optional[str] = None, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Buffer an open or click event. Never waits on the database.
+
+        Args:
+            event_type: EVENT_OPEN or EVENT_CLICK
+            campaign_id: Campaign ID
+            user_id: Recipient's user ID
+            url: URL clicked (clicks only)
+            timestamp: When the event happened (defaults to now)
+
+        Returns:
+            bool: False if the event was dropped because the buffer is full
+        """
+        if len(self) >= self.max_buffered:
+            self.stats["dropped"] += 1
+            return False
+        if not self._add(event_type, (campaign_id, user_id), url, timestamp or datetime.now(timezone.utc)):
+            self.stats["duplicates"] += 1
+        self.stats["accepted"] += 1
+
+        if self._size >= self.flush_size and self._flush_requested is not None:
+            self._flush_requested.set()
+        return True
+
+    def _add(self, event_type: str, recipient: Recipient, url: Optional[str], timestamp: datetime) -> bool:
+        """Buffer an event, keeping the earliest time of a duplicate. Returns False for a duplicate."""
+        if event_type == EVENT_OPEN:
+            pending = self._opens
+            key = recipient
+        else:
+            pending = self._clicks.setdefault(recipient, {})
+            key = url or ""
+        if key in pending:
+            pending[key] = min(pending[key], timestamp)
+            return False
+        pending[key] = timestamp
+        self._size += 1
+        return True
+
+    def _take(self) -> Tuple[Dict[Recipient, datetime], Dict[Recipient, Dict[str, datetime]]]:
+        """Swap out the buffered events."""
+        opens, clicks = self._opens, self._clicks
+        self._opens, self._clicks, self._size = {}, {}, 0
+        return opens, clicks
+
+    @staticmethod
+    def _batch_size(batch: Dict) -> int:
+        return len(batch["opens"]) + sum(len(user_clicks) for user_clicks in batch["clicks"].values())
+
+    async def _write_batch(self, batch: Dict) -> bool:
+        """
+        Write one campaign's batch, resuming from the steps an earlier attempt wrote.
+        A failed batch is kept for the next flush.
+
+        Returns:
+            bool: True if the batch is fully written
+        """
+        campaign_id, progress = batch["campaign_id"], batch["progress"]
+        try:
+            counts = await EmailTrackingModel.record_events(campaign_id, batch["opens"], batch["clicks"], progress)
+            if "metrics" not in progress["done"]:
+                await EmailCampaignModel.increment_metrics(campaign_id, counts)
+                progress["done"].add("metrics")
+        except Exception as e:
+            print(f"[TrackingBuffer ERROR] Flush for campaign {campaign_id} failed: {str(e)}")
+            self.stats["failed_flushes"] += 1
+            self._retries.append(batch)
+            self._retrying += self._batch_size(batch)
+            return False
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write the buffered events, one bulk batch per campaign, after the
+        batches of earlier failed flushes.
+
+        Returns:
+            int: Number of events written
+        """
+        async with self._lock:
+            retries, self._retries, self._retrying = self._retries, [], 0
+            opens, clicks = self._take()
+            if not opens and not clicks and not retries:
+                return 0
+            started = time.perf_counter()
+
+            campaigns: Dict[str, Dict] = {}
+            for (campaign_id, user_id), timestamp in opens.items():
+                self._campaign_batch(campaigns, campaign_id)["opens"][user_id] = timestamp
+            for (campaign_id, user_id), urls in clicks.items():
+                self._campaign_batch(campaigns, campaign_id)["clicks"][user_id] = sorted(
+                    ({"url": url, "timestamp": timestamp} for url, timestamp in urls.items()),
+                    key=lambda click: click["timestamp"]
+                )
+
+            written = 0
+            for batch in retries + list(campaigns.values()):
+                if await self._write_batch(batch):
+                    written += self._batch_size(batch)
+
+            self.stats["flushes"] += 1
+            self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return written
+
+    @staticmethod
+    def _campaign_batch(campaigns: Dict[str, Dict], campaign_id: str) -> Dict:
+        batch = campaigns.get(campaign_id)
+        if batch is None:
+            batch = campaigns[campaign_id] = {"campaign_id": campaign_id, "opens": {}, "clicks": {}, "progress": {}}
+        return batch
+
+    async def _run_flusher(self):
+        """Flush on the size trigger or the interval, whichever comes first."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            failures = self.stats["failed_flushes"]
+            await self.flush()
+            if self.stats["failed_flushes"] > failures:
+                # Restored events may still trip the size trigger; give the database a moment
+                await asyncio.sleep(self.flush_interval)
+
+    async def start(self):
+        """Start the background flusher."""
+        if self._flusher is None:
+            self._flush_requested = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def stop(self):
+        """Stop the flusher and write what is still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+            self._flush_requested = None
+        await self.flush()
+
+    def get_stats(self) -> Dict:
+        """
+        Buffer size and ingestion counters of this worker.
+
+        Returns:
+            Dict: Buffered events, flush settings and counters
+        """
+        return {
+            "buffered": self._size,
+            "retrying": self._retrying,
+            "flush_size": self.flush_size,
+            "flush_interval_seconds": self.flush_interval,
+            **self.stats,
+        }
+
+
+# Process-wide buffer; its flusher is started and stopped with the app
+tracking_buffer = TrackingBuffer()
@@ -5,8 +5,11 @@ Based on the UserSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 
 from .base_model import BaseModel
+from .search import TEXT_SCORE_PROJECTION, TEXT_SCORE_SORT, text_filter
+from .autocomplete import SUGGEST_SPEAKER, index_user, unindex
 
 
 class UserModel(BaseModel):
@@ -15,6 +18,14 @@ class UserModel(BaseModel):
     Handles all database interactions for users.
     """
     collection_name = "users"
+    indexes = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("auth0_id", ASCENDING)]),
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("interests", ASCENDING)]),
+        IndexModel([("first_name", TEXT), ("last_name", TEXT), ("email", TEXT), ("company", TEXT)],
+                   weights={"first_name": 10, "last_name": 10, "email": 5, "company": 3}, name="users_text"),
+    ]
     
     @classmethod
     async def create_user(cls, auth0_id: str, email: str, first_name: str, last_name: str,
@@ -85,13 +96,14 @@ class UserModel(BaseModel):
         if facebook:
             user_data["facebook"] = facebook
         
-        user_id = await cls.insert_one(user_data)
-        return str(user_id)
+        user_id = str(await cls.insert_one(user_data))
+        index_user(user_id, user_data)
+        return user_id
     
     @classmethod
     async def get_user_by_id(cls, user_id: str) -> Dict:
         """
-        Get user details by ID.
+        Get user details by ID, through the model cache.
         
         Args:
             user_id: User ID
@@ -99,7 +111,7 @@ class UserModel(BaseModel):
         Returns:
             Dict: User document or None if not found
         """
-        return await cls.find_one({"_id": ObjectId(user_id)})
+        return await cls.find_by_id_cached(user_id)
     
     @classmethod
     async def get_user_by_auth0_id(cls, auth0_id: str) -> Dict:
@@ -150,10 +162,13 @@ class UserModel(BaseModel):
         # Always update the updated_at timestamp
         filtered_update["updated_at"] = datetime.now(timezone.utc)
         
-        return await cls.update_one(
+        updated_user = await cls.update_one(
             {"_id": ObjectId(user_id)},
             {"$set": filtered_update}
         )
+        if updated_user:
+            index_user(user_id, updated_user)
+        return updated_user
     
     @classmethod
     async def delete_user(cls, user_id: str) -> bool:
@@ -167,6 +182,8 @@ class UserModel(BaseModel):
             bool: True if deleted, False otherwise
         """
         deleted_count = await cls.delete_one({"_id": ObjectId(user_id)})
+        if deleted_count > 0:
+            unindex(SUGGEST_SPEAKER, user_id)
         return deleted_count > 0
     
     @classmethod
@@ -288,7 +305,7 @@ class UserModel(BaseModel):
     @classmethod
     async def search_users(cls, query: str, limit: int = 10) -> List[Dict]:
         """
-        Search for users by name, email, or company.
+        Search for users by name, email, or company, most relevant first.
         
         Args:
             query: Search query
@@ -297,16 +314,13 @@ class UserModel(BaseModel):
         Returns:
             List[Dict]: List of matching user documents
         """
+        if not query or not query.strip():
+            return []
         return await cls.find_many(
-            {
-                "$or": [
-                    {"first_name": {"$regex": query, "$options": "i"}},
-                    {"last_name": {"$regex": query, "$options": "i"}},
-                    {"email": {"$regex": query, "$options": "i"}},
-                    {"company": {"$regex": query, "$options": "i"}}
-                ]
-            },
-            limit=limit
+            text_filter(query),
+            limit=limit,
+            sort=TEXT_SCORE_SORT,
+            projection=TEXT_SCORE_PROJECTION
         )
     
     @classmethod
@@ -369,11 +383,7 @@ class UserModel(BaseModel):
         participants = [p for p in participants if p != user_id]
         
         # Get user info for all participants
-        participant_details = []
-        for participant_id in participants:
-            participant = await cls.get_user_by_id(participant_id)
-            if participant:
-                participant_details.append(participant)
+        participant_details = [p for p in await cls.load_many_by_ids(participants) if p]
         
         # Calculate interest matches
         interest_matches = []
@@ -421,17 +431,6 @@ class UserModel(BaseModel):
             "total_potential_connections": len(participant_details)
         }
 
-    @classmethod
-    def get_sync_collection(cls):
-        from controller.database import db_instance
-        return db_instance[cls.collection_name]
-
-    @classmethod
-    def get_user_by_id_sync(cls, user_id: str) -> dict:
-        collection = cls.get_sync_collection()
-        return collection.find_one({"_id": ObjectId(user_id)})
-
-    
     @classmethod
     async def get_all_speakers(cls) -> List[Dict]:
         try:
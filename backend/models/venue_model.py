@@ -5,8 +5,12 @@ Based on the VenueSchema.
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 
 from .base_model import BaseModel
+from .search import (TEXT_SCORE_PROJECTION, TEXT_SCORE_SORT, text_filter, prefix_filter,
+                     exact_filter, prefix_key, search_keys)
+from .autocomplete import SUGGEST_VENUE, index_venue, unindex
 
 
 class VenueModel(BaseModel):
@@ -15,6 +19,15 @@ class VenueModel(BaseModel):
     Handles all database interactions for venues.
     """
     collection_name = "venues"
+    indexes = [
+        IndexModel([("capacity", ASCENDING)]),
+        IndexModel([("name", TEXT), ("city", TEXT), ("address", TEXT), ("description", TEXT)],
+                   weights={"name": 10, "city": 5, "address": 2, "description": 1}, name="venues_text"),
+        IndexModel([("name_lc", ASCENDING)]),
+        IndexModel([("city_lc", ASCENDING)]),
+    ]
+    # Fields with a lowercase copy for prefix search
+    prefix_fields = ["name", "city"]
     
     @classmethod
     async def create_venue(cls, name: str, address: str, city: str, country: str, 
@@ -65,6 +78,7 @@ class VenueModel(BaseModel):
             "created_at": now,
             "updated_at": now
         }
+        venue_data.update(search_keys(venue_data, cls.prefix_fields))
         
         # Add optional fields if provided
         if state:
@@ -85,13 +99,14 @@ class VenueModel(BaseModel):
         if contact_phone:
             venue_data["contact_phone"] = contact_phone
         
-        venue_id = await cls.insert_one(venue_data)
-        return str(venue_id)
+        venue_id = str(await cls.insert_one(venue_data))
+        index_venue(venue_id, venue_data)
+        return venue_id
     
     @classmethod
     async def get_venue_by_id(cls, venue_id: str) -> Dict:
         """
-        Get venue details by ID.
+        Get venue details by ID, through the model cache.
         
         Args:
             venue_id: Venue ID
@@ -99,7 +114,7 @@ class VenueModel(BaseModel):
         Returns:
             Dict: Venue document or None if not found
         """
-        return await cls.find_one({"_id": ObjectId(venue_id)})
+        return await cls.find_by_id_cached(venue_id)
     
     @classmethod
     async def update_venue(cls, venue_id: str, update_data: Dict) -> Optional[Dict]:
@@ -120,14 +135,18 @@ class VenueModel(BaseModel):
             "has_wifi", "has_parking", "has_catering", "images"
         ]
         filtered_update = {k: v for k, v in update_data.items() if k in allowed_fields}
+        filtered_update.update(search_keys(filtered_update, cls.prefix_fields))
         
         # Always update the updated_at timestamp
         filtered_update["updated_at"] = datetime.now(timezone.utc)
         
-        return await cls.update_one(
+        updated_venue = await cls.update_one(
             {"_id": ObjectId(venue_id)},
             {"$set": filtered_update}
         )
+        if updated_venue:
+            index_venue(venue_id, updated_venue)
+        return updated_venue
     
     @classmethod
     async def delete_venue(cls, venue_id: str) -> bool:
@@ -141,35 +160,31 @@ class VenueModel(BaseModel):
             bool: True if deleted, False otherwise
         """
         deleted_count = await cls.delete_one({"_id": ObjectId(venue_id)})
+        if deleted_count > 0:
+            unindex(SUGGEST_VENUE, venue_id)
         return deleted_count > 0
     
     @classmethod
     async def search_venues(cls, query: str, city: Optional[str] = None,
                          min_capacity: Optional[int] = None,
-                         facilities: List[str] = None) -> List[Dict]:
+                         facilities: List[str] = None, limit: int = 0) -> List[Dict]:
         """
-        Search for venues by name, description, address, or city.
+        Search for venues by name, description, address, or city, most relevant first.
         
         Args:
             query: Search query
-            city: Optional city filter
+            city: Optional city filter (case-insensitive exact match)
             min_capacity: Optional minimum capacity filter
             facilities: Optional facilities filter (wifi, parking, catering)
+            limit: Maximum number of venues to return (0 for all)
             
         Returns:
             List[Dict]: List of matching venue documents
         """
-        search_criteria = {
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}},
-                {"address": {"$regex": query, "$options": "i"}},
-                {"city": {"$regex": query, "$options": "i"}}
-            ]
-        }
+        search_criteria = text_filter(query) if query and query.strip() else {}
         
         if city:
-            search_criteria["city"] = {"$regex": city, "$options": "i"}
+            search_criteria.update(exact_filter("city", city))
             
         if min_capacity is not None:
             search_criteria["capacity"] = {"$gte": min_capacity}
@@ -182,8 +197,35 @@ class VenueModel(BaseModel):
                     search_criteria["has_parking"] = True
                 elif facility == "catering":
                     search_criteria["has_catering"] = True
-                    
-        return await cls.find_many(search_criteria)
+        
+        if "$text" not in search_criteria:
+            return await cls.find_many(search_criteria, limit=limit, sort=[(prefix_key("name"), 1)])
+        return await cls.find_many(
+            search_criteria,
+            limit=limit,
+            sort=TEXT_SCORE_SORT,
+            projection=TEXT_SCORE_PROJECTION
+        )
+    
+    @classmethod
+    async def autocomplete_venues(cls, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest venues whose name or city starts with a prefix.
+        
+        Args:
+            prefix: Prefix as typed by the user
+            limit: Maximum number of suggestions
+            
+        Returns:
+            List[Dict]: Matching venues with their name and city
+        """
+        if not prefix.strip():
+            return []
+        return await cls.find_many(
+            {"$or": [prefix_filter("name", prefix), prefix_filter("city", prefix)]},
+            limit=limit,
+            projection={"name": 1, "city": 1}
+        )
     
     @classmethod
     async def add_venue_image(cls, venue_id: str, image_url: str) -> Optional[Dict]:
@@ -231,12 +273,12 @@ class VenueModel(BaseModel):
         Get all venues in a specific city.
         
         Args:
-            city: City to search for
+            city: City to search for (case-insensitive)
             
         Returns:
             List[Dict]: List of venue documents in the specified city
         """
-        return await cls.find_many({"city": {"$regex": city, "$options": "i"}})
+        return await cls.find_many(exact_filter("city", city))
     
     @classmethod
     async def get_venues_by_capacity(cls, min_capacity: int, max_capacity: Optional[int] = None) -> List[Dict]:
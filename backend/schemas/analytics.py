@@ -83,8 +83,9 @@ class ReportConfigSchema(BaseModel):
     
     # Scheduling (optional)
     is_scheduled: bool = False
-    schedule_frequency: Optional[str] = None
+    schedule_frequency: Optional[str] = Field(default=None, regex="^(hourly|daily|weekly|monthly)$")
     recipients: List[str] = Field(default_factory=list)  # List of user IDs or emails
+    last_generated_at: Optional[datetime] = None
     
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_by: str  # Reference to User
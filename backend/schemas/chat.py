@@ -20,7 +20,9 @@ class ChatRoomSchema(BaseModel):
     is_private: bool = False
     is_direct: bool = False  # New field
     participants: List[str] = []  # List of User IDs
-    messages: List[ChatMessageSchema] = []  # List of ChatMessage objects
+    message_count: int = 0  # Messages are stored in chat_messages, not on the room
+    last_message: Optional[ChatMessageSchema] = None
+    last_activity: Optional[datetime] = None
     created_at: datetime = datetime.now(timezone.utc)
 
 
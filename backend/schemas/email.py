@@ -3,13 +3,17 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
 
 class EmailTrackingSchema(BaseModel):
+    """One recipient of a campaign; stored in email_tracking, keyed by (campaign_id, user_id)"""
+    id: Optional[str] = None
+    campaign_id: str  # Reference to EmailCampaign
     user_id: str  # Reference to User
     sent_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     opened: bool = False
     opened_at: Optional[datetime] = None
     clicked: bool = False
     clicked_at: Optional[datetime] = None
-    clicks: List[Dict[str, Any]] = []
+    click_count: int = 0
+    clicks: List[Dict[str, Any]] = []  # Most recent clicks
     
     class Config:
         orm_mode = True
@@ -33,11 +37,11 @@ class EmailCampaignSchema(BaseModel):
     audience: Dict[str, Any]
     sender_name: str
     sender_email: EmailStr
-    status: str = Field(default="draft", regex="^(draft|scheduled|sent|cancelled)$")
+    status: str = Field(default="draft", regex="^(draft|scheduled|sending|sent|cancelled)$")
     schedule_time: Optional[datetime] = None
+    email_job_id: Optional[str] = None  # Email job delivering the campaign, once sending
     sent_time: Optional[datetime] = None
     metrics: EmailMetricsSchema = Field(default_factory=EmailMetricsSchema)
-    tracking: List[EmailTrackingSchema] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
@@ -12,7 +12,7 @@ class EventSchema(BaseModel):
     virtual_meeting_url: str
     organizer_id: str  # Reference to User (user_id)
     venue_id: str  # Reference to Venue (venue_id)
-    participants: List[str] = []  # List of User IDs
+    participant_count: int = 0  # Registrations live in the registrations collection
 
     capacity: int
 
@@ -19,7 +19,7 @@ class PollSchema(BaseModel):
     is_multiple_choice: bool = False
     duration: int = 60  # Duration in seconds
     status: str = Field(..., regex="^(active|closed)$", default="active")
-    voters: List[str] = []  # List of User IDs who voted
+    voter_count: int = 0  # Number of users who voted; the votes are in poll_votes
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     ends_at: datetime
     
@@ -2,18 +2,25 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime, timezone
 
+class AnswerSchema(BaseModel):
+    user_id: Optional[str] = None  # Reference to User
+    text: str
+    answered_at: Optional[datetime] = None
+
 class QuestionSchema(BaseModel):
     id: Optional[str] = None
-    session_id: str  # Reference to Session
+    session_id: Optional[str] = None  # Reference to Session; None for a question about the whole event
+    event_id: Optional[str] = None  # Reference to Event
     user_id: str  # Reference to User
     question_text: str
     is_anonymous: bool = False
     status: str = Field(default="pending", regex="^(pending|answered|dismissed)$")
-    votes: int = Field(default=0)
-    voters: List[str] = []  # List of User IDs who voted
+    votes: int = Field(default=0)  # Upvotes; one per user, recorded in question_votes
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     answered_at: Optional[datetime] = None
-    answer_text: Optional[str] = None
+    answer_text: Optional[str] = None  # Current answer; earlier ones stay in answers
+    answered_by: Optional[str] = None  # Reference to User
+    answers: List[AnswerSchema] = []
     
     class Config:
         orm_mode = True
\ No newline at end of file
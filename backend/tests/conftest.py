@@ -0,0 +1,105 @@
+"""
+Shared fixtures for the backend tests.
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from models.base_model import Database
+from models.cache import model_cache
+
+
+def _decode(value):
+    """Decode ObjectIds to strings, as MODEL_CODEC_OPTIONS does on a real server."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class _DecodingCursor:
+    """Cursor that decodes the documents it yields."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count):
+        self._cursor.skip(count)
+        return self
+
+    def limit(self, count):
+        self._cursor.limit(count)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return [_decode(document) for document in await self._cursor.to_list(length)]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return _decode(await self._cursor.__anext__())
+
+
+class _DecodingCollection:
+    """Collection whose reads come back decoded."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _DecodingCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs):
+        return _DecodingCursor(self._collection.aggregate(pipeline, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            result = await method(*args, **kwargs)
+            return _decode(result) if isinstance(result, dict) else result
+        return call
+
+
+class _DecodingDatabase:
+    """
+    mongomock cannot apply custom type codecs, so collections opened with
+    codec options get their ObjectIds decoded here instead.
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    def get_collection(self, name, codec_options=None):
+        collection = self._db.get_collection(name)
+        return _DecodingCollection(collection) if codec_options else collection
+
+    def __getitem__(self, name):
+        return self._db[name]
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Point the models at a fresh in-memory database."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = _DecodingDatabase(mongomock_motor.AsyncMongoMockClient()["test"])
+    monkeypatch.setattr(Database, "_db", database)
+    monkeypatch.setattr(Database, "_collections", {})
+    asyncio.run(model_cache.clear())
+    yield database
+    asyncio.run(model_cache.clear())
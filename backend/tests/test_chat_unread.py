@@ -0,0 +1,68 @@
+"""
+Tests for chat room read cursors and unread counts.
+"""
+import asyncio
+
+from models.chat_model import ChatRoomModel, ChatMessageModel, ChatReadModel
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+
+async def post(chat_room_id, sender_id, count):
+    message_ids = []
+    for index in range(count):
+        message_ids.append(await ChatMessageModel.create_message(f"message {index}", sender_id, chat_room_id))
+    return message_ids
+
+
+def test_unread_counts_messages_after_cursor(db):
+    async def scenario():
+        room_id = await ChatRoomModel.create_chat_room(None, "", "room", participants=["alice", "bob"])
+        message_ids = await post(room_id, "bob", 4)
+        await ChatReadModel.mark_read(room_id, "alice", message_ids[1])
+        return room_id, await ChatReadModel.get_unread_counts("alice")
+
+    room_id, unread = run(scenario())
+    assert unread == {room_id: 2}
+
+
+def test_own_messages_are_not_unread(db):
+    async def scenario():
+        room_id = await ChatRoomModel.create_chat_room(None, "", "room", participants=["alice", "bob"])
+        await post(room_id, "alice", 3)
+        await post(room_id, "bob", 1)
+        return room_id, await ChatReadModel.get_unread_counts("alice", [room_id])
+
+    room_id, unread = run(scenario())
+    assert unread == {room_id: 1}
+
+
+def test_deleting_a_read_message_keeps_unread_count(db):
+    async def scenario():
+        room_id = await ChatRoomModel.create_chat_room(None, "", "room", participants=["alice", "bob"])
+        message_ids = await post(room_id, "bob", 5)
+        await ChatReadModel.mark_read(room_id, "alice", message_ids[2])
+        await ChatMessageModel.delete_message(message_ids[0])
+        after_read_delete = await ChatReadModel.get_unread_counts("alice")
+        await ChatMessageModel.delete_message(message_ids[4])
+        after_unread_delete = await ChatReadModel.get_unread_counts("alice")
+        return room_id, after_read_delete, after_unread_delete
+
+    room_id, after_read_delete, after_unread_delete = run(scenario())
+    assert after_read_delete == {room_id: 2}
+    assert after_unread_delete == {room_id: 1}
+
+
+def test_read_cursor_never_moves_back(db):
+    async def scenario():
+        room_id = await ChatRoomModel.create_chat_room(None, "", "room", participants=["alice", "bob"])
+        message_ids = await post(room_id, "bob", 3)
+        await ChatReadModel.mark_read(room_id, "alice")
+        cursor = await ChatReadModel.mark_read(room_id, "alice", message_ids[0])
+        return message_ids, cursor, await ChatReadModel.get_unread_counts("alice")
+
+    message_ids, cursor, unread = run(scenario())
+    assert cursor["last_read_message_id"] == message_ids[-1]
+    assert set(unread.values()) == {0}
@@ -0,0 +1,76 @@
+"""
+Tests for the request-scoped batch loader.
+"""
+import asyncio
+
+from models.loader import BatchLoader
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=1))
+
+
+def make_loader(calls, gate=None):
+    async def batch_fn(keys):
+        calls.append(list(keys))
+        if gate is not None:
+            await gate.wait()
+        return {key: f"value-{key}" for key in keys}
+    return BatchLoader(batch_fn)
+
+
+def test_load_many_batches_keys():
+    async def scenario():
+        calls = []
+        loader = make_loader(calls)
+        values = await loader.load_many(["a", "b", "a"])
+        return calls, values
+
+    calls, values = run(scenario())
+    assert calls == [["a", "b"]]
+    assert values == ["value-a", "value-b", "value-a"]
+
+
+def test_clear_before_dispatch_still_resolves():
+    async def scenario():
+        calls = []
+        loader = make_loader(calls)
+        pending = asyncio.ensure_future(loader.load("a"))
+        await asyncio.sleep(0)
+        loader.clear()
+        return await pending, calls
+
+    value, calls = run(scenario())
+    assert value == "value-a"
+    assert calls == [["a"]]
+
+
+def test_clear_while_in_flight_still_resolves():
+    async def scenario():
+        calls = []
+        gate = asyncio.Event()
+        loader = make_loader(calls, gate)
+        pending = asyncio.ensure_future(loader.load("a"))
+        while not calls:
+            await asyncio.sleep(0)
+        loader.clear()
+        # A load after the clear must not reuse the in-flight result
+        again = asyncio.ensure_future(loader.load("a"))
+        gate.set()
+        return await pending, await again, calls
+
+    value, again, calls = run(scenario())
+    assert value == again == "value-a"
+    assert calls == [["a"], ["a"]]
+
+
+def test_clear_drops_resolved_values():
+    async def scenario():
+        calls = []
+        loader = make_loader(calls)
+        await loader.load("a")
+        loader.clear("a")
+        await loader.load("a")
+        return calls
+
+    assert run(scenario()) == [["a"], ["a"]]
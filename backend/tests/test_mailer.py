@@ -0,0 +1,80 @@
+"""
+Tests for the background mailer, delivering through the local SMTP sink.
+"""
+import asyncio
+import random
+
+from devtools.smtp_sink import SMTPSink
+from models.email_model import EmailJobModel, EmailDeliveryModel
+from models.mailer import Mailer, SMTPConnection
+
+
+MAX_ATTEMPTS = 3
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=10))
+
+
+async def deliver(recipients, fail_rate=0.0, pool_size=2):
+    """Send a job through a Mailer against a fresh sink; returns the sink, job and deliveries."""
+    sink = SMTPSink(fail_rate=fail_rate, quiet=True)
+    server = await sink.serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    mailer = Mailer(
+        pool_size=pool_size,
+        max_attempts=MAX_ATTEMPTS,
+        retry_base=0.01,
+        connection_factory=lambda: SMTPConnection("127.0.0.1", port, use_ssl=False,
+                                                  sender="events@example.com", password=None)
+    )
+    try:
+        job_id = await EmailJobModel.create_job("Subject", "<p>Body</p>", recipients)
+        await mailer.start()
+        mailer.submit(job_id)
+        while (await EmailJobModel.get_job(job_id))["status"] != "completed":
+            await asyncio.sleep(0.01)
+    finally:
+        await mailer.stop()
+        server.close()
+        await server.wait_closed()
+    page = await EmailDeliveryModel.get_job_deliveries(job_id, limit=0)
+    return sink, await EmailJobModel.get_job(job_id), page["deliveries"]
+
+
+def test_deliveries_reach_sent(db):
+    recipients = [f"user{index}@example.com" for index in range(5)]
+    sink, job, deliveries = run(deliver(recipients))
+
+    assert job["counts"] == {"sent": 5, "failed": 0}
+    assert {delivery["status"] for delivery in deliveries} == {"sent"}
+    assert sorted(to for message in sink.messages for to in message["to"]) == [
+        f"<{email}>" for email in sorted(recipients)
+    ]
+
+
+def test_refused_recipients_fail_after_max_attempts(db):
+    sink, job, deliveries = run(deliver(["a@example.com", "b@example.com"], fail_rate=1.0))
+
+    assert job["counts"] == {"sent": 0, "failed": 2}
+    assert sink.messages == []
+    for delivery in deliveries:
+        assert delivery["status"] == "failed"
+        assert delivery["attempts"] == MAX_ATTEMPTS
+        assert "451" in delivery["last_error"]
+
+
+def test_transient_failures_are_retried(db):
+    random.seed(7)
+    recipients = [f"user{index}@example.com" for index in range(20)]
+    sink, job, deliveries = run(deliver(recipients, fail_rate=0.5))
+
+    sent = [delivery for delivery in deliveries if delivery["status"] == "sent"]
+    failed = [delivery for delivery in deliveries if delivery["status"] == "failed"]
+    assert len(sent) + len(failed) == len(recipients)
+    assert job["counts"] == {"sent": len(sent), "failed": len(failed)}
+    assert len(sink.messages) == len(sent)
+    # Some deliveries only got through on a retry
+    assert any(delivery["attempts"] > 1 for delivery in sent)
+    assert all(1 <= delivery["attempts"] <= MAX_ATTEMPTS for delivery in sent)
+    assert all(delivery["attempts"] == MAX_ATTEMPTS for delivery in failed)
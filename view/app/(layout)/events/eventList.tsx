@@ -22,7 +22,7 @@ interface Event {
   organizer: string;
   venue: string;
   sessions: Session[];
-  participants: string[];
+  is_registered?: boolean;
 }
 
 const AllEvents: React.FC = () => {
@@ -43,7 +43,10 @@ const AllEvents: React.FC = () => {
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify({ query: search_query }),
+      body: JSON.stringify({
+        query: search_query,
+        user_id: localStorage.getItem("user_id"),
+      }),
     })
       .then((res) => res.json())
       .then((data) => {
@@ -54,11 +57,7 @@ const AllEvents: React.FC = () => {
   }, [search]);
 
   const isRegistered = (event: Event) => {
-    let userId = localStorage.getItem("user_id");
-    if (userId && event.participants.includes(userId)) {
-      return true;
-    }
-    return false;
+    return event.is_registered === true;
   };
 
   const router = useRouter();
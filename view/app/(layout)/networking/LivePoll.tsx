@@ -67,7 +67,7 @@ export default function LivePoll({ onBack }: { onBack: () => void }) {
 
   useEffect(() => {
     const fetchPolls = async () => {
-      const res = await fetch("http://localhost:8000/polls");
+      const res = await fetch(`http://localhost:8000/polls?user_id=${userId ?? ""}`);
       const resData = await res.json();
       setPolls(resData.polls);
     }